@@ -1,60 +1,36 @@
 import datetime
+import io
+import itertools
+import queue
 import tkinter as tk
 from tkinter import messagebox, ttk
 from pathlib import Path
-try:
-    import qrcode
-except Exception:
-    qrcode = None
-try:
-    from PIL import Image, ImageTk
-except Exception:
-    Image = None
-    ImageTk = None
 import os   #Trabajar con archivos y directorios
 import sys  #Rutas del intérprete
 import subprocess   # Ejecuta programas externos desde python
-
-def cargar_productos():
-    """Carga los productos desde lista_de_productos.txt"""
-    productos = {}
-    try:
-        with open("lista_de_productos.txt", "r", encoding="utf-8") as f:
-            for linea in f:
-                linea = linea.strip()
-                # Saltar líneas vacías y categorías (que comienzan y terminan con -)
-                if not linea or (linea.startswith("-") and linea.endswith("-")):
-                    continue
-                
-                # Pasar línea formato: "Producto": precio,
-                if "\"" in linea and ": " in linea:
-                    try:
-                        # Extraer el nombre del producto entre comillas
-                        inicio = linea.index("\"")
-                        fin = linea.index("\"", inicio + 1)
-                        producto = linea[inicio + 1:fin]
-                        
-                        # Extraer el precio (después de ": " y antes de la coma)
-                        precio_str = linea[fin + 2:].strip()
-                        if precio_str.endswith(","):
-                            precio_str = precio_str[:-1]
-                        precio = float(precio_str.strip())
-                        
-                        productos[producto] = precio
-                    except (ValueError, IndexError):
-                        pass
-    except FileNotFoundError:
-        print("Error: No se encontró lista_de_productos.txt")
-    return productos
-
-PRODUCTOS_DISPONIBLES = cargar_productos()
-
-# Directorio para guardar boletas
-BOLETAS_DIR = Path("boletas")
-BOLETAS_DIR.mkdir(exist_ok=True)
-
-# Variable para almacenar la última boleta generada
-ULTIMA_BOLETA = None
+import nucleo
+from autocompletado import ListaSugerencias
+from busqueda_productos import normalizar
+from cambios_carrito import CambiosCarrito
+from carrito import Carrito
+from journal_carrito import JournalCarrito
+import metricas
+from metricas import etapa, medido
+from nucleo import (ALMACEN, ARCHIVO_BOLETAS, BOLETAS_DIR, HISTORIAL_CLIENTES, INDICE_BOLETAS,
+                    PRODUCTOS_DISPONIBLES, boleta_disponible, categorias_productos, generar_contenido_boleta,
+                    guardar_boleta_en_disco, guardar_cliente, indice_productos, leer_contenido_boleta,
+                    leer_qr_boleta, obtener_nombre_boleta, registrar_boleta)
+from miniaturas import CacheMiniaturas
+from persistencia import ColaPersistencia
+from qr_compacto import importar_pil, payload_qr
+from ventana_busqueda import VentanaBusqueda
+from ventana_reportes import VentanaReportes
+from visor_boletas import VisorBoletas
+from vista_carrito import VistaCarritoVirtual
+from vista_previa_qr import RenderizadorQR, clave_contenido
+
+# Primera opción del selector de categorías
+TODAS_LAS_CATEGORIAS = "(Todas)"
 
 
 def abrir_archivo(ruta: Path):
@@ -70,106 +46,11 @@ def abrir_archivo(ruta: Path):
         print(f"No se pudo abrir el archivo {ruta}: {e}")
 
 
-def cargar_historial_clientes():
-    #Carga la lista de clientes desde clientes.txt.
-    clientes = []
-    try:
-        with open("clientes.txt", "r", encoding="utf-8") as f: # Se abre el archivo modo lectura y se leen bien los tildes y caracteres especiales.
-            clientes = [linea.strip() for linea in f if linea.strip()] #Crea una lista de clientes sin listas vacías, se eliminan los espacios en los extremos.
-    except FileNotFoundError:
-        pass
-    return clientes
-
-
-def guardar_cliente(cliente: str):
-    #Guarda un cliente nuevo en el historial (sin duplicados).
-    if not cliente or not cliente.strip():
-        return
-    cliente = cliente.strip()
-    clientes = cargar_historial_clientes()
-    if cliente not in clientes:
-        clientes.insert(0, cliente)  # Insertar al principio (más reciente)
-        # Mantener solo últimos 20 clientes
-        clientes = clientes[:20]
-        try:
-            with open("clientes.txt", "w", encoding="utf-8") as f:
-                for c in clientes:
-                    f.write(c + "\n")
-        except Exception as e:
-            print(f"No se pudo guardar cliente: {e}")
-
-
-def generar_contenido_boleta(cliente, productos_cliente, total, fecha):
-    """Genera el contenido de la boleta para reutilizar en archivo y GUI."""
-    lineas = [
-        f"Boleta para {cliente}",
-        f"Fecha y Hora: {fecha}",
-        "\nDetalles de la Venta:\n"
-    ]
-
-    for cantidad, producto in productos_cliente:
-        precio = PRODUCTOS_DISPONIBLES[producto]
-        subtotal = cantidad * precio
-        lineas.append(f"{cantidad} x {producto} a ${precio:.2f} c/u => Total: ${subtotal:.2f}")
-
-    lineas.append(f"\nTOTAL: ${total:.2f}")
-    return "\n".join(lineas)
-
-
-def obtener_nombre_boleta(cliente, fecha):
-    """Genera el nombre del archivo de boleta."""
-    fecha_formateada = fecha.replace(":", ";").replace("/", "-").replace(" ", "_")
-    return f"{cliente}_{fecha_formateada}.txt"
-
-
-def registrar_boleta(cliente, productos_cliente, total):
-    """Guarda la boleta en disco y devuelve el nombre y contenido."""
-    fecha = datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")
-    boleta_nombre = obtener_nombre_boleta(cliente, fecha)
-    contenido = generar_contenido_boleta(cliente, productos_cliente, total, fecha)
-
-    # Guardar directamente en la carpeta boletas/
-    ruta_boleta = BOLETAS_DIR / boleta_nombre
-    try:
-        with open(ruta_boleta, "w", encoding="utf-8") as boleta:
-            boleta.write(contenido)
-    except IOError as e:
-        raise
-
-    # Intentar generar un código QR con el contenido de la boleta
-    try:
-        # si la importación falló antes, intentar importar localmente (por si se instaló luego)
-        qr_lib = qrcode
-        if qr_lib is None:
-            try:
-                import qrcode as _qrcode
-                qr_lib = _qrcode
-            except Exception:
-                qr_lib = None
-
-        if qr_lib is not None:
-            img = qr_lib.make(contenido)
-            ruta_qr = ruta_boleta.with_suffix('.png')
-            try:
-                img.save(ruta_qr)
-            except Exception as save_err:
-                print(f"No se pudo guardar el QR: {save_err}")
-    except Exception as e:
-        print(f"No se generó el QR: {e}")
-
-    # guardar última boleta para poder abrirla desde la UI (SIN abrir automáticamente)
-    try:
-        global ULTIMA_BOLETA
-        ULTIMA_BOLETA = ruta_boleta
-    except Exception:
-        ULTIMA_BOLETA = None
-
-    return boleta_nombre, contenido
-
-
 class VentaApp:     
-    def __init__(self, root):   
+    def __init__(self, root, servidor=None):   
         self.root = root    #Guarda la ventana principal
+        # Con un ClienteVentas esta caja es liviana: las ventas las guarda servidor_ventas.py
+        self.servidor = servidor
         # Fuente global más grande para mejor legibilidad
         # Ajustado a tamaño mayor para visibilidad: 18pt
         root.option_add("*Font", "Arial 18")
@@ -199,7 +80,8 @@ class VentaApp:
         # Estado de direcciones de ordenamiento por columna (True = asc, False = desc)
         self.sort_directions = {}
 
-        self.cart = []  # lista de (cantidad, producto)
+        self.cart = Carrito()  # líneas indexadas por id de línea y por producto
+        self._ids_linea = itertools.count(1)
 
         # --- Cliente ---
         frame_cliente = tk.Frame(root)
@@ -210,18 +92,31 @@ class VentaApp:
         self.cliente_entry.pack(side=tk.LEFT, padx=6, fill=tk.X, expand=True)
         
         # Evento para actualizar QR cuando cambie el cliente
-        self.cliente_entry.bind('<KeyRelease>', lambda e: self.actualizar_vista_qr())
+        self.cliente_entry.bind('<KeyRelease>', lambda e: self.cliente_cambiado())
         
-        # Cargar historial de clientes para autocomplete
-        self.historial_clientes = cargar_historial_clientes()
+        # Autocompletado con el historial de clientes (búsqueda por prefijo en el trie)
+        self.historial_clientes = HISTORIAL_CLIENTES
+        self.sugerencias_cliente = ListaSugerencias(self.cliente_entry, self.sugerir_clientes,
+                                                    al_elegir=lambda _c: self.cliente_cambiado())
 
         # --- Selección de producto ---
         frame_producto = tk.Frame(root)
         frame_producto.pack(fill=tk.X, padx=10, pady=6)
 
+        # Categoría: al elegir una solo se leen del archivo los productos de esa sección
+        tk.Label(frame_producto, text="Categoría:").pack(side=tk.LEFT)
+        self._rutas_categoria = [None]      # ruta de cada opción del selector (None: todas)
+        self._productos_categoria = None    # [(nombre normalizado, nombre)] de la categoría elegida
+        self.categoria_cb = ttk.Combobox(frame_producto, state="readonly", width=18,
+                                         values=[TODAS_LAS_CATEGORIAS], postcommand=self._listar_categorias)
+        self.categoria_cb.set(TODAS_LAS_CATEGORIAS)
+        self.categoria_cb.pack(side=tk.LEFT, padx=(6, 10))
+        self.categoria_cb.bind('<<ComboboxSelected>>', lambda e: self.elegir_categoria())
+
         tk.Label(frame_producto, text="Producto:").pack(side=tk.LEFT)
-        productos = list(PRODUCTOS_DISPONIBLES.keys())
-        self.producto_cb = ttk.Combobox(frame_producto, values=productos, state="readonly")
+        # El desplegable muestra solo las mejores coincidencias de lo que se escribe
+        productos = indice_productos().buscar("", 15)
+        self.producto_cb = ttk.Combobox(frame_producto, values=productos)
         if productos:
             self.producto_cb.set(productos[0])
         self.producto_cb.pack(side=tk.LEFT, padx=6)
@@ -233,6 +128,10 @@ class VentaApp:
 
         # Actualizar precio al cambiar selección
         self.producto_cb.bind('<<ComboboxSelected>>', self.mostrar_precio_seleccionado)
+        self.producto_cb.bind('<KeyRelease>', self.mostrar_precio_seleccionado, add="+")
+        self.sugerencias_producto = ListaSugerencias(self.producto_cb, self.buscar_productos,
+                                                     al_elegir=lambda _p: self.mostrar_precio_seleccionado(),
+                                                     max_items=10)
         # inicializar precio si hay productos
         if productos:
             precio_inicial = PRODUCTOS_DISPONIBLES.get(productos[0], 0)
@@ -250,22 +149,10 @@ class VentaApp:
         frame_principal = tk.Frame(root)
         frame_principal.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
 
-        cols = ("producto", "cantidad", "precio", "subtotal")
-        self.tree = ttk.Treeview(frame_principal, columns=cols, show="headings", selectmode="browse")
-        # Encabezados clicables: permiten ordenar el carrito usando ordenamiento por selección
-        self.tree.heading("producto", text="Producto", command=lambda: self.on_header_click("producto"))
-        self.tree.heading("cantidad", text="Cantidad", command=lambda: self.on_header_click("cantidad"))
-        self.tree.heading("precio", text="P. Unitario", command=lambda: self.on_header_click("precio"))
-        self.tree.heading("subtotal", text="Subtotal", command=lambda: self.on_header_click("subtotal"))
-        self.tree.column("producto", width=300)
-        self.tree.column("cantidad", width=80, anchor=tk.CENTER)
-        self.tree.column("precio", width=100, anchor=tk.E)
-        self.tree.column("subtotal", width=100, anchor=tk.E)
-
-        vsb = ttk.Scrollbar(frame_principal, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=vsb.set)
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.pack(side=tk.LEFT, fill=tk.Y)
+        # Solo se crean filas para las líneas visibles; el resto vive en self.cart
+        self.vista_carrito = VistaCarritoVirtual(frame_principal, self.cart, self.on_header_click)
+        self.vista_carrito.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree = self.vista_carrito.tree
 
         # Panel derecho con total, QR y acciones
         frame_derecha = tk.Frame(frame_principal)
@@ -289,21 +176,40 @@ class VentaApp:
         
         # Referencia para mantener imagen en memoria
         self.qr_photo = None
+        # Genera la vista previa en segundo plano, con espera y caché por contenido
+        self.renderizador_qr = RenderizadorQR(root, self._mostrar_qr)
+        # sin qrcode instalado, un clic en el recuadro vuelve a buscarlo
+        self.label_qr.bind("<Button-1>", lambda e: self.reintentar_vista_qr())
 
         # Botones con estilos ttk
         self.btn_guardar = ttk.Button(frame_derecha, text="Guardar boleta", style='Primary.TButton', command=self.guardar_boleta)
         self.btn_guardar.pack(pady=8, fill=tk.X)
 
-        # Botón de mostrar boleta (abrir .txt y .png) y deshacer eliminación
+        # Botón de mostrar boleta (abrir .txt y .png), deshacer y rehacer
         self.btn_mostrar = ttk.Button(frame_derecha, text="Mostrar boleta", command=self.mostrar_boleta)
         self.btn_mostrar.pack(pady=4, fill=tk.X)
 
+        # Buscar boletas viejas por cliente, producto, fecha y total (índice invertido)
+        self.btn_buscar = ttk.Button(frame_derecha, text="Buscar boletas", command=self.abrir_busqueda)
+        self.btn_buscar.pack(pady=4, fill=tk.X)
+
+        # Recorrer las boletas anteriores por fecha (texto y QR se cargan en segundo plano)
+        self.btn_visor = ttk.Button(frame_derecha, text="Boletas anteriores", command=self.abrir_visor)
+        self.btn_visor.pack(pady=4, fill=tk.X)
+        self.miniaturas = CacheMiniaturas(BOLETAS_DIR / "miniaturas", archivo=ARCHIVO_BOLETAS)
+
         # Botón para abrir carpeta de boletas del día actual
         self.btn_abrir_carpeta = ttk.Button(frame_derecha, text="Abrir carpeta", command=self.abrir_carpeta_boletas)
         self.btn_abrir_carpeta.pack(pady=4, fill=tk.X)
 
-        self.btn_deshacer = ttk.Button(frame_derecha, text="Deshacer eliminación", command=self.deshacer_eliminacion)
+        # Reportes de ventas por día, producto o cliente (lee las boletas .txt)
+        self.btn_reportes = ttk.Button(frame_derecha, text="Reportes", command=self.abrir_reportes)
+        self.btn_reportes.pack(pady=4, fill=tk.X)
+
+        self.btn_deshacer = ttk.Button(frame_derecha, text="Deshacer", command=self.deshacer)
         self.btn_deshacer.pack(pady=4, fill=tk.X)
+        self.btn_rehacer = ttk.Button(frame_derecha, text="Rehacer", command=self.rehacer)
+        self.btn_rehacer.pack(pady=4, fill=tk.X)
 
         # Botón de eliminar con estilo Danger
         self.btn_eliminar = ttk.Button(frame_derecha, text="Eliminar seleccionado", style='Danger.TButton', command=self.eliminar_seleccionado)
@@ -313,17 +219,71 @@ class VentaApp:
         self.btn_limpiar.pack(pady=4, fill=tk.X)
 
 
-        # Estado para deshacer
-        self.ultimo_borrado = []
+        # Deshacer/rehacer: todos los cambios del carrito pasan por acá (con tope de memoria)
+        self.cambios = CambiosCarrito(self.cart)
+
+        # Cada cambio del carrito queda en un journal; si la caja se cerró con una
+        # venta a medio cargar (corte de luz, cuelgue), se recupera acá
+        self.journal_carrito = JournalCarrito(BOLETAS_DIR / f"carrito_{nucleo.TERMINAL}.journal")
+        self._recuperar_carrito()
+
+        # Los archivos de cada boleta se escriben en segundo plano; la venta queda
+        # asentada en el journal apenas se guarda
+        # (en modo cliente no hay nada que escribir localmente)
+        self.cola_guardado = None
+        if servidor is None:
+            self.cola_guardado = ColaPersistencia(BOLETAS_DIR / "pendientes.journal", root, self.boleta_escrita,
+                                                  escribir=guardar_boleta_en_disco)
+        root.protocol("WM_DELETE_WINDOW", self.cerrar)
+
+        # Cambios en lista_de_productos.txt con la caja abierta: el hilo que vigila
+        # el archivo solo avisa; la diferencia se aplica acá, en el hilo de Tk
+        self._cambios_catalogo = queue.SimpleQueue()
+        self.vigilante_catalogo = nucleo.vigilar_catalogo(self._cambios_catalogo.put)
+        root.after(500, self._revisar_catalogo)
 
         # Atajos de teclado
         root.bind('<Control-s>', lambda e: self.guardar_boleta())
         root.bind('<Delete>', lambda e: self.eliminar_seleccionado())
         root.bind('<Control-n>', lambda e: self.limpiar_carrito())
+        root.bind('<Control-z>', lambda e: self.deshacer())
+        root.bind('<Control-y>', lambda e: self.rehacer())
 
         # Inicializar visual
         self.actualizar_vista()
 
+    def _recuperar_carrito(self):
+        """Vuelve a cargar el carrito que quedó en el journal, con los precios del
+        catálogo actual (como al recargarlo en caliente), y avisa al cajero."""
+        with etapa("ui.recuperar_carrito"):
+            cliente = self.journal_carrito.recuperar(self.cart)
+            avisos = []
+            for linea in list(self.cart):
+                precio = PRODUCTOS_DISPONIBLES.get(linea.producto)
+                if precio is None:
+                    self.cart.eliminar(linea.id)
+                    avisos.append(f"{linea.producto}: ya no está en el catálogo, se quitó del carrito")
+                elif precio != linea.precio:
+                    avisos.append(f"{linea.producto}: ${linea.precio:.2f} -> ${precio:.2f}")
+                    self.cart.cambiar_precio(linea.id, precio)
+            if self.cart:
+                self._ids_linea = itertools.count(max(self.cart.ids()) + 1)
+            if cliente:
+                self.cliente_entry.insert(0, cliente)
+            self.journal_carrito.conectar(self.cart, cliente)
+        if self.cart:
+            if len(avisos) > 10:
+                avisos = avisos[:10] + [f"... y {len(avisos) - 10} más"]
+            mensaje = f"Se recuperó el carrito que había quedado abierto ({len(self.cart)} productos)."
+            if avisos:
+                mensaje += "\n\nCambió el catálogo desde entonces:\n\n" + "\n".join(avisos)
+            self.root.after(100, lambda: messagebox.showinfo("Carrito recuperado", mensaje))
+
+    def cliente_cambiado(self):
+        self.journal_carrito.anotar_cliente(self.cliente_entry.get())
+        self.actualizar_vista_qr()
+
+    @medido("ui.agregar_producto")
     def agregar_producto(self):
         producto = self.producto_cb.get()
         try:
@@ -340,34 +300,112 @@ class VentaApp:
             messagebox.showerror("Error", f"Producto '{producto}' no está disponible.")
             return
 
-        precio = PRODUCTOS_DISPONIBLES[producto]
-
-        # Buscar si el producto ya existe en el carrito
-        producto_encontrado = False
-        for i, (item_id, cant, prod) in enumerate(self.cart):
-            if prod == producto:
-                # Sumar la cantidad al producto existente
-                nueva_cantidad = cant + cantidad
-                subtotal = nueva_cantidad * precio
-                
-                # Actualizar el treeview
-                self.tree.item(item_id, values=(producto, nueva_cantidad, f"${precio:.2f}", f"${subtotal:.2f}"))
-                
-                # Actualizar el carrito
-                self.cart[i] = (item_id, nueva_cantidad, prod)
-                producto_encontrado = True
-                break
-        
-        if not producto_encontrado:
-            # Si no existe, agregarlo como nuevo
-            subtotal = cantidad * precio
-            item_id = self.tree.insert("", "end", values=(producto, cantidad, f"${precio:.2f}", f"${subtotal:.2f}"))
-            self.cart.append((item_id, cantidad, producto))
+        self._sumar_al_carrito(producto, cantidad)
         
         self.cantidad_entry.delete(0, tk.END)
         self.cantidad_entry.insert(0, "1")
         self.actualizar_vista()
 
+    def _sumar_al_carrito(self, producto, cantidad):
+        """Suma la cantidad a la línea del producto (O(1)) o crea una línea nueva."""
+        linea = self.cart.linea_de_producto(producto)
+        if linea is not None:
+            # Sumar la cantidad al producto existente
+            linea = self.cambios.cambiar_cantidad(linea.id, linea.cantidad + cantidad)
+        else:
+            # Si no existe, agregarlo como nuevo (al final del carrito)
+            linea = self.cambios.agregar(next(self._ids_linea), producto, cantidad, PRODUCTOS_DISPONIBLES[producto])
+            self.vista_carrito.mostrar_final()
+        return linea
+
+    @medido("ui.buscar_productos")
+    def buscar_productos(self, texto):
+        """Busca en el índice (o en la categoría elegida) y deja las coincidencias también en el desplegable."""
+        if self._productos_categoria is None:
+            resultados = indice_productos().buscar(texto, 15)
+        else:
+            terminos = normalizar(texto).split()
+            resultados = list(itertools.islice(
+                (p for nombre, p in self._productos_categoria if all(t in nombre for t in terminos)), 15))
+        self.producto_cb.configure(values=resultados)
+        return resultados
+
+    def _listar_categorias(self):
+        """Arma las opciones del selector (el árbol, con sangría) al desplegarlo."""
+        opciones, self._rutas_categoria = [TODAS_LAS_CATEGORIAS], [None]
+        for profundidad, categoria in categorias_productos().recorrer():
+            opciones.append("   " * profundidad + categoria.nombre)
+            self._rutas_categoria.append(categoria.ruta)
+        self.categoria_cb.configure(values=opciones)
+
+    def _cargar_categoria(self):
+        indice = self.categoria_cb.current()
+        ruta = self._rutas_categoria[indice] if 0 <= indice < len(self._rutas_categoria) else None
+        if ruta is None:
+            self._productos_categoria = None
+        else:
+            self._productos_categoria = [(normalizar(p), p) for p in categorias_productos().productos(ruta)]
+
+    @medido("ui.elegir_categoria")
+    def elegir_categoria(self):
+        """Muestra en el desplegable los productos de la categoría elegida (o los primeros de todas)."""
+        self._cargar_categoria()
+        if self._productos_categoria is None:
+            productos = self.buscar_productos("")
+        else:
+            productos = [p for _nombre, p in self._productos_categoria]
+            self.producto_cb.configure(values=productos)
+        self.producto_cb.set(productos[0] if productos else "")
+        self.mostrar_precio_seleccionado()
+
+    def _revisar_catalogo(self):
+        while True:
+            try:
+                diferencia = self._cambios_catalogo.get_nowait()
+            except queue.Empty:
+                break
+            self.aplicar_cambios_catalogo(diferencia)
+        self.root.after(500, self._revisar_catalogo)
+
+    @medido("ui.cambios_catalogo")
+    def aplicar_cambios_catalogo(self, diferencia):
+        """Aplica al catálogo, al desplegable y al carrito solo lo que cambió.
+
+        Las líneas del carrito pasan al precio nuevo (la boleta se arma con los
+        precios del catálogo) y las de productos que ya no existen se quitan; en
+        los dos casos se avisa al cajero. El historial de deshacer se descarta solo
+        si alguno de esos productos está en el carrito o en un cambio anotado,
+        porque guarda sus precios viejos (o líneas que ya no se pueden devolver)."""
+        nucleo.aplicar_cambios_catalogo(diferencia)
+        avisos = []
+        tocados = diferencia.precios.keys() | diferencia.quitados.keys()
+        # Antes de tocar el carrito: después ya no están las líneas quitadas
+        olvidar = (any(self.cart.linea_de_producto(p) is not None for p in tocados)
+                   or self.cambios.menciona(tocados))
+        for producto, (antes, despues) in diferencia.precios.items():
+            linea = self.cart.linea_de_producto(producto)
+            if linea is not None:
+                self.cart.cambiar_precio(linea.id, despues)
+                avisos.append(f"{producto}: ${antes:.2f} -> ${despues:.2f}")
+        for producto in diferencia.quitados:
+            linea = self.cart.linea_de_producto(producto)
+            if linea is not None:
+                self.cart.eliminar(linea.id)
+                avisos.append(f"{producto}: ya no está en el catálogo, se quitó del carrito")
+        if olvidar:
+            self.cambios.olvidar()
+
+        if self._productos_categoria is not None:
+            self._cargar_categoria()
+        self.buscar_productos(self.producto_cb.get())
+        self.mostrar_precio_seleccionado()
+        if avisos:
+            self.actualizar_vista()
+            if len(avisos) > 10:
+                avisos = avisos[:10] + [f"... y {len(avisos) - 10} más"]
+            messagebox.showwarning("Catálogo actualizado",
+                                   "Cambió el catálogo y se actualizó el carrito:\n\n" + "\n".join(avisos))
+
     def mostrar_precio_seleccionado(self, event=None):
         producto = self.producto_cb.get()
         precio = PRODUCTOS_DISPONIBLES.get(producto)
@@ -376,106 +414,84 @@ class VentaApp:
         else:
             self.precio_var.set(f"P. Unitario: ${precio:.2f}")
 
+    @medido("ui.actualizar_vista")
     def actualizar_vista(self):
-        # recalcular total desde los elementos del treeview (o desde self.cart)
-        total = 0
-        for _id, cantidad, producto in self.cart:
-            precio = PRODUCTOS_DISPONIBLES.get(producto, 0)
-            total += cantidad * precio
+        # el total lo mantiene el carrito de forma incremental
+        total = self.cart.total
 
         self.label_total.config(text=f"TOTAL: ${total:.2f}")
+        # redibujar solo las filas visibles del carrito
+        with etapa("ui.redibujar_carrito"):
+            self.vista_carrito.refrescar()
         
         # Actualizar vista previa del QR con el contenido actual
         self.actualizar_vista_qr()
 
+    @medido("ui.actualizar_vista_qr")
     def actualizar_vista_qr(self):
-        """Actualiza la vista previa del QR en la interfaz principal."""
+        """Pide una vista previa del QR; se genera en segundo plano tras una breve espera."""
         cliente = self.cliente_entry.get().strip()
         
         # Si no hay cliente o no hay productos, mostrar mensaje
         if not cliente or not self.cart:
+            self.renderizador_qr.cancelar()
             self.label_qr.config(image='', text="El QR aparecerá\naquí cuando\nguardes", fg="#999")
             self.qr_photo = None
             return
-        
-        # Generar contenido de boleta actual
-        try:
-            productos_para_qr = [(cantidad, producto) for _id, cantidad, prod in self.cart for producto in [prod]]
-            total = sum(cantidad * PRODUCTOS_DISPONIBLES[producto] for cantidad, producto in productos_para_qr)
-            fecha = datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")
-            contenido = generar_contenido_boleta(cliente, productos_para_qr, total, fecha)
-            
-            # Generar código QR
-            if qrcode is not None:
-                qr = qrcode.make(contenido)
-                # Redimensionar a 190x190 para que quepa en el frame
-                qr_img = qr.resize((190, 190))
-                
-                # Convertir a PhotoImage
-                if Image and ImageTk:
-                    qr_photo = ImageTk.PhotoImage(qr_img)
-                    self.label_qr.config(image=qr_photo, text="")
-                    self.qr_photo = qr_photo  # Mantener referencia
-        except Exception as e:
+
+        if nucleo.MODO_QR == "referencia":
+            # El QR de referencia lleva el nombre de la boleta, que recién se asigna al guardar
+            self.renderizador_qr.cancelar()
+            self.label_qr.config(image='', text="QR de referencia:\nse genera\nal guardar", fg="#999")
+            self.qr_photo = None
+        elif self.renderizador_qr.disponible:
+            self.renderizador_qr.solicitar(self._preparar_contenido_qr)
+        else:
+            self.label_qr.config(image='', text="Vista previa\nno disponible\n(clic para reintentar)", fg="#999")
+            self.qr_photo = None
+
+    def reintentar_vista_qr(self):
+        if not self.renderizador_qr.disponible:
+            self.renderizador_qr.reintentar()
+            self.actualizar_vista_qr()
+
+    def _preparar_contenido_qr(self):
+        """Toma una foto del carrito actual: (clave de caché, generador del contenido)."""
+        cliente = self.cliente_entry.get().strip()
+        productos_para_qr = self.cart.productos()
+        total = self.cart.total
+        fecha = datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")
+        # La fecha queda fuera de la clave: es una vista previa y así se reutiliza el QR.
+        # El modo sí va: con otro modo el mismo carrito da otro QR
+        clave = clave_contenido(nucleo.MODO_QR, cliente, productos_para_qr, total)
+        nombre = obtener_nombre_boleta(cliente, fecha)
+        return clave, lambda: payload_qr(generar_contenido_boleta(cliente, productos_para_qr, total, fecha),
+                                         nucleo.MODO_QR, nombre)
+
+    def _mostrar_qr(self, qr_photo, error):
+        """Recibe el QR generado en segundo plano (siempre en el hilo de Tk)."""
+        if error is not None or qr_photo is None:
             self.label_qr.config(image='', text="Error al\ngenerar QR", fg="#999")
             self.qr_photo = None
+            return
+        self.label_qr.config(image=qr_photo, text="")
+        self.qr_photo = qr_photo  # Mantener referencia
 
+    @medido("ui.on_header_click")
     def on_header_click(self, col):
-        """Ordena el carrito por la columna seleccionada usando ordenamiento por selección.
+        """Ordena el carrito por la columna seleccionada.
         Alterna la dirección en cada click (ascendente/descendente).
         """
         # obtener dirección actual (True = ascendente)
         asc = self.sort_directions.get(col, True)
 
-        # construir lista de entradas (cantidad, producto)
-        entradas = [(cantidad, product) for _id, cantidad, product in self.cart]
-
-        def key_func(entr):    #Se usa la función como clave de ordenamiento
-            cantidad, producto = entr
-            if col == "producto":
-                return str(producto).lower()
-            elif col == "cantidad":
-                try:
-                    return int(cantidad)
-                except Exception:
-                    try:
-                        return int(float(cantidad))
-                    except Exception:
-                        return 0
-            elif col == "precio":
-                return PRODUCTOS_DISPONIBLES.get(producto, 0)
-            elif col == "subtotal":
-                return cantidad * PRODUCTOS_DISPONIBLES.get(producto, 0)
-            return 0
-
-        # selection sort sobre la lista 
-        n = len(entradas)
-        for i in range(n):
-            sel = i
-            for j in range(i + 1, n):
-                a = key_func(entradas[j])
-                b = key_func(entradas[sel])
-                if asc:
-                    if a < b:
-                        sel = j
-                else:
-                    if a > b:
-                        sel = j
-            if sel != i:
-                entradas[i], entradas[sel] = entradas[sel], entradas[i]
+        # ordenar el modelo (una clave por línea, orden estable)
+        self.cambios.ordenar(col, asc)
 
         # alternar dirección para el próximo click
         self.sort_directions[col] = not asc
 
-        # reconstruir el Treeview y self.cart en el nuevo orden
-        for it in self.tree.get_children():
-            self.tree.delete(it)
-        self.cart = []
-        for cantidad, producto in entradas:
-            precio = PRODUCTOS_DISPONIBLES.get(producto, 0)
-            subtotal = cantidad * precio
-            item_id = self.tree.insert("", "end", values=(producto, cantidad, f"${precio:.2f}", f"${subtotal:.2f}"))
-            self.cart.append((item_id, cantidad, producto))
+        # la vista virtual vuelve a llenar las filas visibles en el nuevo orden
         self.actualizar_vista()
 
     def guardar_boleta(self):
@@ -494,43 +510,108 @@ class VentaApp:
             return
 
         # calcular total desde self.cart y preparar lista de productos (cantidad, producto)
-        productos_para_guardar = [(cantidad, producto) for _id, cantidad, product in self.cart for producto in [product]]
-        total = sum(cantidad * PRODUCTOS_DISPONIBLES[producto] for cantidad, producto in productos_para_guardar)
-        try:
-            boleta_nombre, contenido = registrar_boleta(cliente, productos_para_guardar, total)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo guardar la boleta: {e}")
-            return
+        productos_para_guardar = self.cart.productos()
+        total = self.cart.total
+        # se mide hasta acá: el resto espera al cajero en el mensaje de confirmación
+        with etapa("ui.guardar_boleta"):
+            try:
+                if self.servidor is not None:
+                    # el servidor guarda la boleta y el cliente; responde cuando ya está en disco
+                    boleta_nombre = self.servidor.registrar_venta(cliente, productos_para_guardar)["nombre"]
+                    nucleo.ULTIMA_BOLETA = BOLETAS_DIR / boleta_nombre
+                else:
+                    boleta_nombre, contenido = registrar_boleta(cliente, productos_para_guardar, total,
+                                                                self.cola_guardado)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo guardar la boleta: {e}")
+                return
+            # La venta ya está guardada: si el programa se corta con el mensaje de
+            # abajo abierto, el carrito no tiene que volver a aparecer al abrir
+            self.journal_carrito.reiniciar()
 
-        # Guardar cliente en historial
-        guardar_cliente(cliente)
+            # Guardar cliente en historial
+            if self.servidor is None:
+                with etapa("boleta.cliente"):
+                    guardar_cliente(cliente)
 
         # mostrar ruta completa en el mensaje
         ruta_relativa = ""
-        if ULTIMA_BOLETA:
+        if nucleo.ULTIMA_BOLETA:
             try:
-                ruta_relativa = str(ULTIMA_BOLETA.relative_to(Path.cwd()))
+                ruta_relativa = str(nucleo.ULTIMA_BOLETA.relative_to(Path.cwd()))
             except Exception:
-                ruta_relativa = str(ULTIMA_BOLETA)
+                ruta_relativa = str(nucleo.ULTIMA_BOLETA)
         
         msg = f"Boleta guardada como:\n{boleta_nombre}\n\nRuta: {ruta_relativa}"
         messagebox.showinfo("Boleta guardada", msg)
         
-        # Limpiar carrito
+        # Limpiar carrito (la venta ya quedó guardada: no se puede deshacer)
         self.limpiar_carrito()
+        self.cambios.olvidar()
+
+    def boleta_escrita(self, ruta, error):
+        """Aviso de la cola de guardado cuando terminó de escribir una boleta."""
+        if error is not None:
+            messagebox.showerror("Error", f"No se pudo escribir la boleta {ruta.name}: {error}\n\n"
+                                          "La venta quedó registrada: se va a reintentar, y si sigue "
+                                          "fallando, la próxima vez que se abra la caja.")
+
+    def cerrar(self):
+        """Termina de escribir las boletas pendientes antes de cerrar la ventana."""
+        self.vigilante_catalogo.detener()
+        self.journal_carrito.cerrar()
+        if self.cola_guardado is not None:
+            self.cola_guardado.cerrar()
+        HISTORIAL_CLIENTES.cerrar()
+        self.root.destroy()
+
+    def sugerir_clientes(self, texto):
+        """Clientes para el autocompletado: del historial local o del servidor."""
+        if self.servidor is None:
+            return HISTORIAL_CLIENTES.sugerencias(texto)
+        try:
+            return self.servidor.clientes(texto)
+        except (OSError, ValueError):
+            return []
 
+    def _boleta_disponible(self, ruta):
+        if self.servidor is None:
+            return boleta_disponible(ruta)
+        try:
+            return self.servidor.boleta(ruta.name) is not None
+        except (OSError, ValueError):
+            return False
+
+    def _leer_boleta(self, ruta):
+        if self.servidor is None:
+            return leer_contenido_boleta(ruta)
+        registro = self.servidor.boleta(ruta.name)
+        if registro is None:
+            raise FileNotFoundError(ruta.name)
+        return registro["contenido"]
+
+    def _leer_qr(self, ruta):
+        if self.servidor is None:
+            return leer_qr_boleta(ruta)
+        # en modo cliente los PNG quedan en el servidor
+        try:
+            return ruta.with_suffix(".png").read_bytes()
+        except OSError:
+            return None
+
+    @medido("ui.limpiar_carrito")
     def limpiar_carrito(self):
         # limpiar nombre del cliente
         self.cliente_entry.delete(0, tk.END)
+        self.journal_carrito.anotar_cliente("")
         
-        # limpiar treeview y carrito
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self.cart = []
+        # limpiar carrito (la vista virtual se vacía al refrescar; se puede deshacer)
+        self.cambios.vaciar()
+        self.vista_carrito.limpiar_seleccion()
         self.actualizar_vista()
 
     def eliminar_seleccionado(self):
-        sel = self.tree.selection()
+        sel = self.vista_carrito.seleccion()
         if not sel:
             messagebox.showerror("Error", "No hay ningún item seleccionado.")
             return
@@ -539,49 +620,33 @@ class VentaApp:
         if not messagebox.askyesno("Confirmar", "¿Eliminar los items seleccionados?"):
             return
 
-        borrado = []
-        for item_id in sel:
-            try:
-                vals = self.tree.item(item_id, 'values')
-                # guardar valores para deshacer: (values)
-                borrado.append((vals, item_id))
-                self.tree.delete(item_id)
-            except Exception:
-                pass
-            # borrar del carrito por item id
-            self.cart = [entry for entry in self.cart if entry[0] != item_id]
-
-        # almacenar para posible deshacer (solo los valores)
-        if borrado:
-            # almacenar solo la lista de valores
-            self.ultimo_borrado.append([v for v, _id in borrado])
+        with etapa("ui.eliminar_seleccionado"):
+            # borrar del carrito por id de línea; queda anotado para deshacer
+            self.cambios.eliminar(sel)
+            self.vista_carrito.limpiar_seleccion()
+            self.actualizar_vista()
 
+    @medido("ui.deshacer")
+    def deshacer(self):
+        if self.cambios.deshacer() is None:
+            messagebox.showinfo("Deshacer", "No hay acciones para deshacer.")
+            return
+        self.vista_carrito.limpiar_seleccion()
         self.actualizar_vista()
 
-    def deshacer_eliminacion(self):
-        if not self.ultimo_borrado:
-            messagebox.showinfo("Deshacer", "No hay acciones para deshacer.")
+    @medido("ui.rehacer")
+    def rehacer(self):
+        if self.cambios.rehacer() is None:
+            messagebox.showinfo("Rehacer", "No hay acciones para rehacer.")
             return
-        items = self.ultimo_borrado.pop()
-        # items es una lista de tuplas val
-        for vals in items:
-            #  (producto, cantidad, precio_str, subtotal_str)
-            producto, cantidad, precio_str, subtotal_str = vals
-            try:
-                cantidad_int = int(cantidad)
-            except Exception:
-                try:
-                    cantidad_int = int(float(cantidad))
-                except Exception:
-                    cantidad_int = 1
-            item_id = self.tree.insert("", "end", values=(producto, cantidad_int, precio_str, subtotal_str))
-            self.cart.append((item_id, cantidad_int, producto))
+        self.vista_carrito.limpiar_seleccion()
         self.actualizar_vista()
 
-    def mostrar_boleta(self):
-        # Mostrar la boleta y el código QR en una ventana
-        global ULTIMA_BOLETA
-        if ULTIMA_BOLETA and ULTIMA_BOLETA.exists():
+    @medido("ui.mostrar_boleta")
+    def mostrar_boleta(self, ruta=None):
+        # Mostrar la boleta (la última, o la que se eligió en la búsqueda) y el código QR en una ventana
+        ULTIMA_BOLETA = ruta or nucleo.ULTIMA_BOLETA
+        if ULTIMA_BOLETA and self._boleta_disponible(ULTIMA_BOLETA):
             # Crear ventana emergente
             ventana_boleta = tk.Toplevel(self.root)
             ventana_boleta.title("Boleta y Código QR")
@@ -611,9 +676,8 @@ class VentaApp:
             
             # Cargar contenido de la boleta
             try:
-                with open(ULTIMA_BOLETA, "r", encoding="utf-8") as f:
-                    contenido = f.read()
-                    caja_boleta.insert(tk.END, contenido)
+                contenido = self._leer_boleta(ULTIMA_BOLETA)
+                caja_boleta.insert(tk.END, contenido)
             except Exception as e:
                 caja_boleta.insert(tk.END, f"Error al leer boleta: {e}")
             
@@ -626,10 +690,12 @@ class VentaApp:
             tk.Label(frame_der, text="Código QR", font=("Arial", 10, "bold")).pack()
             
             # Intenta mostrar el código QR
-            ruta_qr = ULTIMA_BOLETA.with_suffix('.png')
-            if ruta_qr.exists() and Image and ImageTk:
+            # (del .png exportado o, si ya se archivó, del segmento)
+            datos_qr = self._leer_qr(ULTIMA_BOLETA)
+            Image, ImageTk = importar_pil() if datos_qr is not None else (None, None)
+            if Image and ImageTk:
                 try:
-                    img = Image.open(ruta_qr).resize((350, 350))
+                    img = Image.open(io.BytesIO(datos_qr)).resize((350, 350))
                     qr_img = ImageTk.PhotoImage(img)
                     
                     etiqueta_qr = tk.Label(frame_der, image=qr_img)
@@ -644,8 +710,10 @@ class VentaApp:
             frame_botones = tk.Frame(ventana_boleta)
             frame_botones.pack(fill=tk.X, padx=10, pady=5)
             
+            # una boleta archivada ya no tiene .txt suelto para abrir
             tk.Button(frame_botones, text="Abrir archivo", 
                      command=lambda: abrir_archivo(ULTIMA_BOLETA),
+                     state=tk.NORMAL if ULTIMA_BOLETA.exists() else tk.DISABLED,
                      bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
             
             tk.Button(frame_botones, text="Cerrar", 
@@ -665,7 +733,47 @@ class VentaApp:
             messagebox.showinfo("Carpeta de boletas", 
                               f"La carpeta no existe aún.\nSe creará cuando guardes la primera boleta en:\n{BOLETAS_DIR}")
 
+    def buscar_boletas(self, texto, desde=None, hasta=None, total_min=None, total_max=None, limite=100, antes=None):
+        """Boletas que coinciden: del índice local o del servidor."""
+        if self.servidor is None:
+            return INDICE_BOLETAS.buscar(texto, desde, hasta, total_min, total_max, limite, antes)
+        return self.servidor.buscar(texto, desde, hasta, total_min, total_max, limite, antes)
+
+    def _preparar_indice(self):
+        """Si el índice local todavía no cargó las boletas viejas, algo para hacerlo en segundo plano."""
+        if self.servidor is None and not INDICE_BOLETAS.reconstruido():
+            return lambda: INDICE_BOLETAS.reconstruir(ALMACEN, BOLETAS_DIR, ARCHIVO_BOLETAS)
+        return None
+
+    def abrir_busqueda(self):
+        """Abre la ventana de búsqueda."""
+        VentanaBusqueda(self.root, self.buscar_boletas, lambda nombre: self.mostrar_boleta(BOLETAS_DIR / nombre),
+                        self._preparar_indice())
+
+    def abrir_visor(self):
+        """Abre el visor de boletas anteriores, de la más nueva a la más vieja."""
+        def ruta_qr(nombre):
+            # en modo cliente los PNG quedan en el servidor
+            return (BOLETAS_DIR / nombre).with_suffix(".png") if self.servidor is None else None
+        VisorBoletas(self.root, lambda antes, limite: self.buscar_boletas("", limite=limite, antes=antes),
+                     lambda nombre: self._leer_boleta(BOLETAS_DIR / nombre), ruta_qr, self.miniaturas,
+                     self._preparar_indice())
+
+    def abrir_reportes(self):
+        """Abre la ventana de reportes sobre las boletas .txt de BOLETAS_DIR (y las archivadas)."""
+        VentanaReportes(self.root, BOLETAS_DIR, ARCHIVO_BOLETAS, ALMACEN)
+
 if __name__ == "__main__":
+    # TPI_METRICAS=1 guarda tiempos por etapa en metricas.log (ver metricas.py)
+    metricas.configurar_desde_entorno()
+    # TPI_SERVIDOR=http://127.0.0.1:8765 (o --servidor URL) usa un servidor_ventas.py compartido
+    url_servidor = os.environ.get("TPI_SERVIDOR")
+    if "--servidor" in sys.argv[1:-1]:
+        url_servidor = sys.argv[sys.argv.index("--servidor") + 1]
+    servidor = None
+    if url_servidor:
+        from cliente_ventas import ClienteVentas
+        servidor = ClienteVentas(url_servidor)
     root = tk.Tk()
-    app = VentaApp(root)
+    app = VentaApp(root, servidor)
     root.mainloop()
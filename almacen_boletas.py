@@ -0,0 +1,154 @@
+"""Almacén local de boletas en SQLite.
+
+Cada venta se guarda como un registro estructurado (cliente, fecha, total,
+líneas y el texto de la boleta) en un único archivo boletas.sqlite3, con
+índices por cliente, fecha y total. Los .txt/.png sueltos pasan a ser una
+exportación opcional.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS boletas (
+    id        INTEGER PRIMARY KEY,
+    nombre    TEXT NOT NULL UNIQUE,
+    cliente   TEXT NOT NULL,
+    fecha     TEXT NOT NULL,          -- ISO 8601, ordenable
+    total     REAL NOT NULL,
+    contenido TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lineas (
+    boleta_id INTEGER NOT NULL REFERENCES boletas(id) ON DELETE CASCADE,
+    cantidad  INTEGER NOT NULL,
+    producto  TEXT NOT NULL,
+    precio    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_boletas_cliente ON boletas(cliente COLLATE NOCASE, fecha);
+CREATE INDEX IF NOT EXISTS idx_boletas_fecha ON boletas(fecha);
+CREATE INDEX IF NOT EXISTS idx_boletas_total ON boletas(total);
+CREATE INDEX IF NOT EXISTS idx_lineas_boleta ON lineas(boleta_id);
+"""
+
+COLUMNAS = ("id", "nombre", "cliente", "fecha", "total", "contenido")
+
+
+class AlmacenBoletas:
+    def __init__(self, ruta_db: Path, durable=False):
+        """Con `durable` cada commit espera el fsync (synchronous=FULL); conviene
+        cuando se guardan varias boletas por transacción (ver guardar_varias)."""
+        self.ruta_db = Path(ruta_db)
+        # Una sola conexión compartida; los hilos de guardado la usan con el lock
+        self._conexion = sqlite3.connect(str(self.ruta_db), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+            self._conexion.execute("PRAGMA foreign_keys=ON")
+            self._conexion.executescript(ESQUEMA)
+            if self._conexion.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # Antes no se activaban las claves foráneas y al reemplazar una boleta
+                # quedaban sus líneas viejas sueltas: se borran una sola vez
+                with self._conexion:
+                    self._conexion.execute(
+                        "DELETE FROM lineas WHERE NOT EXISTS (SELECT 1 FROM boletas WHERE id = lineas.boleta_id)")
+                    self._conexion.execute("PRAGMA user_version=1")
+
+    def guardar(self, nombre, cliente, fecha, total, lineas, contenido):
+        """Guarda una boleta. `lineas` es una lista de (cantidad, producto, precio).
+
+        Si ya existe una boleta con ese nombre (p. ej. al reprocesar el journal)
+        se reemplaza. Devuelve el id.
+        """
+        with self._lock, self._conexion:
+            return self._insertar(nombre, cliente, fecha, total, lineas, contenido)
+
+    def guardar_varias(self, boletas):
+        """Guarda varias boletas (diccionarios con las claves de `guardar`) en una
+        sola transacción: un solo commit, y un solo fsync, para todo el lote."""
+        with self._lock, self._conexion:
+            return [self._insertar(b["nombre"], b["cliente"], b["fecha"], b["total"], b["lineas"], b["contenido"])
+                    for b in boletas]
+
+    def _insertar(self, nombre, cliente, fecha, total, lineas, contenido):
+        # las líneas también se borran a mano, por si la base se abre sin foreign_keys
+        self._conexion.execute("DELETE FROM lineas WHERE boleta_id = (SELECT id FROM boletas WHERE nombre = ?)",
+                               (nombre,))
+        self._conexion.execute("DELETE FROM boletas WHERE nombre = ?", (nombre,))
+        cursor = self._conexion.execute(
+            "INSERT INTO boletas (nombre, cliente, fecha, total, contenido) VALUES (?, ?, ?, ?, ?)",
+            (nombre, cliente, fecha, total, contenido))
+        boleta_id = cursor.lastrowid
+        self._conexion.executemany(
+            "INSERT INTO lineas (boleta_id, cantidad, producto, precio) VALUES (?, ?, ?, ?)",
+            [(boleta_id, cantidad, producto, precio) for cantidad, producto, precio in lineas])
+        return boleta_id
+
+    def _una(self, where, parametros):
+        with self._lock:
+            fila = self._conexion.execute(
+                f"SELECT {', '.join(COLUMNAS)} FROM boletas WHERE {where}", parametros).fetchone()
+        return dict(zip(COLUMNAS, fila)) if fila else None
+
+    def obtener(self, boleta_id):
+        return self._una("id = ?", (boleta_id,))
+
+    def obtener_por_nombre(self, nombre):
+        return self._una("nombre = ?", (nombre,))
+
+    def lineas(self, boleta_id):
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT cantidad, producto, precio FROM lineas WHERE boleta_id = ? ORDER BY rowid",
+                (boleta_id,)).fetchall()
+
+    def buscar(self, cliente=None, desde=None, hasta=None, total_min=None, total_max=None, limite=100):
+        """Boletas que cumplen los filtros, de la más nueva a la más vieja (sin el contenido)."""
+        condiciones, parametros = [], []
+        if cliente:
+            condiciones.append("cliente = ? COLLATE NOCASE")
+            parametros.append(cliente)
+        if desde:
+            condiciones.append("fecha >= ?")
+            parametros.append(desde)
+        if hasta:
+            condiciones.append("fecha < ?")
+            parametros.append(hasta)
+        if total_min is not None:
+            condiciones.append("total >= ?")
+            parametros.append(total_min)
+        if total_max is not None:
+            condiciones.append("total <= ?")
+            parametros.append(total_max)
+        where = " AND ".join(condiciones) or "1"
+        with self._lock:
+            filas = self._conexion.execute(
+                f"SELECT id, nombre, cliente, fecha, total FROM boletas WHERE {where} "
+                "ORDER BY fecha DESC LIMIT ?", (*parametros, limite)).fetchall()
+        return [dict(zip(COLUMNAS[:5], fila)) for fila in filas]
+
+    def todas(self):
+        """Todas las boletas con sus líneas (sin el contenido), para reconstruir índices."""
+        return self.desde(0)
+
+    def desde(self, boleta_id):
+        """Boletas con id mayor a `boleta_id`, con sus líneas y sin el contenido, por id.
+        Una boleta reemplazada tiene id nuevo, así que también aparece."""
+        with self._lock:
+            boletas = {fila[0]: dict(zip(COLUMNAS[:5], fila), lineas=[]) for fila in self._conexion.execute(
+                "SELECT id, nombre, cliente, fecha, total FROM boletas WHERE id > ? ORDER BY id", (boleta_id,))}
+            for boleta_de_la_linea, cantidad, producto, precio in self._conexion.execute(
+                    "SELECT boleta_id, cantidad, producto, precio FROM lineas WHERE boleta_id > ? ORDER BY rowid",
+                    (boleta_id,)):
+                boleta = boletas.get(boleta_de_la_linea)
+                if boleta is not None:   # líneas sueltas de una boleta reemplazada
+                    boleta["lineas"].append((cantidad, producto, precio))
+        return list(boletas.values())
+
+    def cantidad(self):
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM boletas").fetchone()[0]
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
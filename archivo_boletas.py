@@ -0,0 +1,278 @@
+"""Archivo comprimido de boletas viejas.
+
+Cada boleta exportada son dos archivos chicos en boletas/ (.txt y .png) que se
+acumulan para siempre: miles de bloques e inodos, y copias de seguridad que
+tardan horas. `archivar` junta los de más de N días en segmentos .zip (el .txt
+comprimido, el PNG tal cual porque ya viene comprimido) en boletas/archivo/ y
+borra los originales.
+
+Al lado de los segmentos queda un índice SQLite con, por cada archivo, el
+segmento y el byte donde empiezan sus datos: leer una boleta archivada es un
+seek y un read del tamaño comprimido, sin abrir el directorio del zip ni
+descomprimir el resto. leer_contenido_boleta y el visor lo usan cuando el
+archivo ya no está en boletas/.
+
+El orden hace que un corte de luz no pierda nada: primero se escribe el segmento
+entero (temporal + os.replace), después se anota en el índice en una
+transacción y recién al final se borran los originales. Un segmento que no
+llegó al índice se borra en la corrida siguiente y sus archivos se vuelven a
+archivar; uno que sí llegó pero no borró los originales los borra la siguiente.
+
+Uso:
+    python archivo_boletas.py --dias 90 [--carpeta boletas]
+    python archivo_boletas.py --extraer NOMBRE [--a carpeta_destino]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS segmentos (
+    id      INTEGER PRIMARY KEY,
+    archivo TEXT NOT NULL UNIQUE,
+    creado  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS miembros (
+    nombre     TEXT PRIMARY KEY,
+    segmento   INTEGER NOT NULL,
+    inicio     INTEGER NOT NULL,      -- byte del segmento donde empiezan los datos
+    comprimido INTEGER NOT NULL,
+    tamanio    INTEGER NOT NULL,
+    metodo     INTEGER NOT NULL,      -- zipfile.ZIP_STORED o ZIP_DEFLATED
+    crc        INTEGER NOT NULL,
+    mtime_ns   INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_miembros_segmento ON miembros(segmento);
+"""
+
+# Cabecera local de cada archivo dentro del zip (APPNOTE 4.3.7)
+CABECERA_LOCAL = struct.Struct("<4s5H3L2H")
+FIRMA_LOCAL = b"PK\x03\x04"
+
+# Archivos por segmento: acota lo que se reescribe si una corrida se corta
+POR_SEGMENTO = 5_000
+
+
+def _es_boleta(contenido):
+    from reportes import parsear_boleta
+    try:
+        return parsear_boleta(contenido.decode("utf-8")) is not None
+    except (UnicodeDecodeError, ValueError):
+        return False
+
+
+class ArchivoBoletas:
+    def __init__(self, carpeta_boletas="boletas"):
+        self.boletas = Path(carpeta_boletas)
+        self.carpeta = self.boletas / "archivo"
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        # Se lee desde el hilo de Tk y desde los hilos del visor y de los reportes
+        self._conexion = sqlite3.connect(str(self.carpeta / "indice.sqlite3"), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexion.executescript(ESQUEMA)
+
+    # ---------- lectura ----------
+
+    def info(self, nombre):
+        """(segmento, inicio, comprimido, tamaño, método, crc, mtime_ns) o None si no está archivado."""
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT s.archivo, m.inicio, m.comprimido, m.tamanio, m.metodo, m.crc, m.mtime_ns "
+                "FROM miembros m JOIN segmentos s ON s.id = m.segmento WHERE m.nombre = ?", (nombre,)).fetchone()
+
+    def leer(self, nombre):
+        """Bytes de un archivo archivado, o None si no está en el archivo."""
+        fila = self.info(nombre)
+        if fila is None:
+            return None
+        segmento, inicio, comprimido, tamanio, metodo, crc, _mtime = fila
+        with open(self.carpeta / segmento, "rb") as f:
+            f.seek(inicio)
+            datos = f.read(comprimido)
+        if metodo == zipfile.ZIP_DEFLATED:
+            datos = zlib.decompress(datos, -zlib.MAX_WBITS)
+        if len(datos) != tamanio or zlib.crc32(datos) != crc:
+            raise OSError(f"{nombre}: datos dañados en {segmento}")
+        return datos
+
+    def contiene(self, nombres):
+        """Los de `nombres` que están archivados."""
+        encontrados = set()
+        nombres = list(nombres)
+        with self._lock:
+            for desde in range(0, len(nombres), 500):
+                parte = nombres[desde:desde + 500]
+                encontrados.update(fila[0] for fila in self._conexion.execute(
+                    f"SELECT nombre FROM miembros WHERE nombre IN ({', '.join('?' * len(parte))})", parte))
+        return encontrados
+
+    def nombres_desde(self, segmento=0):
+        """(segmento, nombre, tamaño, mtime_ns) de lo archivado en segmentos posteriores a `segmento`,
+        para leer solo lo nuevo desde la última vez."""
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT segmento, nombre, tamanio, mtime_ns FROM miembros WHERE segmento > ? "
+                "ORDER BY segmento", (segmento,)).fetchall()
+
+    def cantidad(self):
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM miembros").fetchone()[0]
+
+    # ---------- archivado ----------
+
+    def archivar(self, dias=90, ahora=None, por_segmento=POR_SEGMENTO):
+        """Pasa a segmentos las boletas (.txt y su .png) modificadas hace más de `dias` días.
+
+        Solo se archivan los .txt que son boletas (secuencia_*.txt y otros quedan).
+        Devuelve cuántos archivos se archivaron.
+        """
+        self._limpiar()
+        limite = (ahora or time.time()) - dias * 86_400
+        candidatos = []
+        with os.scandir(self.boletas) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith(".txt") and entrada.is_file() and entrada.stat().st_mtime < limite:
+                    candidatos.append(entrada.name)
+        candidatos.sort()
+        archivados = self.contiene(candidatos)
+        # los que ya están en el índice quedaron de una corrida cortada antes de borrarlos
+        self._borrar(n for nombre in archivados for n in (nombre, nombre[:-4] + ".png"))
+        pendientes = [nombre for nombre in candidatos if nombre not in archivados]
+        total = 0
+        for desde in range(0, len(pendientes), por_segmento):
+            total += self._archivar_segmento(pendientes[desde:desde + por_segmento])
+        return total
+
+    def _limpiar(self):
+        """Borra segmentos que no llegaron al índice (corrida cortada) y temporales."""
+        with self._lock:
+            conocidos = {fila[0] for fila in self._conexion.execute("SELECT archivo FROM segmentos")}
+        for entrada in os.scandir(self.carpeta):
+            if (entrada.name.endswith(".zip") and entrada.name not in conocidos) or entrada.name.endswith(".tmp"):
+                os.remove(entrada.path)
+
+    def _archivar_segmento(self, nombres):
+        archivos = []   # (nombre, ruta, estado)
+        marca = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        nombre_segmento = f"boletas_{marca}.zip"
+        numero = 1
+        while (self.carpeta / nombre_segmento).exists():
+            numero += 1
+            nombre_segmento = f"boletas_{marca}_{numero}.zip"
+        ruta_segmento = self.carpeta / nombre_segmento
+        temporal = ruta_segmento.with_name(nombre_segmento + ".tmp")
+
+        with zipfile.ZipFile(temporal, "w") as segmento:
+            for nombre in nombres:
+                ruta = self.boletas / nombre
+                try:
+                    contenido = ruta.read_bytes()
+                    estado = ruta.stat()
+                except OSError:
+                    continue
+                if not _es_boleta(contenido):
+                    continue
+                self._agregar(segmento, nombre, contenido, estado, zipfile.ZIP_DEFLATED)
+                archivos.append((nombre, ruta, estado))
+                ruta_qr = ruta.with_suffix(".png")
+                try:
+                    qr, estado_qr = ruta_qr.read_bytes(), ruta_qr.stat()
+                except OSError:
+                    continue
+                self._agregar(segmento, ruta_qr.name, qr, estado_qr, zipfile.ZIP_STORED)
+                archivos.append((ruta_qr.name, ruta_qr, estado_qr))
+        if not archivos:
+            os.remove(temporal)
+            return 0
+        with open(temporal, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta_segmento)
+
+        miembros = self._ubicar(ruta_segmento, {nombre: estado for nombre, _ruta, estado in archivos})
+        with self._lock, self._conexion:
+            segmento_id = self._conexion.execute(
+                "INSERT INTO segmentos (archivo, creado) VALUES (?, ?)",
+                (nombre_segmento, datetime.datetime.now().isoformat(timespec="seconds"))).lastrowid
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO miembros (nombre, segmento, inicio, comprimido, tamanio, metodo, crc, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [(m[0], segmento_id, *m[1:]) for m in miembros])
+        self._borrar(nombre for nombre, _ruta, _estado in archivos)
+        return len(archivos)
+
+    @staticmethod
+    def _agregar(segmento, nombre, contenido, estado, metodo):
+        fecha = time.localtime(estado.st_mtime)[:6]
+        info = zipfile.ZipInfo(nombre, date_time=max(fecha, (1980, 1, 1, 0, 0, 0)))
+        info.compress_type = metodo
+        segmento.writestr(info, contenido)
+
+    @staticmethod
+    def _ubicar(ruta_segmento, estados):
+        """(nombre, inicio, comprimido, tamaño, método, crc, mtime_ns) de cada archivo del segmento,
+        con el byte donde empiezan sus datos (después de la cabecera local)."""
+        miembros = []
+        with zipfile.ZipFile(ruta_segmento) as segmento, open(ruta_segmento, "rb") as f:
+            for info in segmento.infolist():
+                f.seek(info.header_offset)
+                cabecera = CABECERA_LOCAL.unpack(f.read(CABECERA_LOCAL.size))
+                if cabecera[0] != FIRMA_LOCAL:
+                    raise OSError(f"{ruta_segmento.name}: cabecera inválida para {info.filename}")
+                largo_nombre, largo_extra = cabecera[9], cabecera[10]
+                inicio = info.header_offset + CABECERA_LOCAL.size + largo_nombre + largo_extra
+                miembros.append((info.filename, inicio, info.compress_size, info.file_size, info.compress_type,
+                                 info.CRC, estados[info.filename].st_mtime_ns))
+        return miembros
+
+    def _borrar(self, nombres):
+        for nombre in nombres:
+            try:
+                os.remove(self.boletas / nombre)
+            except FileNotFoundError:
+                pass
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archivar boletas viejas en segmentos comprimidos.")
+    parser.add_argument("--carpeta", default="boletas", help="carpeta de boletas")
+    parser.add_argument("--dias", type=int, default=90, help="archivar las de más de N días (por defecto 90)")
+    parser.add_argument("--extraer", default=None, metavar="NOMBRE", help="sacar un archivo del archivo")
+    parser.add_argument("--a", default=".", dest="destino", help="carpeta donde dejar lo extraído")
+    args = parser.parse_args(argv)
+
+    archivo = ArchivoBoletas(args.carpeta)
+    try:
+        if args.extraer:
+            datos = archivo.leer(args.extraer)
+            if datos is None:
+                print(f"{args.extraer} no está archivada")
+                return 1
+            destino = Path(args.destino) / args.extraer
+            destino.write_bytes(datos)
+            print(f"Extraída en {destino}")
+            return 0
+        inicio = time.perf_counter()
+        cantidad = archivo.archivar(args.dias)
+        print(f"{cantidad} archivos archivados en {time.perf_counter() - inicio:.1f} s "
+              f"({archivo.cantidad()} en el archivo)")
+    finally:
+        archivo.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Lista desplegable de sugerencias para un Entry de Tk.
+
+Se engancha a un Entry y, en cada tecla, le pide a `buscar(texto)` las
+sugerencias y las muestra debajo. Flecha abajo entra a la lista, Enter o doble
+click elige, Escape cierra.
+"""
+import tkinter as tk
+
+TECLAS_IGNORADAS = {"Up", "Down", "Return", "Escape", "Tab", "Shift_L", "Shift_R",
+                    "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+
+class ListaSugerencias:
+    def __init__(self, entry, buscar, al_elegir=None, max_items=8):
+        self.entry = entry
+        self.buscar = buscar
+        self.al_elegir = al_elegir
+        self.max_items = max_items
+
+        self.ventana = tk.Toplevel(entry)
+        self.ventana.withdraw()
+        self.ventana.overrideredirect(True)
+        self.lista = tk.Listbox(self.ventana, height=max_items, activestyle="dotbox")
+        self.lista.pack(fill=tk.BOTH, expand=True)
+
+        entry.bind("<KeyRelease>", self._al_escribir, add="+")
+        entry.bind("<Down>", self._entrar_a_lista, add="+")
+        entry.bind("<Escape>", lambda e: self.ocultar(), add="+")
+        entry.bind("<FocusOut>", lambda e: entry.after(150, self._ocultar_si_sin_foco), add="+")
+        self.lista.bind("<Return>", self._elegir)
+        self.lista.bind("<Double-Button-1>", self._elegir)
+        self.lista.bind("<Escape>", lambda e: (self.ocultar(), self.entry.focus_set()))
+        self.lista.bind("<FocusOut>", lambda e: entry.after(150, self._ocultar_si_sin_foco))
+
+    @property
+    def visible(self):
+        return self.ventana.winfo_viewable()
+
+    def _al_escribir(self, event):
+        if event.keysym in TECLAS_IGNORADAS:
+            return
+        self.actualizar()
+
+    def actualizar(self):
+        texto = self.entry.get()
+        sugerencias = self.buscar(texto)[:self.max_items] if texto.strip() else []
+        # No sugerir exactamente lo que ya está escrito
+        if not sugerencias or sugerencias == [texto]:
+            self.ocultar()
+            return
+        self.lista.delete(0, tk.END)
+        for sugerencia in sugerencias:
+            self.lista.insert(tk.END, sugerencia)
+        self.lista.config(height=len(sugerencias))
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.ventana.geometry(f"{self.entry.winfo_width()}x{self.lista.winfo_reqheight()}+{x}+{y}")
+        self.ventana.deiconify()
+        self.ventana.lift()
+
+    def ocultar(self):
+        self.ventana.withdraw()
+
+    def _ocultar_si_sin_foco(self):
+        foco = self.entry.focus_get()
+        if foco is not self.entry and foco is not self.lista:
+            self.ocultar()
+
+    def _entrar_a_lista(self, event):
+        if self.visible and self.lista.size():
+            self.lista.focus_set()
+            self.lista.selection_clear(0, tk.END)
+            self.lista.selection_set(0)
+            self.lista.activate(0)
+            return "break"
+
+    def _elegir(self, event=None):
+        seleccion = self.lista.curselection()
+        if not seleccion:
+            return
+        valor = self.lista.get(seleccion[0])
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, valor)
+        self.ocultar()
+        self.entry.focus_set()
+        self.entry.icursor(tk.END)
+        if self.al_elegir is not None:
+            self.al_elegir(valor)
+        return "break"
@@ -0,0 +1,1031 @@
+"""Suite de benchmarks del sistema de boletas.
+
+Genera datos sintéticos a tres escalas (chico, mediano, enorme) en una carpeta
+temporal y mide los caminos calientes: catálogo (carga, categorías y recarga
+en caliente), texto y registro de boletas, historial de clientes, búsqueda de
+productos, QR, reportes, archivo de boletas viejas y el carrito (modelo,
+journal de recuperación y VentaApp). Los resultados se pueden guardar en JSON para comparar corridas.
+
+Uso:
+    python benchmark.py                        # escala chica, todos los casos sin GUI
+    python benchmark.py --escala todas --salida resultados.json
+    python benchmark.py --casos catalogo,orden --escala enorme
+    python benchmark.py --comparar base.json --tolerancia 0.25
+    python benchmark.py --gui                  # incluye VentaApp; sin DISPLAY usa xvfb-run
+
+Sale con código 1 si el arranque pasa PRESUPUESTO_ARRANQUE o, con --comparar,
+si algún caso tarda más que en la base por encima de la tolerancia.
+"""
+import argparse
+import datetime
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import catalogo
+from archivo_boletas import ArchivoBoletas
+from cambios_carrito import CambiosCarrito
+from busqueda_productos import IndiceProductos
+from carrito import Carrito
+from ids_boleta import AsignadorIds
+from indice_boletas import IndiceBoletas, terminos_boleta
+from journal_carrito import JournalCarrito
+from miniaturas import CacheMiniaturas
+from qr_compacto import MODOS, importar_pil, payload_qr
+from reportes import AGRUPACIONES as AGRUPACIONES_REPORTE, ReporteVentas
+
+RAIZ = Path(__file__).resolve().parent
+RUTA_INTERFAZ = RAIZ / "-TPI2025-.py"
+
+ESCALAS = {
+    "chico": {"productos": 1_000, "lineas": 100, "clientes": 1_000, "boletas": 3_650},
+    "mediano": {"productos": 10_000, "lineas": 1_000, "clientes": 20_000, "boletas": 36_500},
+    "enorme": {"productos": 50_000, "lineas": 10_000, "clientes": 100_000, "boletas": 100_000},
+}
+
+# Máximo aceptable (segundos) para arrancar un proceso nuevo e importar cada parte
+PRESUPUESTO_ARRANQUE = {
+    "chico": {"nucleo": 0.3, "interfaz": 0.6},
+    "mediano": {"nucleo": 0.6, "interfaz": 1.0},
+    "enorme": {"nucleo": 2.0, "interfaz": 2.5},
+}
+
+
+def cronometrar(funcion, repeticiones=5):
+    """Ejecuta la función varias veces y devuelve el mejor tiempo en segundos."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def verificar(condicion, mensaje="verificación fallida"):
+    """Como assert, pero sin desaparecer con python -O: los casos también
+    comprueban que el resultado sea correcto, no solo cuánto tarda."""
+    if not condicion:
+        raise AssertionError(mensaje)
+
+
+def por_operacion(funcion, operaciones):
+    """Segundos por operación de una función que hace `operaciones` pasos."""
+    inicio = time.perf_counter()
+    funcion()
+    return (time.perf_counter() - inicio) / operaciones
+
+
+# ============================================
+#   DATOS SINTÉTICOS
+# ============================================
+
+def generar_catalogo_sintetico(ruta, cantidad, semilla=0):
+    """Escribe un lista_de_productos.txt falso con `cantidad` productos."""
+    rnd = random.Random(semilla)
+    with open(ruta, "w", encoding="utf-8") as f:
+        for i in range(cantidad):
+            if i % 500 == 0:
+                f.write(f"-Categoría {i // 500}-\n")
+            f.write(f"\"Producto Córdoba {i:06d}\": {rnd.randint(100, 50000) + 0.5},\n")
+
+
+def generar_clientes_sinteticos(ruta, cantidad, semilla=0):
+    """Escribe un clientes.txt falso con `cantidad` clientes distintos."""
+    rnd = random.Random(semilla)
+    nombres = ("Ana", "Juan", "Lara", "Teo", "Óscar", "Joel", "Tara", "Leonardo")
+    with open(ruta, "w", encoding="utf-8") as f:
+        for i in range(cantidad):
+            f.write(f"{rnd.choice(nombres)} {i}\n")
+
+
+def contenido_sintetico(lineas, semilla=0):
+    """Texto con el mismo formato que generar_contenido_boleta."""
+    rnd = random.Random(semilla)
+    partes = ["Boleta para Cliente de Prueba", "Fecha y Hora: 01/01/25 12:00:00", "\nDetalles de la Venta:\n"]
+    total = 0
+    for i in range(lineas):
+        cantidad, precio = rnd.randint(1, 20), rnd.randint(100, 50000) + 0.5
+        total += cantidad * precio
+        partes.append(f"{cantidad} x Producto Córdoba {i:05d} a ${precio:.2f} c/u => Total: ${cantidad * precio:.2f}")
+    partes.append(f"\nTOTAL: ${total:.2f}")
+    return "\n".join(partes)
+
+
+class Entorno:
+    """Carpeta temporal con los datos de una escala; el sistema se carga desde ahí."""
+
+    def __init__(self, nombre_escala):
+        self.nombre = nombre_escala
+        self.escala = ESCALAS[nombre_escala]
+        self.carpeta = Path(tempfile.mkdtemp(prefix=f"tpi_bench_{nombre_escala}_"))
+        self.ruta_productos = self.carpeta / "lista_de_productos.txt"
+        generar_catalogo_sintetico(self.ruta_productos, self.escala["productos"])
+        generar_clientes_sinteticos(self.carpeta / "clientes.txt", self.escala["clientes"])
+        self._anterior = os.getcwd()
+        self._sistema = None
+
+    @property
+    def sistema(self):
+        """El núcleo cargado con los datos sintéticos (la primera vez que se pide)."""
+        if self._sistema is None:
+            ya_cargado = "nucleo" in sys.modules
+            import nucleo
+            # si ya lo cargó otra escala, se vuelve a ejecutar con los archivos de esta carpeta
+            self._sistema = importlib.reload(nucleo) if ya_cargado else nucleo
+        return self._sistema
+
+    def interfaz(self):
+        """-TPI2025-.py sobre el núcleo de esta escala (el nombre no es un identificador válido)."""
+        self.sistema
+        spec = importlib.util.spec_from_file_location("tpi2025", RUTA_INTERFAZ)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        return modulo
+
+    def productos(self, cantidad):
+        """[(cantidad, producto), ...] distintos tomados del catálogo sintético."""
+        nombres = list(self.sistema.PRODUCTOS_DISPONIBLES)
+        return [(1 + i % 7, nombres[i % len(nombres)]) for i in range(min(cantidad, len(nombres)))]
+
+    def __enter__(self):
+        os.chdir(self.carpeta)
+        return self
+
+    def __exit__(self, *exc):
+        if self._sistema is not None:
+            self._sistema.HISTORIAL_CLIENTES.cerrar()
+            self._sistema.ALMACEN.cerrar()
+            self._sistema.INDICE_BOLETAS.cerrar()
+            self._sistema.ARCHIVO_BOLETAS.cerrar()
+        os.chdir(self._anterior)
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+
+# ============================================
+#   CASOS (cada uno devuelve {métrica: segundos})
+# ============================================
+
+def caso_catalogo(entorno):
+    """Arranque del catálogo (texto vs compilado) y búsqueda por código.
+
+    pruebag.py levanta su ventana al importarse, así que su leer_productos se
+    mide a través de Catalogo, que es lo que usa por dentro.
+    """
+    ruta = str(entorno.ruta_productos)
+    catalogo.cargar_catalogo(ruta)  # primera carga: compila el .cat
+    compartido = catalogo.Catalogo(ruta)
+    codigos = [1 + (i * 7919) % len(compartido) for i in range(10_000)]
+    return {
+        "parsear_texto": cronometrar(lambda: catalogo.parsear_lista_productos(ruta)),
+        "cargar_compilado": cronometrar(lambda: catalogo.cargar_catalogo(ruta)),
+        "producto_por_codigo": por_operacion(lambda: [compartido.producto_por_codigo(c) for c in codigos], len(codigos)),
+    }
+
+
+def caso_boleta(entorno):
+    """Texto y nombre de la boleta, y registro solo en el almacén vs con .txt/QR."""
+    sistema = entorno.sistema
+    productos = entorno.productos(entorno.escala["lineas"])
+    total = sum(c * sistema.PRODUCTOS_DISPONIBLES[p] for c, p in productos)
+    fecha = "01/01/25 12:00:00"
+    resultados = {
+        "generar_contenido": cronometrar(lambda: sistema.generar_contenido_boleta("Ana", productos, total, fecha)),
+        "obtener_nombre": por_operacion(lambda: [sistema.obtener_nombre_boleta("Ana", fecha) for _ in range(10_000)], 10_000),
+    }
+    for exportar, metrica in ((False, "registrar_solo_almacen"), (True, "registrar_con_archivos")):
+        sistema.EXPORTAR_ARCHIVOS = exportar
+        resultados[metrica] = cronometrar(lambda: sistema.registrar_boleta("Ana", productos, total), 3)
+    return resultados
+
+
+def caso_clientes(entorno):
+    """guardar_cliente y sugerencias con un clientes.txt grande."""
+    sistema = entorno.sistema
+    nombres = [f"Cliente Nuevo {i}" for i in range(500)]
+    prefijos = ["a", "an", "ju", "óscar 1", "t", "zz"] * 200
+    historial = sistema.HISTORIAL_CLIENTES
+    return {
+        "guardar_cliente": por_operacion(lambda: [sistema.guardar_cliente(n) for n in nombres], len(nombres)),
+        "sugerencias": por_operacion(lambda: [historial.sugerencias(p) for p in prefijos], len(prefijos)),
+    }
+
+
+def caso_busqueda(entorno):
+    """Búsqueda de productos por nombre en el índice del combobox."""
+    indice = entorno.sistema.indice_productos()
+    consultas = ["p", "prod", "cordoba 0012", "0499", "producto 000999", "zzz"] * 100
+    return {"buscar_producto": por_operacion(lambda: [indice.buscar(c) for c in consultas], len(consultas))}
+
+
+def caso_categorias(entorno):
+    """Árbol de categorías: armarlo (solo encabezados) y abrir una categoría leyendo
+    únicamente sus secciones, comparado con parsear el catálogo entero."""
+    ruta = str(entorno.ruta_productos)
+    categorias = catalogo.IndiceCategorias(ruta)
+    rutas = [c.ruta for _profundidad, c in categorias.recorrer()]
+    completo = catalogo.parsear_lista_productos(ruta)
+    juntos = {}
+    for r in rutas:
+        productos = categorias.productos(r)
+        verificar(len(productos) == categorias.categoria(r).cantidad, f"{r}: cantidad distinta")
+        juntos.update(productos)
+    verificar(juntos == completo, "las categorías no suman el catálogo")
+
+    medio = rutas[len(rutas) // 2]
+    sin_cache = catalogo.IndiceCategorias(ruta, capacidad=0)   # cada vez lee la sección del archivo
+    return {
+        "armar_arbol": cronometrar(lambda: catalogo.IndiceCategorias(ruta)),
+        "abrir_categoria": cronometrar(lambda: sin_cache.productos(medio)),
+        "abrir_categoria_en_cache": cronometrar(lambda: categorias.productos(medio)),
+        "parsear_todo": cronometrar(lambda: catalogo.parsear_lista_productos(ruta)),
+    }
+
+
+def caso_recarga(entorno, cambios=30):
+    """Recarga en caliente del catálogo: se cambian precios, se agregan y se quitan
+    productos en el archivo y se aplica solo la diferencia (núcleo, índice de
+    búsqueda y un carrito), comparado con volver a leer y armar todo."""
+    sistema = entorno.sistema
+    ruta = entorno.carpeta / "lista_de_productos_recarga.txt"
+    shutil.copyfile(entorno.ruta_productos, ruta)
+    with open(ruta, "r", encoding="utf-8") as f:
+        original = f.readlines()
+    vigilante = catalogo.VigilanteCatalogo(str(ruta))
+    vigilante.preparar()
+    indice = sistema.indice_productos()
+    nombres = list(sistema.PRODUCTOS_DISPONIBLES)
+    carrito = Carrito()
+    for i, producto in enumerate(nombres[:cambios]):
+        carrito.agregar(i, producto, 3, sistema.PRODUCTOS_DISPONIBLES[producto])
+
+    # cada tercio de los cambios: precio nuevo, producto quitado, producto nuevo
+    tercio = cambios // 3
+    reprecios = {f"\"{n}\"": n for n in nombres[:tercio]}
+    quitados = {f"\"{n}\"" for n in nombres[tercio:2 * tercio]}
+    modificado = []
+    for linea in original:
+        clave = linea.split(":", 1)[0]
+        if clave in quitados:
+            continue
+        if clave in reprecios:
+            linea = f"{clave}: {sistema.PRODUCTOS_DISPONIBLES[reprecios[clave]] + 1},\n"
+        modificado.append(linea)
+    modificado += [f"\"Producto Nuevo {i:04d}\": {100 + i}.5,\n" for i in range(tercio)]
+
+    def escribir_y_revisar(lineas):
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.writelines(lineas)
+        os.utime(ruta, ns=(time.time_ns(), time.time_ns()))
+        verificar(vigilante.revisar() is None)   # primero espera a que el archivo deje de cambiar
+        inicio = time.perf_counter()
+        diferencia = vigilante.revisar()
+        sistema.aplicar_cambios_catalogo(diferencia)
+        for producto, (_antes, despues) in diferencia.precios.items():
+            linea = carrito.linea_de_producto(producto)
+            if linea is not None:
+                carrito.cambiar_precio(linea.id, despues)
+        for producto in diferencia.quitados:
+            linea = carrito.linea_de_producto(producto)
+            if linea is not None:
+                carrito.eliminar(linea.id)
+        return diferencia, time.perf_counter() - inicio
+
+    diferencia, ida = escribir_y_revisar(modificado)
+    verificar((len(diferencia.precios), len(diferencia.quitados), len(diferencia.agregados)) == (tercio,) * 3)
+    verificar(sistema.PRODUCTOS_DISPONIBLES == catalogo.parsear_lista_productos(ruta), "catálogo distinto al archivo")
+    verificar(indice.buscar("producto nuevo 0000", 1) == ["Producto Nuevo 0000"])
+    verificar(nombres[tercio] not in indice.buscar(nombres[tercio], 5), "el índice sigue ofreciendo un producto quitado")
+    verificar(carrito.total == carrito.recalcular_total() and len(carrito) == cambios - tercio)
+
+    # volver al archivo original deja todo como estaba
+    diferencia, vuelta = escribir_y_revisar(original)
+    verificar(sistema.PRODUCTOS_DISPONIBLES == catalogo.parsear_lista_productos(ruta))
+    verificar(len(indice) == len(sistema.PRODUCTOS_DISPONIBLES))
+    return {
+        "aplicar_diferencia": (ida + vuelta) / 2,
+        "revisar_sin_cambios": por_operacion(lambda: [vigilante.revisar() for _ in range(1_000)], 1_000),
+        "recarga_completa": cronometrar(
+            lambda: IndiceProductos(catalogo.parsear_lista_productos(ruta)), 3),
+    }
+
+
+def caso_carrito(entorno, semilla=0):
+    """Agregar/eliminar/deshacer al azar sobre el modelo, verificando el total incremental."""
+    rnd = random.Random(semilla)
+    cantidad = entorno.escala["lineas"]
+    precios = (394.44, 1337.5, 2350.0, 0.1, 1030.0)
+    nombres = [f"Producto {i}" for i in range(cantidad)]
+    carrito = Carrito()
+    borrados = []
+    ops = cantidad * 10
+
+    def correr():
+        siguiente_id = 0
+        for _ in range(ops):
+            accion = rnd.random()
+            if accion < 0.6:
+                producto = rnd.choice(nombres)
+                linea = carrito.linea_de_producto(producto)
+                if linea is not None:
+                    carrito.cambiar_cantidad(linea.id, linea.cantidad + rnd.randint(1, 5))
+                else:
+                    siguiente_id += 1
+                    carrito.agregar(siguiente_id, producto, rnd.randint(1, 5), rnd.choice(precios))
+            elif accion < 0.9 and carrito:
+                borrados.append(carrito.eliminar(next(iter(carrito)).id))
+            elif borrados:
+                linea = borrados.pop()
+                if carrito.linea_de_producto(linea.producto) is None:
+                    carrito.agregar(linea.id, linea.producto, linea.cantidad, linea.precio)
+
+    resultados = {"operacion_modelo": por_operacion(correr, ops)}
+    # El total incremental tiene que coincidir exactamente con la suma completa
+    verificar(carrito.total == carrito.recalcular_total(), (carrito.total, carrito.recalcular_total()))
+    return resultados
+
+
+def _foto(carrito):
+    return [(l.id, l.producto, l.cantidad, l.precio) for l in carrito]
+
+
+def caso_deshacer(entorno, semilla=0):
+    """Cambios al azar con deshacer/rehacer: cada deshacer vuelve exactamente al
+    estado anterior, rehacer al siguiente, y la memoria anotada no pasa el tope."""
+    rnd = random.Random(semilla)
+    cantidad = entorno.escala["lineas"]
+    nombres = [f"Producto {i}" for i in range(cantidad)]
+    carrito = Carrito()
+    cambios = CambiosCarrito(carrito, max_operaciones=50, max_lineas=max(cantidad, 100))
+    fotos = [_foto(carrito)]   # estado después de cada cambio todavía deshacible
+    ops = cantidad * 10
+    siguiente_id = 0
+
+    def cambiar():
+        nonlocal siguiente_id
+        accion = rnd.random()
+        if accion < 0.5:
+            producto = rnd.choice(nombres)
+            linea = carrito.linea_de_producto(producto)
+            if linea is not None:
+                cambios.cambiar_cantidad(linea.id, linea.cantidad + 1)
+            else:
+                siguiente_id += 1
+                cambios.agregar(siguiente_id, producto, rnd.randint(1, 5), rnd.choice((0.1, 394.44, 1030.0)))
+        elif accion < 0.8 and carrito:
+            cambios.eliminar(rnd.sample(carrito.ids(), min(3, len(carrito))))
+        elif accion < 0.9:
+            cambios.ordenar(rnd.choice(("producto", "cantidad", "precio", "subtotal")), rnd.random() < 0.5)
+        else:
+            cambios.vaciar()
+
+    def correr():
+        for _ in range(ops):
+            ultimo = cambios._deshacer[-1] if cambios else None
+            cambiar()
+            if cambios and cambios._deshacer[-1] is not ultimo:
+                fotos.append(_foto(carrito))
+            # los cambios más viejos que descartó el tope ya no se pueden deshacer
+            del fotos[:-(len(cambios) + 1)]
+            if rnd.random() < 0.3:
+                pasos = rnd.randint(1, len(cambios) or 1)
+                for _ in range(pasos):
+                    if cambios.deshacer() is None:
+                        break
+                    fotos.pop()
+                    verificar(_foto(carrito) == fotos[-1], "deshacer no volvió al estado anterior")
+                for _ in range(rnd.randint(0, pasos)):
+                    if cambios.rehacer() is None:
+                        break
+                    fotos.append(_foto(carrito))
+            verificar(cambios._lineas_anotadas <= cambios.max_lineas)
+            verificar(carrito.total == carrito.recalcular_total())
+
+    return {"cambio_con_verificacion": por_operacion(correr, ops)}
+
+
+def caso_journal(entorno, semilla=0):
+    """Journal del carrito: costo por cambio anotado contra el carrito solo, y que
+    recuperar un pedido largo con cambios al azar (incluido lo que hacen deshacer y
+    rehacer) deje el mismo carrito: líneas, orden y total."""
+    rnd = random.Random(semilla)
+    cantidad = max(entorno.escala["lineas"], 300)
+    nombres = [f"Producto {i}" for i in range(cantidad * 2)]
+    ruta = entorno.carpeta / "carrito_bench.journal"
+
+    def cargar(carrito, cambios):
+        for i in range(cantidad):
+            cambios.agregar(i + 1, nombres[i], 1 + i % 7, rnd.choice((0.1, 394.44, 1030.0)))
+        for _ in range(cantidad):
+            cambios.cambiar_cantidad(rnd.randint(1, cantidad), rnd.randint(1, 9))
+
+    def sin_journal():
+        carrito = Carrito()
+        cargar(carrito, CambiosCarrito(carrito))
+
+    journal = JournalCarrito(ruta)
+
+    def con_journal():
+        carrito = Carrito()
+        journal.conectar(carrito)
+        cargar(carrito, CambiosCarrito(carrito))
+
+    resultados = {
+        "cambio_sin_journal": por_operacion(sin_journal, cantidad * 2),
+        "cambio_con_journal": por_operacion(con_journal, cantidad * 2),
+    }
+
+    # Pedido largo con cambios al azar, deshacer/rehacer y una compactación en el medio
+    carrito = Carrito()
+    journal.conectar(carrito, "Ana Pérez")
+    cambios = CambiosCarrito(carrito)
+    cargar(carrito, cambios)
+    siguiente_id = cantidad
+    for paso in range(cantidad * 5):
+        accion = rnd.random()
+        if accion < 0.3:
+            producto = rnd.choice(nombres)
+            linea = carrito.linea_de_producto(producto)
+            if linea is not None:
+                cambios.cambiar_cantidad(linea.id, linea.cantidad + 1)
+            else:
+                siguiente_id += 1
+                cambios.agregar(siguiente_id, producto, rnd.randint(1, 5), 394.44)
+        elif accion < 0.5 and carrito:
+            cambios.eliminar(rnd.sample(carrito.ids(), min(3, len(carrito))))
+        elif accion < 0.6:
+            cambios.ordenar(rnd.choice(("producto", "cantidad", "precio", "subtotal")), rnd.random() < 0.5)
+        elif accion < 0.62:
+            cambios.vaciar()
+        elif accion < 0.8:
+            cambios.deshacer()
+        elif accion < 0.95:
+            cambios.rehacer()
+        elif carrito:
+            carrito.cambiar_precio(rnd.choice(carrito.ids()), rnd.choice((0.1, 1030.0)))
+        if paso == cantidad:
+            journal.anotar_cliente("Ana María Pérez")
+    resultados["compactar"] = cronometrar(journal.compactar, 3)
+
+    # Se recupera sin cerrar el journal, como después de un corte
+    recuperado = Carrito()
+    inicio = time.perf_counter()
+    cliente = JournalCarrito(ruta).recuperar(recuperado)
+    resultados["recuperar"] = time.perf_counter() - inicio
+    verificar(cliente == "Ana María Pérez", "no se recuperó el cliente")
+    verificar(_foto(recuperado) == _foto(carrito), "el carrito recuperado no coincide")
+    verificar(recuperado.total == carrito.total == recuperado.recalcular_total())
+    # la compactación deja una línea por línea del carrito (más el cliente)
+    with open(ruta, encoding="utf-8") as f:
+        verificar(sum(1 for _ in f) == len(carrito) + 1)
+    journal.cerrar()
+    return resultados
+
+
+def _orden_por_seleccion(entradas, key_func, asc):
+    """Ordenamiento por selección que usaba on_header_click (solo para comparar)."""
+    entradas = list(entradas)
+    n = len(entradas)
+    for i in range(n):
+        sel = i
+        for j in range(i + 1, n):
+            a = key_func(entradas[j])
+            b = key_func(entradas[sel])
+            if (a < b) if asc else (a > b):
+                sel = j
+        if sel != i:
+            entradas[i], entradas[sel] = entradas[sel], entradas[i]
+    return entradas
+
+
+def _carrito_sintetico(cantidad, semilla=0):
+    rnd = random.Random(semilla)
+    carrito = Carrito()
+    for i in range(cantidad):
+        carrito.agregar(f"I{i:05d}", f"Producto {rnd.randint(0, 10**6)}-{i}", rnd.randint(1, 50), rnd.randint(100, 50000) + 0.5)
+    return carrito
+
+
+def caso_orden(entorno, limite_seleccion=1_000):
+    """Ordenar el carrito por columna (y, si es chico, con la selección anterior)."""
+    carrito = _carrito_sintetico(entorno.escala["lineas"])
+    resultados = {
+        "ordenar_subtotal": cronometrar(lambda: carrito.ordenar("subtotal", True)),
+        "ordenar_producto": cronometrar(lambda: carrito.ordenar("producto", False)),
+    }
+    if len(carrito) <= limite_seleccion:
+        entradas = [(l.cantidad, l.producto, l.precio) for l in carrito]
+        resultados["seleccion_anterior"] = cronometrar(
+            lambda: _orden_por_seleccion(entradas, lambda e: e[0] * e[2], True), 1)
+    return resultados
+
+
+def caso_qr(entorno):
+    """Render del QR según el modo de contenido (necesita qrcode)."""
+    try:
+        import qrcode
+    except ImportError:
+        return {}
+    contenido = contenido_sintetico(min(entorno.escala["lineas"], 300))
+    resultados = {}
+    for modo in MODOS:
+        texto = payload_qr(contenido, modo, "Cliente de Prueba_01-01-25_12;00;00.txt")
+        try:
+            resultados[f"render_{modo}"] = cronometrar(lambda: qrcode.make(texto), 3)
+        except Exception:
+            pass  # el texto completo de un carrito grande no entra en un QR
+    return resultados
+
+
+def caso_metricas(entorno, veces=100_000):
+    """Costo por llamada de etapa() y medido() con las métricas apagadas y prendidas."""
+    import metricas
+    funcion = metricas.medido("bench.medido")(lambda: None)
+
+    def con_etapa():
+        for _ in range(veces):
+            with metricas.etapa("bench.etapa"):
+                pass
+
+    def con_medido():
+        for _ in range(veces):
+            funcion()
+
+    resultados = {
+        "etapa_apagada": por_operacion(con_etapa, veces),
+        "medido_apagado": por_operacion(con_medido, veces),
+    }
+    metricas.activar(ruta=None)
+    try:
+        resultados["etapa_prendida"] = por_operacion(con_etapa, veces)
+        resultados["medido_prendido"] = por_operacion(con_medido, veces)
+    finally:
+        metricas.desactivar()
+        metricas.reiniciar()
+    return resultados
+
+
+def caso_arranque(entorno):
+    """Arranque en frío de un proceso nuevo importando el núcleo o la interfaz (sin abrir la ventana).
+
+    Además verifica que el núcleo no arrastre tkinter, PIL ni qrcode.
+    """
+    codigos = {
+        "nucleo": "import sys, nucleo\n"
+                  "cargados = {'tkinter', 'PIL', 'qrcode'} & set(sys.modules)\n"
+                  "assert not cargados, f'el núcleo importó {cargados}'",
+        "interfaz": "import importlib.util as u\n"
+                    f"spec = u.spec_from_file_location('tpi2025', {str(RUTA_INTERFAZ)!r})\n"
+                    "spec.loader.exec_module(u.module_from_spec(spec))",
+    }
+    variables = dict(os.environ, PYTHONPATH=str(RAIZ))
+    # una corrida previa deja compilados el .cat y los .pyc, como en la caja
+    return {
+        nombre: cronometrar(lambda: subprocess.run([sys.executable, "-c", codigo], env=variables, check=True), 3)
+        for nombre, codigo in codigos.items()
+    }
+
+
+def excede_presupuesto(resultados):
+    """Lista de (clave, segundos, presupuesto) de los arranques que pasan su presupuesto."""
+    excedidos = []
+    for clave, segundos in resultados.items():
+        nombre_escala, caso, metrica = clave.split("/")
+        presupuesto = PRESUPUESTO_ARRANQUE.get(nombre_escala, {}).get(metrica)
+        if caso == "arranque" and presupuesto is not None and segundos > presupuesto:
+            excedidos.append((clave, segundos, presupuesto))
+    return excedidos
+
+
+def _asignar_en_proceso(ruta, terminal, cantidad, hilos, bloque):
+    """Varios hilos de un proceso pidiendo números al mismo contador."""
+    import threading
+    asignador = AsignadorIds(ruta, terminal, bloque)
+    listas = [[] for _ in range(hilos)]
+
+    def trabajar(lista):
+        for _ in range(cantidad):
+            lista.append(asignador.siguiente_numero())
+
+    trabajadores = [threading.Thread(target=trabajar, args=(lista,)) for lista in listas]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    return listas
+
+
+def caso_ids(entorno, procesos=4, hilos=4, bloque=16):
+    """Prueba de estrés del asignador de ids: varios procesos e hilos sobre el mismo
+    contador, con bloques chicos para forzar el lock. Ningún número se repite, cada
+    hilo los ve crecer, y un asignador nuevo (como tras un corte) sigue más arriba."""
+    import concurrent.futures as cf
+    ruta = entorno.carpeta / "secuencia_estres.txt"
+    cantidad = min(entorno.escala["lineas"] * 10, 20_000)
+    inicio = time.perf_counter()
+    with cf.ProcessPoolExecutor(procesos) as pool:
+        futuros = [pool.submit(_asignar_en_proceso, ruta, "estres", cantidad, hilos, bloque) for _ in range(procesos)]
+        listas = [lista for futuro in futuros for lista in futuro.result()]
+    transcurrido = time.perf_counter() - inicio
+    numeros = [n for lista in listas for n in lista]
+    verificar(len(numeros) == len(set(numeros)) == procesos * hilos * cantidad, "números de boleta repetidos")
+    verificar(all(a < b for lista in listas for a, b in zip(lista, lista[1:])), "secuencia no creciente")
+    # "Corte de luz": un asignador nuevo no puede reutilizar nada de lo entregado
+    verificar(AsignadorIds(ruta, "estres", bloque).siguiente_numero() > max(numeros), "se reutilizó un número")
+
+    # Nombres en el mismo segundo y para el mismo cliente, al ritmo de una caja
+    sistema = entorno.sistema
+    asignador = AsignadorIds(entorno.carpeta / "secuencia_nombres.txt", "caja")
+    nombres = []
+    medir_nombres = por_operacion(lambda: nombres.extend(
+        sistema.obtener_nombre_boleta("Ana", "01/01/25 12:00:00", asignador.siguiente()) for _ in range(cantidad)),
+        cantidad)
+    verificar(len(set(nombres)) == len(nombres), "nombres de boleta repetidos")
+    return {"estres_por_id": transcurrido / len(numeros), "nombre_unico": medir_nombres}
+
+
+def _escribir_boletas_del_anio(sistema, carpeta, cantidad, semilla=0):
+    """Boletas .txt repartidas en un año; devuelve el total vendido por día."""
+    rnd = random.Random(semilla)
+    nombres = list(sistema.PRODUCTOS_DISPONIBLES)
+    inicio = datetime.datetime(2025, 1, 1, 9)
+    por_dia = {}
+    for i in range(cantidad):
+        fecha = inicio + datetime.timedelta(days=i * 365 // cantidad, seconds=rnd.randint(0, 36_000))
+        productos = [(rnd.randint(1, 5), p) for p in rnd.sample(nombres, rnd.randint(1, 8))]
+        total = sum(c * sistema.PRODUCTOS_DISPONIBLES[p] for c, p in productos)
+        texto_fecha = fecha.strftime("%d/%m/%y %H:%M:%S")
+        contenido = sistema.generar_contenido_boleta(f"Cliente {i % 500}", productos, total, texto_fecha)
+        (carpeta / f"boleta_{i:06d}.txt").write_text(contenido, encoding="utf-8")
+        dia = fecha.date().isoformat()
+        por_dia[dia] = por_dia.get(dia, 0) + total
+    return por_dia
+
+
+def caso_reportes(entorno):
+    """Un año de boletas .txt: primera lectura completa y cierre del día con la caché
+    (como una corrida nueva del CLI) sin boletas nuevas y con 10 nuevas."""
+    carpeta = entorno.carpeta / "boletas_reportes"
+    carpeta.mkdir(exist_ok=True)
+    por_dia = _escribir_boletas_del_anio(entorno.sistema, carpeta, entorno.escala["boletas"])
+    ultimo_dia = max(por_dia)
+
+    inicio = time.perf_counter()
+    reporte = ReporteVentas(carpeta)
+    reporte.actualizar()
+    primera = time.perf_counter() - inicio
+    diarios = {dia: total for dia, _boletas, total in reporte.por_dia()}
+    verificar(diarios.keys() == por_dia.keys(), "faltan días en el reporte")
+    verificar(all(abs(diarios[dia] - total) < 0.01 for dia, total in por_dia.items()), "totales por día distintos")
+    todo_el_anio = cronometrar(lambda: [reporte.reporte(por) for por in AGRUPACIONES_REPORTE], 3)
+    reporte.cerrar()
+
+    escritas = []
+
+    def cierre_del_dia(nuevas=0):
+        for i in range(nuevas):
+            ruta = carpeta / f"nueva_{len(escritas):04d}.txt"
+            ruta.write_text(f"Boleta para Nueva\nFecha y Hora: 31/12/25 20:00:0{i}\n\nDetalles de la Venta:\n\n"
+                            "1 x Algo a $1.00 c/u => Total: $1.00\n\nTOTAL: $1.00", encoding="utf-8")
+            escritas.append(ruta)
+        reporte = ReporteVentas(carpeta)
+        leidas = reporte.actualizar()
+        verificar(leidas == nuevas, f"se leyeron {leidas} boletas en vez de las {nuevas} nuevas")
+        for por in AGRUPACIONES_REPORTE:
+            reporte.reporte(por, ultimo_dia, ultimo_dia)
+        reporte.cerrar()
+
+    sin_nuevas = cronometrar(cierre_del_dia, 3)
+    con_nuevas = cronometrar(lambda: cierre_del_dia(10), 3)
+    return {"primera_lectura": primera, "todo_el_anio": todo_el_anio,
+            "cierre_del_dia": sin_nuevas, "cierre_con_10_nuevas": con_nuevas}
+
+
+def caso_archivo(entorno, semilla=0):
+    """Archivo comprimido: pasar a segmentos el 90% más viejo de un año de boletas
+    (.txt y algunos PNG), leer boletas sueltas por el índice contra abrir el zip, y
+    verificar contenidos y reportes antes y después de archivar."""
+    rnd = random.Random(semilla)
+    carpeta = entorno.carpeta / "boletas_archivo"
+    carpeta.mkdir(exist_ok=True)
+    por_dia = _escribir_boletas_del_anio(entorno.sistema, carpeta, entorno.escala["boletas"])
+    (carpeta / "secuencia_caja1.txt").write_text("123", encoding="utf-8")
+    nombres = sorted(e.name for e in os.scandir(carpeta) if e.name.startswith("boleta_"))
+    viejas = nombres[:len(nombres) * 9 // 10]
+    ahora = time.time()
+    for i, nombre in enumerate(nombres):
+        ruta = carpeta / nombre
+        if i % 10 == 0:
+            ruta.with_suffix(".png").write_bytes(rnd.randbytes(1_500))
+        if nombre in viejas:
+            for r in (ruta, ruta.with_suffix(".png")):
+                if r.exists():
+                    os.utime(r, (ahora - 200 * 86_400, ahora - 200 * 86_400))
+    originales = {e.name: Path(e.path).read_bytes() for e in os.scandir(carpeta) if e.is_file()}
+
+    archivo = ArchivoBoletas(carpeta)
+    reporte = ReporteVentas(carpeta, archivo=archivo)
+    reporte.actualizar()
+    antes = reporte.por_dia()
+    reporte.cerrar()
+
+    inicio = time.perf_counter()
+    archivados = archivo.archivar(dias=90)
+    archivar = time.perf_counter() - inicio
+    esperados = [n for n in originales if n.startswith("boleta_") and n[:-4] + ".txt" in viejas]
+    verificar(archivados == len(esperados), f"se archivaron {archivados} de {len(esperados)}")
+    quedan = {e.name for e in os.scandir(carpeta) if e.is_file()}
+    verificar("secuencia_caja1.txt" in quedan and not quedan & set(esperados), "se archivó algo de más o de menos")
+    verificar(all(archivo.leer(n) == originales[n] for n in esperados), "contenido archivado distinto")
+
+    # la caché de reportes sigue igual y una caché nueva lee lo archivado del segmento
+    for ruta_cache in (None, carpeta / "reportes_nuevo.sqlite3"):
+        reporte = ReporteVentas(carpeta, ruta_cache, archivo=archivo)
+        reporte.actualizar()
+        despues = reporte.por_dia()
+        reporte.cerrar()
+        verificar(despues == antes, "los reportes cambiaron al archivar")
+    verificar({dia for dia, _b, _t in antes} == por_dia.keys())
+
+    muestra = rnd.sample(esperados, min(1_000, len(esperados)))
+    segmentos = sorted((carpeta / "archivo").glob("*.zip"))
+
+    def con_zipfile():
+        # abrir el zip lee todo su directorio central: se mide con menos boletas
+        for nombre in muestra[:50]:
+            for segmento in segmentos:
+                with zipfile.ZipFile(segmento) as zf:
+                    try:
+                        zf.read(nombre)
+                        break
+                    except KeyError:
+                        pass
+
+    resultados = {
+        "archivar_por_archivo": archivar / archivados,
+        "leer_archivada": por_operacion(lambda: [archivo.leer(n) for n in muestra], len(muestra)),
+        "leer_con_zipfile": por_operacion(con_zipfile, len(muestra[:50])),
+    }
+    archivo.cerrar()
+    return resultados
+
+
+def caso_indice(entorno, semilla=0):
+    """Índice invertido de boletas: alta de un año de ventas y búsquedas por cliente,
+    producto, fecha y total, verificadas contra un recorrido de todas las boletas."""
+    rnd = random.Random(semilla)
+    nombres = list(entorno.sistema.PRODUCTOS_DISPONIBLES)
+    inicio = datetime.datetime(2025, 1, 1, 9)
+    cantidad = entorno.escala["boletas"]
+    boletas = []
+    for i in range(cantidad):
+        fecha = inicio + datetime.timedelta(days=i * 365 // cantidad, seconds=rnd.randint(0, 36_000))
+        lineas = [(rnd.randint(1, 5), p, 1.0) for p in rnd.sample(nombres, rnd.randint(1, 8))]
+        boletas.append({"nombre": f"boleta_{i:06d}.txt", "cliente": f"Cliente {rnd.choice('ABCDEFGH')}{i % 500}",
+                        "fecha": fecha.isoformat(timespec="seconds"), "total": float(rnd.randint(100, 50_000)),
+                        "lineas": lineas})
+
+    indice = IndiceBoletas(entorno.carpeta / "indice_bench.sqlite3")
+    inicio_alta = time.perf_counter()
+    for desde in range(0, cantidad - 100, 1_000):
+        indice.agregar_varias(boletas[desde:min(desde + 1_000, cantidad - 100)])
+    alta_total = time.perf_counter() - inicio_alta
+    ultimas = boletas[cantidad - 100:]
+    una_por_una = por_operacion(lambda: [indice.agregar(b["nombre"], b["cliente"], b["fecha"], b["total"],
+                                                        [p for _c, p, _pr in b["lineas"]]) for b in ultimas], 100)
+
+    producto = boletas[0]["lineas"][0][1]
+    consultas = {
+        "buscar_cliente": (boletas[7]["cliente"], None, None, None, None),
+        "buscar_producto": (producto, None, None, None, None),
+        "buscar_cliente_producto_fecha": (f"{boletas[0]['cliente']} {producto}", "2025-01-01", "2025-06-30",
+                                          None, None),
+        "buscar_total": ("", None, None, 1_000.0, 1_500.0),
+        "buscar_palabras_comunes": ("cliente cordoba", None, None, None, None),   # están en todas
+    }
+    resultados = {"alta_por_boleta_lote": alta_total / (cantidad - 100), "alta_una_boleta": una_por_una}
+    for metrica, (texto, desde, hasta, total_min, total_max) in consultas.items():
+        encontradas = indice.buscar(texto, desde, hasta, total_min, total_max, limite=cantidad)
+        palabras = terminos_boleta(texto, [])
+        esperadas = [b for b in boletas
+                     if all(any(t.startswith(palabra) for t in terminos_boleta(b["cliente"], [p for _c, p, _pr in b["lineas"]]))
+                            for palabra in palabras)
+                     and (desde is None or b["fecha"] >= desde) and (hasta is None or b["fecha"][:10] <= hasta)
+                     and (total_min is None or b["total"] >= total_min)
+                     and (total_max is None or b["total"] <= total_max)]
+        verificar({b["nombre"] for b in encontradas} == {b["nombre"] for b in esperadas},
+                  f"{metrica}: resultados distintos")
+        resultados[metrica] = cronometrar(lambda: indice.buscar(texto, desde, hasta, total_min, total_max), 5)
+    indice.cerrar()
+    return resultados
+
+
+def caso_visor(entorno, por_pagina=50):
+    """Visor de boletas: páginas por fecha desde el índice (recorriendo todo el año
+    de a una página) y miniaturas del QR sin caché, desde el disco y repetidas."""
+    indice = IndiceBoletas(entorno.carpeta / "indice_visor.sqlite3")
+    cantidad = entorno.escala["boletas"]
+    inicio = datetime.datetime(2025, 1, 1, 9)
+    indice.agregar_varias({"nombre": f"boleta_{i:06d}.txt", "cliente": f"Cliente {i % 500}",
+                           "fecha": (inicio + datetime.timedelta(minutes=i * 5 // 2)).isoformat(timespec="seconds"),
+                           "total": float(i % 997), "lineas": [(1, "Producto", 1.0)]} for i in range(cantidad))
+    paginas = []
+
+    def recorrer():
+        paginas.clear()
+        antes = None
+        while True:
+            pagina = indice.buscar(limite=por_pagina, antes=antes)
+            if not pagina:
+                break
+            paginas.append(pagina)
+            antes = (pagina[-1]["fecha"], pagina[-1]["nombre"])
+
+    resultados = {"pagina": cronometrar(recorrer, 1) / (cantidad / por_pagina)}
+    nombres = [b["nombre"] for pagina in paginas for b in pagina]
+    verificar(len(nombres) == len(set(nombres)) == cantidad, "el visor repite o saltea boletas")
+    verificar(nombres == sorted(nombres, reverse=True), "el visor no sigue el orden por fecha")
+    indice.cerrar()
+
+    Image = importar_pil()[0]
+    if Image is None:
+        return resultados
+    pngs = []
+    for i in range(20):
+        ruta = entorno.carpeta / f"qr_{i}.png"
+        Image.new("RGB", (1_000, 1_000), (i * 10, 0, 0)).save(ruta)
+        pngs.append(ruta)
+    cache = CacheMiniaturas(entorno.carpeta / "miniaturas", max_archivos=10)
+    resultados["miniatura_sin_cache"] = por_operacion(lambda: [cache.cargar(r) for r in pngs[10:]], 10)
+    resultados["miniatura_en_disco"] = por_operacion(lambda: [cache.cargar(r) for r in pngs[10:]], 10)
+    cache.cargar(pngs[0])   # pasa el tope: se poda la usada hace más tiempo
+    verificar(len(list(cache.carpeta.glob("*.png"))) <= cache.max_archivos + 1, "la caché de miniaturas no se poda")
+    return resultados
+
+
+def caso_gui(entorno):
+    """Agregar, eliminar + deshacer y ordenar en VentaApp (necesita display)."""
+    import tkinter as tk
+    sistema = entorno.interfaz()
+    # Sin diálogos modales durante la medición
+    sistema.messagebox.askyesno = lambda *a, **k: True
+    sistema.messagebox.showinfo = sistema.messagebox.showerror = lambda *a, **k: None
+    root = tk.Tk()
+    app = sistema.VentaApp(root)
+    root.update()
+    productos = [p for _c, p in entorno.productos(entorno.escala["lineas"])]
+
+    def agregar():
+        for producto in productos:
+            app.producto_cb.set(producto)
+            app.agregar_producto()
+        root.update()
+
+    def eliminar_y_deshacer():
+        for linea in list(app.cart)[:100]:
+            app.vista_carrito._seleccion = linea.id
+            app.eliminar_seleccionado()
+            app.deshacer()
+        root.update()
+
+    def ordenar():
+        for columna in ("producto", "cantidad", "precio", "subtotal"):
+            app.on_header_click(columna)
+        root.update()
+
+    resultados = {
+        "agregar_producto": por_operacion(agregar, len(productos)),
+        "eliminar_y_deshacer": por_operacion(eliminar_y_deshacer, min(100, len(productos))),
+        "ordenar_columna": por_operacion(ordenar, 4),
+    }
+    app.cerrar()
+    return resultados
+
+
+CASOS = {
+    "arranque": caso_arranque,
+    "catalogo": caso_catalogo,
+    "boleta": caso_boleta,
+    "clientes": caso_clientes,
+    "busqueda": caso_busqueda,
+    "recarga": caso_recarga,
+    "categorias": caso_categorias,
+    "carrito": caso_carrito,
+    "deshacer": caso_deshacer,
+    "journal": caso_journal,
+    "orden": caso_orden,
+    "qr": caso_qr,
+    "metricas": caso_metricas,
+    "ids": caso_ids,
+    "reportes": caso_reportes,
+    "archivo": caso_archivo,
+    "indice": caso_indice,
+    "visor": caso_visor,
+    "gui": caso_gui,
+}
+
+
+# ============================================
+#   EJECUCIÓN Y COMPARACIÓN
+# ============================================
+
+def correr(escalas, casos):
+    """Corre los casos en cada escala. Devuelve {"escala/caso/métrica": segundos}."""
+    resultados = {}
+    for nombre_escala in escalas:
+        print(f"== Escala {nombre_escala}: {ESCALAS[nombre_escala]} ==")
+        with Entorno(nombre_escala) as entorno:
+            for nombre_caso in casos:
+                metricas = CASOS[nombre_caso](entorno)
+                if not metricas:
+                    print(f"  {nombre_caso:<10} (omitido)")
+                for metrica, segundos in metricas.items():
+                    resultados[f"{nombre_escala}/{nombre_caso}/{metrica}"] = segundos
+                    print(f"  {nombre_caso:<10} {metrica:<24} {segundos * 1000:>12.4f} ms")
+    return resultados
+
+
+def comparar(resultados, base, tolerancia):
+    """Lista de (clave, antes, ahora) de los casos que empeoraron más que la tolerancia."""
+    regresiones = []
+    for clave, ahora in resultados.items():
+        antes = base.get(clave)
+        if antes and ahora > antes * (1 + tolerancia):
+            regresiones.append((clave, antes, ahora))
+    return regresiones
+
+
+def hay_display():
+    """En Linux sin DISPLAY vuelve a lanzar el benchmark dentro de xvfb-run, si existe."""
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY"):
+        return True
+    xvfb = shutil.which("xvfb-run")
+    if xvfb and not os.environ.get("TPI_BENCH_XVFB"):
+        os.environ["TPI_BENCH_XVFB"] = "1"
+        os.execv(xvfb, [xvfb, "-a", sys.executable, *sys.argv])
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de boletas.")
+    parser.add_argument("--escala", default="chico", help="chico, mediano, enorme (separadas por coma) o todas")
+    parser.add_argument("--casos", default=",".join(c for c in CASOS if c != "gui"), help="casos separados por coma")
+    parser.add_argument("--gui", action="store_true", help="incluir VentaApp (usa xvfb-run si no hay display)")
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="empeoramiento permitido (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    escalas = list(ESCALAS) if args.escala == "todas" else args.escala.split(",")
+    casos = [c for c in args.casos.split(",") if c]
+    for nombre in escalas:
+        if nombre not in ESCALAS:
+            parser.error(f"escala desconocida: {nombre}")
+    for nombre in casos:
+        if nombre not in CASOS:
+            parser.error(f"caso desconocido: {nombre}")
+    if args.gui and "gui" not in casos:
+        casos.append("gui")
+    if "gui" in casos and not hay_display():
+        print("Sin display ni xvfb-run: se omiten los casos de VentaApp")
+        casos.remove("gui")
+
+    resultados = correr(escalas, casos)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({
+                "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "resultados": resultados,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+
+    codigo = 0
+    for clave, segundos, presupuesto in excede_presupuesto(resultados):
+        print(f"ARRANQUE LENTO {clave}: {segundos * 1000:.0f} ms (presupuesto {presupuesto * 1000:.0f} ms)")
+        codigo = 1
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)["resultados"]
+        regresiones = comparar(resultados, base, args.tolerancia)
+        for clave, antes, ahora in regresiones:
+            print(f"REGRESIÓN {clave}: {antes * 1000:.4f} ms -> {ahora * 1000:.4f} ms")
+        if regresiones:
+            return 1
+        print("Sin regresiones respecto de la base")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
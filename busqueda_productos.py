@@ -0,0 +1,137 @@
+"""Índice de búsqueda de productos por nombre.
+
+Se arma una sola vez al cargar el catálogo y después se le agregan o quitan
+productos de a uno cuando cambia el archivo (sin volver a armarlo). Los nombres se normalizan sin
+tildes ni mayúsculas ("Porrón Córdoba" -> "porron cordoba") y se indexan dos
+veces: una lista ordenada de palabras para buscar por prefijo con bisect, y
+un índice de trigramas para encontrar el texto en cualquier parte del nombre.
+"""
+import bisect
+import unicodedata
+from itertools import islice
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'Córdoba' -> 'cordoba'."""
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceProductos:
+    def __init__(self, nombres):
+        self.nombres = list(nombres)
+        self._normalizados = [normalizar(n) for n in self.nombres]
+        self._completos = sorted((n, i) for i, n in enumerate(self._normalizados))
+        self._palabras = []      # (palabra, id) ordenadas, para prefijos
+        trigramas_ids = {}
+        for i, nombre in enumerate(self._normalizados):
+            for palabra in set(nombre.split()):
+                self._palabras.append((palabra, i))
+            for tri in trigramas(nombre):
+                trigramas_ids.setdefault(tri, []).append(i)
+        self._palabras.sort()
+        self._trigramas = trigramas_ids  # trigrama -> ids en orden creciente
+        self._ids = {n: i for i, n in enumerate(self.nombres)}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def agregar(self, nombre):
+        """Suma un producto al índice (con un id nuevo, al final)."""
+        if nombre in self._ids:
+            return
+        i = len(self.nombres)
+        normalizado = normalizar(nombre)
+        self.nombres.append(nombre)
+        self._normalizados.append(normalizado)
+        self._ids[nombre] = i
+        bisect.insort(self._completos, (normalizado, i))
+        for palabra in set(normalizado.split()):
+            bisect.insort(self._palabras, (palabra, i))
+        for tri in trigramas(normalizado):
+            self._trigramas.setdefault(tri, []).append(i)
+
+    def quitar(self, nombre):
+        """Saca un producto del índice. Su id queda vacío: en las listas de
+        trigramas sigue estando, pero ya no coincide con ningún término."""
+        i = self._ids.pop(nombre, None)
+        if i is None:
+            return
+        normalizado = self._normalizados[i]
+        self._borrar(self._completos, (normalizado, i))
+        for palabra in set(normalizado.split()):
+            self._borrar(self._palabras, (palabra, i))
+        self.nombres[i] = None
+        self._normalizados[i] = ""
+
+    @staticmethod
+    def _borrar(lista, entrada):
+        k = bisect.bisect_left(lista, entrada)
+        if k < len(lista) and lista[k] == entrada:
+            del lista[k]
+
+    @staticmethod
+    def _rango(lista, prefijo):
+        inicio = bisect.bisect_left(lista, (prefijo,))
+        fin = bisect.bisect_left(lista, (prefijo + "\uffff",))
+        return inicio, fin
+
+    def _coincide(self, i, termino):
+        """El término es prefijo de alguna palabra o (si es largo) aparece en el nombre."""
+        nombre = self._normalizados[i]
+        if len(termino) >= 3:
+            return termino in nombre
+        return nombre.startswith(termino) or (" " + termino) in nombre
+
+    def _candidatos(self, termino):
+        """Ids que pueden coincidir con el término, primero los de prefijo de palabra."""
+        inicio, fin = self._rango(self._palabras, termino)
+        for k in range(inicio, fin):
+            yield self._palabras[k][1]
+        if len(termino) >= 3:
+            # La lista de trigramas más corta acota la búsqueda en el medio del nombre
+            listas = [self._trigramas.get(t, ()) for t in trigramas(termino)]
+            yield from min(listas, key=len)
+
+    def _costo(self, termino):
+        inicio, fin = self._rango(self._palabras, termino)
+        costo = fin - inicio
+        if len(termino) >= 3:
+            costo += min(len(self._trigramas.get(t, ())) for t in trigramas(termino))
+        return costo
+
+    def buscar(self, texto, limite=15):
+        """Nombres que contienen todas las palabras del texto, los mejores primero.
+
+        Primero los que empiezan con el texto (en orden alfabético), después
+        los que tienen una palabra que empieza así o lo contienen en el medio.
+        El trabajo depende de cuántos resultados se piden, no del catálogo.
+        """
+        consulta = " ".join(normalizar(texto).split())
+        terminos = consulta.split()
+        if not terminos:
+            return list(islice((n for n in self.nombres if n is not None), limite))
+
+        resultado = []
+        vistos = set()
+        inicio, fin = self._rango(self._completos, consulta)
+        for _nombre, i in self._completos[inicio:min(fin, inicio + limite)]:
+            resultado.append(i)
+            vistos.add(i)
+
+        if len(resultado) < limite:
+            # Se recorren los candidatos del término más selectivo y se filtra por el resto
+            guia = min(terminos, key=self._costo)
+            for i in self._candidatos(guia):
+                if i in vistos:
+                    continue
+                vistos.add(i)
+                if all(self._coincide(i, t) for t in terminos):
+                    resultado.append(i)
+                    if len(resultado) >= limite:
+                        break
+        return [self.nombres[i] for i in resultado]
@@ -0,0 +1,181 @@
+"""Deshacer y rehacer los cambios del carrito.
+
+Todos los cambios del carrito pasan por acá y cada uno se anota como una
+tupla chica con lo necesario para revertirlo y repetirlo (no el texto de la
+tabla):
+
+    ("agregar", id, producto, cantidad, precio)
+    ("cantidad", id, antes, despues)
+    ("eliminar", ((posicion, id, producto, cantidad, precio), ...))
+    ("vaciar", ((id, producto, cantidad, precio), ...))
+    ("ordenar", columna, ascendente, ids_antes)
+
+La pila de deshacer tiene un tope de operaciones y de líneas anotadas; al
+pasarlo se descartan las más viejas, así un turno largo no acumula memoria.
+"""
+from collections import deque
+
+
+def _peso(cambio):
+    """Cuántas líneas anota un cambio (para el tope de memoria)."""
+    tipo = cambio[0]
+    if tipo in ("eliminar", "vaciar"):
+        return len(cambio[1])
+    if tipo == "ordenar":
+        return len(cambio[3])
+    return 1
+
+
+class CambiosCarrito:
+    def __init__(self, carrito, max_operaciones=100, max_lineas=5_000):
+        self.carrito = carrito
+        self.max_operaciones = max_operaciones
+        self.max_lineas = max_lineas
+        self._deshacer = deque()
+        self._rehacer = []
+        self._lineas_anotadas = 0
+
+    @property
+    def puede_deshacer(self):
+        return bool(self._deshacer)
+
+    @property
+    def puede_rehacer(self):
+        return bool(self._rehacer)
+
+    def __len__(self):
+        return len(self._deshacer)
+
+    def _anotar(self, cambio):
+        # Un cambio nuevo invalida lo que se podía rehacer
+        self._rehacer.clear()
+        self._apilar(cambio)
+
+    def _apilar(self, cambio):
+        self._deshacer.append(cambio)
+        self._lineas_anotadas += _peso(cambio)
+        while self._deshacer and (len(self._deshacer) > self.max_operaciones
+                                  or self._lineas_anotadas > self.max_lineas):
+            self._lineas_anotadas -= _peso(self._deshacer.popleft())
+
+    def olvidar(self):
+        """Descarta todo el historial (p. ej. después de guardar la venta)."""
+        self._deshacer.clear()
+        self._rehacer.clear()
+        self._lineas_anotadas = 0
+
+    def menciona(self, productos):
+        """True si algún cambio de deshacer o rehacer anota una línea de esos productos.
+
+        Recorre todo el historial, que está acotado por max_lineas."""
+        productos = set(productos)
+        if not productos:
+            return False
+        for cambio in (*self._deshacer, *self._rehacer):
+            tipo = cambio[0]
+            if tipo == "agregar":
+                if cambio[2] in productos:
+                    return True
+            elif tipo == "eliminar":
+                if any(linea[2] in productos for linea in cambio[1]):
+                    return True
+            elif tipo == "vaciar":
+                if any(linea[1] in productos for linea in cambio[1]):
+                    return True
+        return False
+
+    # ---------- cambios ----------
+
+    def agregar(self, id_linea, producto, cantidad, precio):
+        linea = self.carrito.agregar(id_linea, producto, cantidad, precio)
+        self._anotar(("agregar", id_linea, producto, cantidad, precio))
+        return linea
+
+    def cambiar_cantidad(self, id_linea, cantidad):
+        antes = self.carrito.linea(id_linea).cantidad
+        linea = self.carrito.cambiar_cantidad(id_linea, cantidad)
+        self._anotar(("cantidad", id_linea, antes, cantidad))
+        return linea
+
+    def eliminar(self, ids):
+        """Quita las líneas con esos ids y devuelve las que existían.
+
+        Anotar la posición de cada línea recorre el carrito una vez (O(n)); al
+        deshacer, cada línea se vuelve a insertar sola en su lugar (O(1) si
+        era la última, O(n) si estaba en el medio; ver Carrito.insertar).
+        """
+        quitar = set(ids)
+        borradas = tuple((posicion, l.id, l.producto, l.cantidad, l.precio)
+                         for posicion, l in enumerate(self.carrito) if l.id in quitar)
+        for _posicion, id_linea, *_resto in borradas:
+            self.carrito.eliminar(id_linea)
+        if borradas:
+            self._anotar(("eliminar", borradas))
+        return borradas
+
+    def vaciar(self):
+        if not self.carrito:
+            return
+        lineas = tuple((l.id, l.producto, l.cantidad, l.precio) for l in self.carrito)
+        self.carrito.vaciar()
+        self._anotar(("vaciar", lineas))
+
+    def ordenar(self, columna, ascendente=True):
+        antes = tuple(self.carrito.ids())
+        ids = self.carrito.ordenar(columna, ascendente)
+        self._anotar(("ordenar", columna, ascendente, antes))
+        return ids
+
+    # ---------- deshacer / rehacer ----------
+
+    def deshacer(self):
+        """Revierte el último cambio y devuelve su tipo (None si no había nada)."""
+        if not self._deshacer:
+            return None
+        cambio = self._deshacer.pop()
+        self._lineas_anotadas -= _peso(cambio)
+        self._revertir(cambio)
+        self._rehacer.append(cambio)
+        return cambio[0]
+
+    def rehacer(self):
+        """Vuelve a aplicar el último cambio deshecho y devuelve su tipo."""
+        if not self._rehacer:
+            return None
+        cambio = self._rehacer.pop()
+        self._repetir(cambio)
+        self._apilar(cambio)
+        return cambio[0]
+
+    def _revertir(self, cambio):
+        carrito = self.carrito
+        tipo = cambio[0]
+        if tipo == "agregar":
+            carrito.eliminar(cambio[1])
+        elif tipo == "cantidad":
+            carrito.cambiar_cantidad(cambio[1], cambio[2])
+        elif tipo == "eliminar":
+            # Las posiciones son las de antes de borrar, de menor a mayor: al
+            # devolverlas en ese orden cada línea vuelve a su lugar
+            for posicion, id_linea, producto, cantidad, precio in cambio[1]:
+                carrito.insertar(posicion, id_linea, producto, cantidad, precio)
+        elif tipo == "vaciar":
+            for id_linea, producto, cantidad, precio in cambio[1]:
+                carrito.agregar(id_linea, producto, cantidad, precio)
+        elif tipo == "ordenar":
+            carrito.reordenar(cambio[3])
+
+    def _repetir(self, cambio):
+        carrito = self.carrito
+        tipo = cambio[0]
+        if tipo == "agregar":
+            carrito.agregar(*cambio[1:])
+        elif tipo == "cantidad":
+            carrito.cambiar_cantidad(cambio[1], cambio[3])
+        elif tipo == "eliminar":
+            for _posicion, id_linea, *_resto in cambio[1]:
+                carrito.eliminar(id_linea)
+        elif tipo == "vaciar":
+            carrito.vaciar()
+        elif tipo == "ordenar":
+            carrito.ordenar(cambio[1], cambio[2])
@@ -0,0 +1,134 @@
+"""Generador de carga para servidor_ventas.py.
+
+Simula varias cajas mandando ventas al mismo tiempo (una conexión keep-alive
+por caja) y mide ventas por segundo y la latencia de cada venta (p50, p99).
+
+Uso:
+    python carga_ventas.py [--url http://127.0.0.1:8765] [--cajas 8] [--ventas 2000] [--lineas 5]
+    python carga_ventas.py --levantar      # arranca un servidor temporal en otra carpeta
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p / 100))
+    return valores_ordenados[indice]
+
+
+def nombre_al_azar(rnd):
+    # Solo letras y espacios, como pide la caja
+    return " ".join("".join(rnd.choices(string.ascii_lowercase, k=6)).capitalize() for _ in range(2))
+
+
+def caja(url, productos, ventas, lineas, semilla, latencias, errores):
+    """Una caja: manda `ventas` ventas seguidas por la misma conexión."""
+    rnd = random.Random(semilla)
+    destino = urllib.parse.urlsplit(url)
+    conexion = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+    for _ in range(ventas):
+        cuerpo = json.dumps({
+            "cliente": nombre_al_azar(rnd),
+            "productos": [[rnd.randint(1, 5), p] for p in rnd.sample(productos, min(lineas, len(productos)))],
+        }, ensure_ascii=False).encode("utf-8")
+        inicio = time.perf_counter()
+        try:
+            conexion.request("POST", "/ventas", body=cuerpo, headers={"Content-Type": "application/json"})
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status != 201:
+                errores.append(respuesta.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(str(e))
+            conexion.close()
+            conexion = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+    conexion.close()
+
+
+def correr_carga(url, productos, cajas, ventas, lineas):
+    """Devuelve (ventas/s, p50, p99, errores)."""
+    latencias, errores = [], []
+    por_caja = max(1, ventas // cajas)
+    hilos = [threading.Thread(target=caja, args=(url, productos, por_caja, lineas, i, latencias, errores))
+             for i in range(cajas)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    latencias.sort()
+    return len(latencias) / transcurrido, percentil(latencias, 50), percentil(latencias, 99), errores
+
+
+def esperar_servidor(url, limite=30.0):
+    destino = urllib.parse.urlsplit(url)
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            conexion = http.client.HTTPConnection(destino.hostname, destino.port, timeout=1)
+            conexion.request("GET", "/salud")
+            if conexion.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"el servidor no respondió en {url}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga de ventas contra servidor_ventas.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--cajas", type=int, default=8, help="cajas simultáneas (conexiones)")
+    parser.add_argument("--ventas", type=int, default=2000, help="ventas en total")
+    parser.add_argument("--lineas", type=int, default=5, help="productos por venta")
+    parser.add_argument("--productos", default="lista_de_productos.txt", help="catálogo del que elegir productos")
+    parser.add_argument("--levantar", action="store_true",
+                        help="arrancar un servidor temporal (en una carpeta aparte) y cerrarlo al final")
+    args = parser.parse_args(argv)
+
+    from catalogo import cargar_catalogo
+    productos = list(cargar_catalogo(args.productos))
+    if not productos:
+        parser.error(f"no hay productos en {args.productos}")
+
+    servidor = carpeta = None
+    if args.levantar:
+        carpeta = tempfile.mkdtemp(prefix="tpi_carga_")
+        shutil.copy(args.productos, Path(carpeta) / "lista_de_productos.txt")
+        puerto = urllib.parse.urlsplit(args.url).port or 8765
+        servidor = subprocess.Popen(
+            [sys.executable, str(Path(__file__).with_name("servidor_ventas.py")), "--puerto", str(puerto)],
+            cwd=carpeta, env=dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent)))
+    try:
+        esperar_servidor(args.url)
+        por_segundo, p50, p99, errores = correr_carga(args.url, productos, args.cajas, args.ventas, args.lineas)
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    print(f"{args.cajas} cajas, {args.lineas} productos por venta")
+    print(f"{por_segundo:.0f} ventas/s   p50 {p50 * 1000:.1f} ms   p99 {p99 * 1000:.1f} ms   {len(errores)} errores")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
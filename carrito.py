@@ -0,0 +1,193 @@
+"""Modelo del carrito de compras.
+
+Cada línea del carrito se identifica por un id (el item id del Treeview) y se
+indexa también por producto, así agregar, sumar o eliminar son O(1).
+El total se mantiene en centavos enteros y se actualiza con la diferencia de
+cada operación, de modo que siempre coincide exactamente con recalcularlo.
+Si tiene un journal (journal_carrito.py), cada cambio se anota ahí también.
+"""
+
+from operator import attrgetter
+
+
+def a_centavos(precio):
+    """Convierte un precio en pesos (float) a centavos enteros."""
+    return int(round(precio * 100))
+
+
+class LineaCarrito:
+    __slots__ = ("id", "producto", "cantidad", "precio")
+
+    def __init__(self, id_linea, producto, cantidad, precio):
+        self.id = id_linea
+        self.producto = producto
+        self.cantidad = cantidad
+        self.precio = precio
+
+    @property
+    def subtotal(self):
+        return self.cantidad * self.precio
+
+    @property
+    def subtotal_centavos(self):
+        return self.cantidad * a_centavos(self.precio)
+
+    def __repr__(self):
+        return f"LineaCarrito({self.id!r}, {self.producto!r}, {self.cantidad}, {self.precio})"
+
+
+# Clave de ordenamiento para cada columna del carrito
+CLAVES_ORDEN = {
+    "producto": lambda linea: linea.producto.lower(),
+    "cantidad": attrgetter("cantidad"),
+    "precio": attrgetter("precio"),
+    "subtotal": attrgetter("subtotal"),
+}
+
+
+class Carrito:
+    def __init__(self):
+        self._lineas = {}        # id -> LineaCarrito (el orden del dict es el orden del carrito)
+        self._por_producto = {}  # producto -> LineaCarrito
+        self._total_centavos = 0
+        self._orden = None       # lista de ids para acceder por posición (se arma a demanda)
+        self.journal = None      # JournalCarrito donde se anotan los cambios (opcional)
+
+    def __len__(self):
+        return len(self._lineas)
+
+    def __bool__(self):
+        return bool(self._lineas)
+
+    def __iter__(self):
+        return iter(self._lineas.values())
+
+    def __contains__(self, id_linea):
+        return id_linea in self._lineas
+
+    @property
+    def total(self):
+        """Total del carrito en pesos."""
+        return self._total_centavos / 100
+
+    def linea(self, id_linea):
+        return self._lineas.get(id_linea)
+
+    def linea_de_producto(self, producto):
+        return self._por_producto.get(producto)
+
+    def agregar(self, id_linea, producto, cantidad, precio):
+        """Agrega una línea nueva. El producto no debe estar ya en el carrito."""
+        if producto in self._por_producto:
+            raise ValueError(f"El producto '{producto}' ya está en el carrito")
+        linea = LineaCarrito(id_linea, producto, cantidad, precio)
+        self._lineas[id_linea] = linea
+        self._por_producto[producto] = linea
+        if self._orden is not None:
+            self._orden.append(id_linea)
+        self._total_centavos += linea.subtotal_centavos
+        if self.journal is not None:
+            self.journal.anotar(("a", id_linea, producto, cantidad, precio))
+        return linea
+
+    def insertar(self, posicion, id_linea, producto, cantidad, precio):
+        """Agrega una línea nueva en `posicion` (para deshacer un eliminar).
+
+        Al final es O(1) como agregar; en el medio hay que rearmar el dict, que
+        es O(n) (el dict no permite insertar en el medio).
+        """
+        if posicion >= len(self._lineas):
+            return self.agregar(id_linea, producto, cantidad, precio)
+        if producto in self._por_producto:
+            raise ValueError(f"El producto '{producto}' ya está en el carrito")
+        linea = LineaCarrito(id_linea, producto, cantidad, precio)
+        lineas = list(self._lineas.items())
+        lineas.insert(posicion, (id_linea, linea))
+        self._lineas = dict(lineas)
+        self._por_producto[producto] = linea
+        if self._orden is not None:
+            self._orden.insert(posicion, id_linea)
+        self._total_centavos += linea.subtotal_centavos
+        if self.journal is not None:
+            self.journal.anotar(("i", posicion, id_linea, producto, cantidad, precio))
+        return linea
+
+    def cambiar_cantidad(self, id_linea, cantidad):
+        """Cambia la cantidad de una línea existente y ajusta el total."""
+        linea = self._lineas[id_linea]
+        self._total_centavos += (cantidad - linea.cantidad) * a_centavos(linea.precio)
+        linea.cantidad = cantidad
+        if self.journal is not None:
+            self.journal.anotar(("q", id_linea, cantidad))
+        return linea
+
+    def cambiar_precio(self, id_linea, precio):
+        """Cambia el precio unitario de una línea (p. ej. si cambió en el catálogo) y ajusta el total."""
+        linea = self._lineas[id_linea]
+        self._total_centavos += linea.cantidad * (a_centavos(precio) - a_centavos(linea.precio))
+        linea.precio = precio
+        if self.journal is not None:
+            self.journal.anotar(("p", id_linea, precio))
+        return linea
+
+    def eliminar(self, id_linea):
+        """Quita una línea y la devuelve (o None si no existía)."""
+        linea = self._lineas.pop(id_linea, None)
+        if linea is not None:
+            del self._por_producto[linea.producto]
+            self._orden = None
+            self._total_centavos -= linea.subtotal_centavos
+            if self.journal is not None:
+                self.journal.anotar(("e", id_linea))
+        return linea
+
+    def vaciar(self):
+        self._lineas.clear()
+        self._por_producto.clear()
+        self._total_centavos = 0
+        self._orden = None
+        if self.journal is not None:
+            self.journal.anotar(("v",))
+
+    def ordenar(self, columna, ascendente=True):
+        """Reordena las líneas por columna y devuelve los ids en el orden nuevo.
+
+        Calcula la clave una sola vez por línea y usa el orden estable de Python.
+        """
+        lineas = sorted(self._lineas.values(), key=CLAVES_ORDEN[columna], reverse=not ascendente)
+        self._lineas = {linea.id: linea for linea in lineas}
+        self._orden = list(self._lineas)
+        if self.journal is not None:
+            self.journal.anotar(("o", columna, ascendente))
+        return list(self._orden)
+
+    def ids(self):
+        """Ids de las líneas en el orden actual."""
+        return list(self._lineas)
+
+    def reordenar(self, ids):
+        """Pone las líneas en el orden de `ids` (los mismos ids que ya tiene el carrito)."""
+        self._lineas = {id_linea: self._lineas[id_linea] for id_linea in ids}
+        self._orden = list(self._lineas)
+        if self.journal is not None:
+            self.journal.anotar(("r", self._orden))
+
+    def rebanada(self, inicio, fin):
+        """Líneas entre las posiciones inicio y fin (para dibujar solo lo visible)."""
+        if self._orden is None:
+            self._orden = list(self._lineas)
+        return [self._lineas[id_linea] for id_linea in self._orden[inicio:fin]]
+
+    def posicion(self, id_linea):
+        """Posición de una línea en el orden actual (O(n), solo para ubicar la vista)."""
+        if self._orden is None:
+            self._orden = list(self._lineas)
+        return self._orden.index(id_linea)
+
+    def productos(self):
+        """Lista de (cantidad, producto) en el orden del carrito."""
+        return [(l.cantidad, l.producto) for l in self._lineas.values()]
+
+    def recalcular_total(self):
+        """Suma completa de las líneas (para verificar el total incremental)."""
+        return sum(l.subtotal_centavos for l in self._lineas.values()) / 100
@@ -0,0 +1,638 @@
+"""Catálogo de productos con caché compilada.
+
+El archivo de texto (lista_de_productos.txt) sigue siendo la fuente de verdad,
+pero al cargarlo se genera un archivo binario al lado (``.cat``) que se vuelve a
+construir solo si cambia el texto (mtime/tamaño y, si hace falta, hash).
+Varias terminales pueden leer el mismo .cat a la vez: se abre con mmap en modo
+solo lectura y se reemplaza de forma atómica con os.replace.
+
+Formato del .cat (little endian):
+    cabecera  MAGIA(8) | mtime_ns(q) | tamaño(q) | sha1(20s) | cantidad(I) | largo_nombres(I)
+    precios   cantidad * double
+    nombres   nombres en utf-8 separados por "\\n"
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from collections import Counter
+
+ARCHIVO_PRODUCTOS = "lista_de_productos.txt"
+
+MAGIA = b"TPICAT01"
+CABECERA = struct.Struct("<8sqq20sII")
+
+
+def ruta_compilada(ruta_txt):
+    """Devuelve la ruta del catálogo compilado asociado al archivo de texto."""
+    base, _ext = os.path.splitext(str(ruta_txt))
+    return base + ".cat"
+
+
+def parsear_linea(linea):
+    """(producto, precio) de una línea "Producto": precio, o None si no es un producto."""
+    linea = linea.strip()
+    # Saltar líneas vacías y categorías (que comienzan y terminan con -)
+    if not linea or (linea.startswith("-") and linea.endswith("-")):
+        return None
+
+    # Pasar línea formato: "Producto": precio,
+    if "\"" in linea and ": " in linea:
+        try:
+            # Extraer el nombre del producto entre comillas
+            inicio = linea.index("\"")
+            fin = linea.index("\"", inicio + 1)
+            producto = linea[inicio + 1:fin]
+
+            # Extraer el precio (después de ": " y antes de la coma)
+            precio_str = linea[fin + 2:].strip()
+            if precio_str.endswith(","):
+                precio_str = precio_str[:-1]
+            return producto, float(precio_str.strip())
+        except (ValueError, IndexError):
+            pass
+    return None
+
+
+def parsear_lista_productos(ruta_txt=ARCHIVO_PRODUCTOS):
+    """Parsea el archivo de texto línea por línea (formato "Producto": precio,)."""
+    productos = {}
+    with open(ruta_txt, "r", encoding="utf-8") as f:
+        for linea in f:
+            leido = parsear_linea(linea)
+            if leido is not None:
+                productos[leido[0]] = leido[1]
+    return productos
+
+
+def _hash_archivo(ruta):
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 16), b""):
+            h.update(bloque)
+    return h.digest()
+
+
+def compilar_catalogo(ruta_txt=ARCHIVO_PRODUCTOS, productos=None, firma=None):
+    """Escribe el catálogo compilado y devuelve el diccionario de productos."""
+    if firma is None:
+        st = os.stat(ruta_txt)
+        firma = (st.st_mtime_ns, st.st_size, _hash_archivo(ruta_txt))
+    if productos is None:
+        productos = parsear_lista_productos(ruta_txt)
+
+    nombres = "\n".join(productos.keys()).encode("utf-8")
+    precios = array("d", productos.values())
+    if struct.pack("=H", 1) != struct.pack("<H", 1):
+        precios.byteswap()
+
+    destino = ruta_compilada(ruta_txt)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as f:
+            f.write(CABECERA.pack(MAGIA, firma[0], firma[1], firma[2], len(productos), len(nombres)))
+            f.write(precios.tobytes())
+            f.write(nombres)
+        # Reemplazo atómico: los lectores ven el archivo viejo o el nuevo, nunca uno a medias
+        os.replace(temporal, destino)
+    except OSError as e:
+        print(f"No se pudo escribir el catálogo compilado: {e}")
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+    return productos
+
+
+def _leer_compilado(ruta_cat):
+    """Lee el .cat con mmap. Devuelve (cabecera, productos) o None si no es válido."""
+    try:
+        with open(ruta_cat, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if len(m) < CABECERA.size:
+                    return None
+                cabecera = CABECERA.unpack_from(m, 0)
+                magia, _mtime, _tam, _sha, cantidad, largo = cabecera
+                fin_precios = CABECERA.size + cantidad * 8
+                if magia != MAGIA or len(m) != fin_precios + largo:
+                    return None
+                precios = array("d")
+                precios.frombytes(m[CABECERA.size:fin_precios])
+                if struct.pack("=H", 1) != struct.pack("<H", 1):
+                    precios.byteswap()
+                nombres = m[fin_precios:].decode("utf-8").split("\n") if cantidad else []
+    except (OSError, ValueError, struct.error):
+        return None
+    if len(nombres) != len(precios):
+        return None
+    return cabecera, dict(zip(nombres, precios))
+
+
+def cargar_catalogo(ruta_txt=ARCHIVO_PRODUCTOS):
+    """Carga el catálogo usando la versión compilada si está al día.
+
+    Lanza FileNotFoundError si no existe el archivo de texto.
+    """
+    st = os.stat(ruta_txt)
+    leido = _leer_compilado(ruta_compilada(ruta_txt))
+    if leido is not None:
+        (_magia, mtime, tam, sha, _cant, _largo), productos = leido
+        if mtime == st.st_mtime_ns and tam == st.st_size:
+            return productos
+        # Cambió el mtime (copia, touch, git checkout): comparar contenido antes de recompilar
+        sha_actual = _hash_archivo(ruta_txt)
+        if sha_actual == sha:
+            return compilar_catalogo(ruta_txt, productos, (st.st_mtime_ns, st.st_size, sha_actual))
+        return compilar_catalogo(ruta_txt, firma=(st.st_mtime_ns, st.st_size, sha_actual))
+    return compilar_catalogo(ruta_txt)
+
+
+class Catalogo:
+    """Catálogo cargado una sola vez y compartido por toda la aplicación.
+
+    Mantiene un arreglo de nombres para buscar por código en O(1) y, si se
+    llama a iniciar_vigilancia(), un hilo que revisa el mtime del archivo y
+    recarga solo cuando cambió.
+    """
+
+    def __init__(self, ruta_txt=ARCHIVO_PRODUCTOS, intervalo=2.0):
+        self.ruta = ruta_txt
+        self.intervalo = intervalo
+        # (productos, nombres, firma) se reemplaza entero para que los lectores
+        # nunca vean un estado mezclado mientras recarga el hilo de fondo
+        self._estado = ({}, [], None)
+        self._detener = threading.Event()
+        self._hilo = None
+        self.recargar()
+
+    def _firma(self):
+        try:
+            st = os.stat(self.ruta)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def recargar(self):
+        """Vuelve a leer el catálogo desde disco."""
+        firma = self._firma()
+        try:
+            productos = cargar_catalogo(self.ruta)
+        except FileNotFoundError:
+            productos = {}
+        self._estado = (productos, list(productos), firma)
+
+    @property
+    def productos(self):
+        """Diccionario nombre -> precio."""
+        return self._estado[0]
+
+    @property
+    def existe(self):
+        return self._estado[2] is not None
+
+    def __len__(self):
+        return len(self._estado[1])
+
+    def producto_por_codigo(self, codigo):
+        """Devuelve el nombre del producto con ese código (1..n) o None."""
+        nombres = self._estado[1]
+        if 1 <= codigo <= len(nombres):
+            return nombres[codigo - 1]
+        return None
+
+    def listar_con_codigo(self):
+        """Lista de strings tipo '1: Producto - $precio'."""
+        productos = self._estado[0]
+        return [f"{i}: {nombre} - ${precio}" for i, (nombre, precio) in enumerate(productos.items(), start=1)]
+
+    def iniciar_vigilancia(self):
+        """Arranca el hilo que recarga el catálogo cuando cambia el archivo."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._vigilar, name="vigilar-catalogo", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _vigilar(self):
+        while not self._detener.wait(self.intervalo):
+            if self._firma() != self._estado[2]:
+                self.recargar()
+
+
+class DiferenciaCatalogo:
+    """Lo que cambió entre dos versiones del catálogo."""
+
+    def __init__(self):
+        self.agregados = {}   # producto -> precio
+        self.quitados = {}    # producto -> precio que tenía
+        self.precios = {}     # producto -> (precio anterior, precio nuevo)
+
+    def __bool__(self):
+        return bool(self.agregados or self.quitados or self.precios)
+
+    def __len__(self):
+        return len(self.agregados) + len(self.quitados) + len(self.precios)
+
+    def __repr__(self):
+        return (f"DiferenciaCatalogo(+{len(self.agregados)} -{len(self.quitados)} "
+                f"${len(self.precios)})")
+
+
+# Encabezado de categoría: "-Cervezas-"; con "/" se arman subcategorías ("-Bebidas/Cervezas-").
+# Se buscan desde el "\n" anterior (sin re.MULTILINE, que prueba en cada byte y es varias veces más lento)
+_ENCABEZADO = re.compile(rb"\n[ \t]*-([^\n]*)-[ \t]*\r?(?=\n|\Z)")
+_PRIMER_ENCABEZADO = re.compile(rb"[ \t]*-([^\n]*)-[ \t]*\r?(?=\n|\Z)")
+_PRODUCTO_SANGRADO = re.compile(rb'\n[ \t]+"')
+_PRIMER_PRODUCTO = re.compile(rb'[ \t]*"')
+
+
+def _contar_productos(datos, inicio, fin):
+    """Líneas de producto (las que empiezan con comillas) entre dos posiciones del archivo."""
+    cantidad = datos.count(b'\n"', inicio, fin) + len(_PRODUCTO_SANGRADO.findall(datos, inicio, fin))
+    if inicio == 0 and _PRIMER_PRODUCTO.match(datos, 0, fin):
+        cantidad += 1
+    return cantidad
+
+SIN_CATEGORIA = "Sin categoría"
+
+
+class Categoria:
+    __slots__ = ("nombre", "ruta", "tramos", "cantidad", "hijas")
+
+    def __init__(self, nombre, ruta):
+        self.nombre = nombre
+        self.ruta = ruta          # "Bebidas/Cervezas"
+        self.tramos = []          # (inicio, fin) en bytes de cada sección con este encabezado
+        self.cantidad = 0         # líneas de producto en sus secciones (sin las subcategorías)
+        self.hijas = {}           # nombre -> Categoria
+
+    def __repr__(self):
+        return f"Categoria({self.ruta!r}, {self.cantidad} productos)"
+
+
+class IndiceCategorias:
+    """Árbol de categorías de lista_de_productos.txt con la posición de cada sección.
+
+    Armarlo es buscar los encabezados con una expresión regular sobre los bytes
+    del archivo (sin parsear productos). Los productos de una categoría se leen
+    recién cuando se piden, yendo directo a sus secciones: abrir una categoría
+    cuesta lo que mide la categoría, no el catálogo. Si el archivo cambia (stat),
+    el árbol se vuelve a armar en la consulta siguiente.
+    """
+
+    def __init__(self, ruta_txt=ARCHIVO_PRODUCTOS, capacidad=32):
+        self.ruta = ruta_txt
+        self.capacidad = capacidad
+        self._firma = None
+        self._raiz = Categoria("", "")
+        self._por_ruta = {}
+        self._leidas = {}   # ruta -> {producto: precio}, las últimas categorías abiertas
+        self._revisar()
+
+    def _revisar(self):
+        try:
+            st = os.stat(self.ruta)
+            firma = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            firma = None
+        if firma == self._firma and firma is not None:
+            return
+        self._firma = firma
+        self._leidas.clear()
+        try:
+            with open(self.ruta, "rb") as f:
+                datos = f.read()
+        except OSError:
+            datos = b""
+        self._armar(datos)
+
+    def _armar(self, datos):
+        self._raiz = Categoria("", "")
+        self._por_ruta = {}
+        secciones = []   # (ruta, inicio, fin)
+        encabezados = list(_ENCABEZADO.finditer(datos))
+        primero = _PRIMER_ENCABEZADO.match(datos)
+        if primero is not None:
+            encabezados.insert(0, primero)
+        inicio_primero = encabezados[0].start() if encabezados else len(datos)
+        if _contar_productos(datos, 0, inicio_primero):
+            secciones.append((SIN_CATEGORIA, 0, inicio_primero))
+        for k, m in enumerate(encabezados):
+            fin = encabezados[k + 1].start() if k + 1 < len(encabezados) else len(datos)
+            ruta = "/".join(parte.strip() for parte in m.group(1).decode("utf-8", "replace").split("/"))
+            secciones.append((ruta, m.end(), fin))
+        for ruta, inicio, fin in secciones:
+            categoria = self._crear(ruta)
+            categoria.tramos.append((inicio, fin))
+            categoria.cantidad += _contar_productos(datos, inicio, fin)
+
+    def _crear(self, ruta):
+        nodo, actual = self._raiz, []
+        for parte in ruta.split("/"):
+            actual.append(parte)
+            if parte not in nodo.hijas:
+                nodo.hijas[parte] = Categoria(parte, "/".join(actual))
+                self._por_ruta[nodo.hijas[parte].ruta] = nodo.hijas[parte]
+            nodo = nodo.hijas[parte]
+        return nodo
+
+    def recorrer(self):
+        """(profundidad, Categoria) de todo el árbol, en el orden del archivo."""
+        self._revisar()
+        pendientes = [(0, c) for c in reversed(self._raiz.hijas.values())]
+        while pendientes:
+            profundidad, categoria = pendientes.pop()
+            yield profundidad, categoria
+            pendientes.extend((profundidad + 1, c) for c in reversed(categoria.hijas.values()))
+
+    def categoria(self, ruta):
+        self._revisar()
+        return self._por_ruta.get(ruta)
+
+    def productos(self, ruta, subcategorias=True):
+        """{producto: precio} de una categoría (y sus subcategorías), leyendo solo sus secciones."""
+        self._revisar()
+        categoria = self._por_ruta.get(ruta)
+        if categoria is None:
+            return {}
+        productos = dict(self._leer(categoria))
+        if subcategorias:
+            for hija in self._debajo(categoria):
+                productos.update(self._leer(hija))
+        return productos
+
+    @staticmethod
+    def _debajo(categoria):
+        pendientes = list(reversed(categoria.hijas.values()))
+        while pendientes:
+            hija = pendientes.pop()
+            yield hija
+            pendientes.extend(reversed(hija.hijas.values()))
+
+    def _leer(self, categoria):
+        leidos = self._leidas.pop(categoria.ruta, None)
+        if leidos is None:
+            leidos = {}
+            with open(self.ruta, "rb") as f:
+                for inicio, fin in categoria.tramos:
+                    f.seek(inicio)
+                    for linea in f.read(fin - inicio).decode("utf-8").splitlines():
+                        leido = parsear_linea(linea)
+                        if leido is not None:
+                            leidos[leido[0]] = leido[1]
+        self._leidas[categoria.ruta] = leidos   # al final: la más usada
+        while len(self._leidas) > self.capacidad:
+            del self._leidas[next(iter(self._leidas))]
+        return leidos
+
+
+def _largo_prefijo_comun(a, b, bloque=65_536):
+    """Cantidad de bytes iguales al principio de a y b (comparando de a bloques)."""
+    a, b = memoryview(a), memoryview(b)
+    limite = min(len(a), len(b))
+    inicio = 0
+    while inicio < limite and a[inicio:inicio + bloque] == b[inicio:inicio + bloque]:
+        inicio += bloque
+    fin = min(inicio + bloque, limite)
+    while inicio < fin:   # el primer byte distinto está en [inicio, fin]
+        medio = (inicio + fin + 1) // 2
+        if a[inicio:medio] == b[inicio:medio]:
+            inicio = medio
+        else:
+            fin = medio - 1
+    return inicio
+
+
+def _largo_sufijo_comun(a, b, limite, bloque=65_536):
+    """Cantidad de bytes iguales al final de a y b, sin pasar de `limite`."""
+    a, b = memoryview(a), memoryview(b)
+    largo = 0
+    while largo < limite:
+        paso = min(bloque, limite - largo)
+        if a[len(a) - largo - paso:len(a) - largo] != b[len(b) - largo - paso:len(b) - largo]:
+            break
+        largo += paso
+    else:
+        return largo
+    fin = largo + paso
+    while largo < fin:
+        medio = (largo + fin + 1) // 2
+        if a[len(a) - medio:len(a) - largo] == b[len(b) - medio:len(b) - largo]:
+            largo = medio
+        else:
+            fin = medio - 1
+    return largo
+
+
+class VigilanteCatalogo:
+    """Avisa qué productos se agregaron, quitaron o cambiaron de precio en el archivo.
+
+    Cada `intervalo` segundos hace un stat del archivo (nada más). Si cambió y
+    ya no sigue cambiando (mismo mtime/tamaño en dos revisiones seguidas, para
+    no leer un archivo a medio guardar), lo lee y lo compara con la versión
+    anterior: se saltean los bytes iguales del principio y del final y, en el
+    tramo del medio, solo se parsean las líneas que no están en las dos versiones. Así el trabajo depende de lo que se
+    editó y no del tamaño del catálogo (salvo leer el archivo).
+
+    La versión de referencia se arma en el hilo del vigilante (`preparar`), no
+    al crearlo: así no se vuelve a parsear el archivo al abrir la caja. Si se
+    pasa `base` (el catálogo ya cargado, producto -> precio), lo que el archivo
+    tenga distinto se avisa como primera diferencia.
+
+    `avisar(diferencia)` se llama desde el hilo del vigilante; quien lo use
+    tiene que pasar la diferencia a su propio hilo antes de tocar el catálogo.
+    """
+
+    def __init__(self, ruta_txt=ARCHIVO_PRODUCTOS, avisar=None, intervalo=1.0, base=None):
+        self.ruta = ruta_txt
+        self.avisar = avisar
+        self.intervalo = intervalo
+        self._texto = b""
+        self._cuenta = {}        # línea de producto -> veces que aparece en el archivo
+        self._por_producto = {}  # producto -> {línea: precio} (más de una si el producto está repetido)
+        self._precios = {}       # producto -> precio vigente (como en parsear_lista_productos, gana la última línea)
+        self._detener = threading.Event()
+        self._hilo = None
+        self._base = base
+        self._preparado = False
+        self._firma = None
+        self._pendiente = None
+        self._firma_fallida = None   # para no repetir el aviso de un archivo que no se puede leer
+
+    def preparar(self):
+        """Lee el archivo como versión de referencia. Devuelve lo que difiere de
+        `base` (o None si no se pasó o no cambió nada). Si el archivo no está o
+        no se puede leer, se vuelve a intentar en la próxima revisión."""
+        firma = self._leer_firma()
+        if firma is None or self._comparar(self._leer_texto()) is None:
+            return None
+        self._firma, self._preparado = firma, True
+        base, self._base = self._base, None
+        if base is None:
+            return None
+        diferencia = DiferenciaCatalogo()
+        for producto, precio in self._precios.items():
+            anterior = base.get(producto)
+            if anterior is None:
+                diferencia.agregados[producto] = precio
+            elif anterior != precio:
+                diferencia.precios[producto] = (anterior, precio)
+        for producto, precio in base.items():
+            if producto not in self._precios:
+                diferencia.quitados[producto] = precio
+        return diferencia or None
+
+    def _leer_firma(self):
+        try:
+            st = os.stat(self.ruta)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _leer_texto(self):
+        try:
+            with open(self.ruta, "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+
+    def revisar(self):
+        """Una revisión: la diferencia si el archivo cambió, o None."""
+        if not self._preparado:
+            return self.preparar()
+        firma = self._leer_firma()
+        if firma == self._firma:
+            self._pendiente = None
+            return None
+        if firma != self._pendiente:
+            self._pendiente = firma   # esperar a que deje de cambiar
+            return None
+        self._pendiente = None
+        diferencia = self._comparar(self._leer_texto())
+        # si no se pudo leer, la firma vieja queda: se reintenta en las próximas revisiones
+        if diferencia is not None:
+            self._firma = firma
+        return diferencia
+
+    def _tramo_cambiado(self, nuevo):
+        """(inicio, fin_viejo, fin_nuevo): el tramo de líneas enteras que difiere."""
+        viejo = self._texto
+        inicio = _largo_prefijo_comun(viejo, nuevo)
+        inicio = viejo.rfind(b"\n", 0, inicio) + 1   # retroceder al principio de la línea
+        sufijo = _largo_sufijo_comun(viejo, nuevo, min(len(viejo), len(nuevo)) - inicio)
+        fin_viejo, fin_nuevo = len(viejo) - sufijo, len(nuevo) - sufijo
+        if ((fin_viejo > inicio and viejo[fin_viejo - 1:fin_viejo] != b"\n")
+                or (fin_nuevo > inicio and nuevo[fin_nuevo - 1:fin_nuevo] != b"\n")):
+            # avanzar al principio de la línea siguiente (el sufijo es igual en los dos)
+            salto = viejo.find(b"\n", fin_viejo)
+            sufijo = 0 if salto < 0 else len(viejo) - salto - 1
+        return inicio, len(viejo) - sufijo, len(nuevo) - sufijo
+
+    def _comparar(self, nuevo):
+        inicio, fin_viejo, fin_nuevo = self._tramo_cambiado(nuevo)
+        try:
+            antes = self._texto[inicio:fin_viejo].decode("utf-8").splitlines()
+            despues = nuevo[inicio:fin_nuevo].decode("utf-8").splitlines()
+        except UnicodeDecodeError as e:
+            firma = self._leer_firma()
+            if firma != self._firma_fallida:
+                self._firma_fallida = firma
+                print(f"No se pudo leer {self.ruta}: {e}")
+            return None
+        self._texto = nuevo
+        # dentro del tramo, solo se parsean las líneas que no están en las dos versiones
+        # (las categorías y líneas vacías, que se repiten, no interesan)
+        antes = [linea for linea in antes if "\"" in linea]
+        despues = [linea for linea in despues if "\"" in linea]
+        conjunto_antes, conjunto_despues = set(antes), set(despues)
+        if len(conjunto_antes) == len(antes) and len(conjunto_despues) == len(despues):
+            quitadas = conjunto_antes - conjunto_despues
+            agregadas = [linea for linea in despues if linea not in conjunto_antes]
+        else:
+            # líneas repetidas: hay que llevar la cuenta de cada una
+            quitadas = (Counter(antes) - Counter(despues)).elements()
+            agregadas = (Counter(despues) - Counter(antes)).elements()
+
+        tocados = {}   # producto -> precio antes del cambio (None si no existía)
+        for linea in quitadas:
+            leido = parsear_linea(linea)
+            if leido is None:
+                continue
+            linea = linea.strip()
+            producto = leido[0]
+            tocados.setdefault(producto, self._precios.get(producto))
+            self._cuenta[linea] -= 1
+            if not self._cuenta[linea]:
+                del self._cuenta[linea]
+                del self._por_producto[producto][linea]
+        for linea in agregadas:
+            leido = parsear_linea(linea)
+            if leido is None:
+                continue
+            linea = linea.strip()
+            producto, precio = leido
+            tocados.setdefault(producto, self._precios.get(producto))
+            self._cuenta[linea] = self._cuenta.get(linea, 0) + 1
+            if self._cuenta[linea] == 1:
+                self._por_producto.setdefault(producto, {})[linea] = precio
+
+        diferencia = DiferenciaCatalogo()
+        for producto, antes in tocados.items():
+            despues = self._precio(self._por_producto.get(producto), nuevo)
+            if despues is None:
+                self._por_producto.pop(producto, None)
+                self._precios.pop(producto, None)
+                if antes is not None:
+                    diferencia.quitados[producto] = antes
+            elif antes is None:
+                diferencia.agregados[producto] = despues
+            elif antes != despues:
+                diferencia.precios[producto] = (antes, despues)
+            if despues is not None:
+                self._precios[producto] = despues
+        return diferencia
+
+    @staticmethod
+    def _precio(lineas, texto):
+        """Precio de un producto: el de su última línea en el archivo."""
+        if not lineas:
+            return None
+        if len(lineas) == 1:
+            return next(iter(lineas.values()))
+        # producto repetido (raro): se busca cuál de sus líneas aparece más abajo
+        for linea in reversed(texto.decode("utf-8").splitlines()):
+            if linea.strip() in lineas:
+                return lineas[linea.strip()]
+        return None
+
+    def productos(self):
+        """El catálogo completo según la última revisión (producto -> precio)."""
+        if not self._preparado:
+            self.preparar()
+        return dict(self._precios)
+
+    def iniciar(self):
+        """Arranca el hilo que revisa el archivo y llama a avisar() con cada cambio."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._vigilar, name="vigilar-catalogo", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _vigilar(self):
+        # la primera revisión (armar la referencia) es apenas arranca el hilo
+        while True:
+            try:
+                diferencia = self.revisar()
+            except Exception as e:
+                print(f"No se pudo revisar el catálogo: {e}")
+                diferencia = None
+            if diferencia and self.avisar is not None:
+                self.avisar(diferencia)
+            if self._detener.wait(self.intervalo):
+                return
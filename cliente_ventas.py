@@ -0,0 +1,57 @@
+"""Cliente del servidor de ventas (servidor_ventas.py), para usar VentaApp como caja liviana.
+
+Usa urllib de la biblioteca estándar. Los errores de validación del servidor
+llegan como ValueError con su mensaje (LookupError si algo no existe); si el
+servidor no responde se propaga el OSError de la conexión.
+"""
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+class ClienteVentas:
+    def __init__(self, url="http://127.0.0.1:8765", timeout=5.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _pedir(self, metodo, ruta, datos=None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8") if datos is not None else None
+        pedido = urllib.request.Request(self.url + ruta, data=cuerpo, method=metodo,
+                                        headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(pedido, timeout=self.timeout) as respuesta:
+                return json.loads(respuesta.read())
+        except urllib.error.HTTPError as e:
+            try:
+                mensaje = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                mensaje = e.reason
+            if e.code == 404:
+                raise LookupError(mensaje) from None
+            raise ValueError(mensaje) from None
+
+    def registrar_venta(self, cliente, productos):
+        """Manda la venta [(cantidad, producto), ...]; devuelve nombre, fecha, total y contenido."""
+        return self._pedir("POST", "/ventas", {"cliente": cliente, "productos": [list(p) for p in productos]})
+
+    def boleta(self, nombre):
+        """La boleta guardada con ese nombre, o None si el servidor no la tiene."""
+        try:
+            return self._pedir("GET", "/boletas/" + urllib.parse.quote(nombre))
+        except LookupError:
+            return None
+
+    def clientes(self, prefijo="", limite=8):
+        """Clientes que empiezan con el prefijo, el más reciente primero."""
+        consulta = urllib.parse.urlencode({"prefijo": prefijo, "limite": limite})
+        return self._pedir("GET", "/clientes?" + consulta)["clientes"]
+
+    def buscar(self, texto="", desde=None, hasta=None, total_min=None, total_max=None, limite=100, antes=None):
+        """Boletas del índice del servidor (ver IndiceBoletas.buscar)."""
+        filtros = {"texto": texto, "desde": desde, "hasta": hasta, "min": total_min, "max": total_max,
+                   "limite": limite}
+        if antes is not None:
+            filtros["antes_fecha"], filtros["antes_nombre"] = antes
+        consulta = urllib.parse.urlencode({k: v for k, v in filtros.items() if v not in (None, "")})
+        return self._pedir("GET", "/buscar?" + consulta)["boletas"]
@@ -0,0 +1,146 @@
+"""Historial de clientes con autocompletado.
+
+En memoria se guarda el orden de uso (MRU) en un OrderedDict, así promover un
+cliente es O(1), y un trie por prefijo donde cada nodo recuerda sus K clientes
+más recientes, así las sugerencias no dependen de cuántos clientes haya.
+
+En disco, clientes.txt sigue siendo la lista completa (más reciente primero);
+cada venta solo agrega una línea a clientes.log. Cada tanto se compacta: se
+reescribe clientes.txt desde memoria y se vacía el log.
+"""
+import os
+from collections import OrderedDict
+
+
+def normalizar(texto):
+    return texto.strip().casefold()
+
+
+class _Nodo:
+    __slots__ = ("hijos", "recientes")
+
+    def __init__(self):
+        self.hijos = {}
+        self.recientes = []   # hasta K nombres, el más reciente primero
+
+
+class HistorialClientes:
+    def __init__(self, ruta="clientes.txt", ruta_log=None, por_nodo=8, compactar_cada=1000):
+        self.ruta = ruta
+        self.ruta_log = ruta_log or os.path.splitext(ruta)[0] + ".log"
+        self.por_nodo = por_nodo
+        self.compactar_cada = compactar_cada
+        self._mru = OrderedDict()   # nombre -> None, el más reciente al final
+        self._raiz = _Nodo()
+        self._lineas_log = 0
+        self._log = None
+        self._cargar()
+
+    def _cargar(self):
+        nombres = []
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                nombres = [linea.strip() for linea in f if linea.strip()]
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.ruta_log, "r", encoding="utf-8") as f:
+                log = [linea.strip() for linea in f if linea.strip()]
+        except FileNotFoundError:
+            log = []
+        self._lineas_log = len(log)
+
+        # Orden final del más reciente al más viejo: primero el log (al revés),
+        # después clientes.txt, sin repetidos
+        orden = list(dict.fromkeys([*reversed(log), *nombres]))
+        self._mru = OrderedDict.fromkeys(reversed(orden))
+        # Al recorrer del más reciente al más viejo alcanza con completar cada nodo
+        for nombre in orden:
+            nodo = self._raiz
+            for letra in normalizar(nombre):
+                hijo = nodo.hijos.get(letra)
+                if hijo is None:
+                    hijo = nodo.hijos[letra] = _Nodo()
+                nodo = hijo
+                if len(nodo.recientes) < self.por_nodo:
+                    nodo.recientes.append(nombre)
+
+    def __len__(self):
+        return len(self._mru)
+
+    def __contains__(self, nombre):
+        return nombre in self._mru
+
+    def _promover(self, nombre):
+        self._mru[nombre] = None
+        self._mru.move_to_end(nombre)
+        # Poner el nombre primero en la lista de recientes de cada prefijo
+        nodo = self._raiz
+        for letra in normalizar(nombre):
+            nodo = nodo.hijos.setdefault(letra, _Nodo())
+            recientes = nodo.recientes
+            if nombre in recientes:
+                recientes.remove(nombre)
+            recientes.insert(0, nombre)
+            del recientes[self.por_nodo:]
+
+    def registrar(self, nombre):
+        """Marca al cliente como el más reciente. En disco cuesta un append."""
+        if not nombre or not nombre.strip():
+            return
+        nombre = nombre.strip()
+        self._promover(nombre)
+        try:
+            if self._log is None:
+                self._log = open(self.ruta_log, "a", encoding="utf-8")
+            self._log.write(nombre + "\n")
+            self._log.flush()
+            self._lineas_log += 1
+        except OSError as e:
+            print(f"No se pudo guardar cliente: {e}")
+        if self._lineas_log >= self.compactar_cada:
+            self.compactar()
+
+    def sugerencias(self, prefijo, limite=8):
+        """Hasta `limite` clientes que empiezan con el prefijo, el más reciente primero."""
+        prefijo = normalizar(prefijo)
+        if not prefijo:
+            return self.recientes(limite)
+        nodo = self._raiz
+        for letra in prefijo:
+            nodo = nodo.hijos.get(letra)
+            if nodo is None:
+                return []
+        return nodo.recientes[:limite]
+
+    def recientes(self, limite=None):
+        """Clientes del más reciente al más viejo."""
+        resultado = []
+        for nombre in reversed(self._mru):
+            if limite is not None and len(resultado) >= limite:
+                break
+            resultado.append(nombre)
+        return resultado
+
+    def compactar(self):
+        """Reescribe clientes.txt desde memoria y vacía el log."""
+        temporal = self.ruta + ".tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                for nombre in reversed(self._mru):
+                    f.write(nombre + "\n")
+            os.replace(temporal, self.ruta)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            open(self.ruta_log, "w", encoding="utf-8").close()
+            self._lineas_log = 0
+        except OSError as e:
+            print(f"No se pudo compactar el historial de clientes: {e}")
+
+    def cerrar(self):
+        if self._lineas_log:
+            self.compactar()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
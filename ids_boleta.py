@@ -0,0 +1,93 @@
+"""Identificadores únicos de boleta: terminal + secuencia.
+
+Cada caja tiene su propio contador en disco (boletas/secuencia_<terminal>.txt).
+Para no tocar el disco en cada venta, el asignador reserva bloques de números:
+bajo un lock de archivo (sirve entre procesos de la misma caja) lee el próximo
+libre, escribe próximo + bloque de forma atómica (archivo temporal + fsync +
+os.replace) y después entrega los números del bloque desde memoria.
+
+Si el programa se corta, los números que quedaban del bloque se pierden, pero
+nunca se repiten: la secuencia es creciente y puede tener huecos.
+"""
+import os
+import re
+import socket
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def terminal_actual():
+    """Nombre de esta caja: TPI_TERMINAL o el nombre del equipo (solo letras y números)."""
+    nombre = os.environ.get("TPI_TERMINAL") or socket.gethostname().split(".")[0]
+    return re.sub(r"[^A-Za-z0-9]", "", nombre) or "caja"
+
+
+def _bloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _desbloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AsignadorIds:
+    def __init__(self, ruta_contador, terminal=None, bloque=100):
+        self.ruta = Path(ruta_contador)
+        self.ruta_lock = self.ruta.with_name(self.ruta.name + ".lock")
+        self.terminal = terminal or terminal_actual()
+        self.bloque = bloque
+        self._lock = threading.Lock()
+        self._proximo = self._limite = 0   # bloque reservado: [proximo, limite)
+
+    def _leer(self):
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 1)
+        except FileNotFoundError:
+            return 1
+
+    def _escribir(self, valor):
+        temporal = self.ruta.with_name(self.ruta.name + ".tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(f"{valor}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+
+    def _reservar(self):
+        """Reserva el próximo bloque de números (un lock y un fsync por bloque)."""
+        with open(self.ruta_lock, "a+b") as lock:
+            _bloquear(lock)
+            try:
+                inicio = self._leer()
+                self._escribir(inicio + self.bloque)
+            finally:
+                _desbloquear(lock)
+        self._proximo, self._limite = inicio, inicio + self.bloque
+
+    def siguiente_numero(self):
+        """El próximo número de la secuencia de esta caja."""
+        with self._lock:
+            if self._proximo >= self._limite:
+                self._reservar()
+            numero = self._proximo
+            self._proximo += 1
+            return numero
+
+    def siguiente(self):
+        """Identificador de boleta: "<terminal>-<secuencia>", p. ej. "caja1-000042"."""
+        return f"{self.terminal}-{self.siguiente_numero():06d}"
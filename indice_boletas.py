@@ -0,0 +1,245 @@
+"""Índice invertido para buscar boletas viejas ("¿cuándo compré X?").
+
+Cada boleta se parte en palabras (del cliente y de los productos, en minúsculas
+y sin tildes) y se anota una fila (palabra, boleta) en una tabla SQLite
+ordenada por palabra. Buscar "ana vino" es intersecar los conjuntos de boletas
+de cada palabra (por prefijo, así "vin" también encuentra "vino"), filtrando
+por fecha y total con sus índices: no se abre ningún archivo de boletas/.
+
+guardar_boleta_en_disco agrega cada venta al guardarla. Las boletas de antes
+del índice se cargan con `python indice_boletas.py --reconstruir` (o solas,
+la primera vez que se busca desde la ventana): el índice anota que ya se
+cargaron (user_version), así no alcanza con que tenga alguna venta nueva.
+
+Uso:
+    python indice_boletas.py ana vino [--desde 2025-01-01] [--hasta 2025-12-31] [--min 100] [--max 5000]
+    python indice_boletas.py --reconstruir [--carpeta boletas]
+"""
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import sys
+import threading
+import unicodedata
+from pathlib import Path
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS boletas (
+    id      INTEGER PRIMARY KEY,
+    nombre  TEXT NOT NULL UNIQUE,
+    cliente TEXT NOT NULL,
+    fecha   TEXT NOT NULL,          -- ISO 8601
+    total   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terminos (
+    termino   TEXT NOT NULL,
+    boleta_id INTEGER NOT NULL,
+    PRIMARY KEY (termino, boleta_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_terminos_boleta ON terminos(boleta_id, termino);
+DROP INDEX IF EXISTS idx_indice_fecha;
+CREATE INDEX IF NOT EXISTS idx_indice_fecha_nombre ON boletas(fecha, nombre);
+CREATE INDEX IF NOT EXISTS idx_indice_total ON boletas(total);
+"""
+
+COLUMNAS = ("nombre", "cliente", "fecha", "total")
+
+# Hasta cuántas boletas se cuentan por palabra para elegir por cuál empezar
+TOPE_CONTEO = 2_000
+
+_CONTEO = "SELECT COUNT(*) FROM (SELECT 1 FROM terminos WHERE termino >= ? AND termino < ? LIMIT ?)"
+_TIENE = "EXISTS (SELECT 1 FROM terminos t WHERE t.boleta_id = b.id AND t.termino >= ? AND t.termino < ?)"
+
+_SEPARADOR = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto):
+    """Palabras de un texto, en minúsculas y sin tildes: "Córdoba 750ml" -> ["cordoba", "750ml"]."""
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return [palabra for palabra in _SEPARADOR.split(sin_tildes.lower()) if palabra]
+
+
+def terminos_boleta(cliente, productos):
+    """Conjunto de palabras por las que se encuentra una boleta."""
+    terminos = set(normalizar(cliente))
+    for producto in productos:
+        terminos.update(normalizar(producto))
+    return terminos
+
+
+def _rango_prefijo(palabra):
+    """(desde, hasta) de los términos que empiezan con `palabra`: palabra <= t < hasta."""
+    return palabra, palabra[:-1] + chr(ord(palabra[-1]) + 1)
+
+
+def _dia_siguiente(dia):
+    return (datetime.date.fromisoformat(dia) + datetime.timedelta(days=1)).isoformat()
+
+
+class IndiceBoletas:
+    def __init__(self, ruta_db: Path):
+        self.ruta_db = Path(ruta_db)
+        # Se agrega desde el hilo de la cola de guardado y se busca desde el de Tk
+        self._conexion = sqlite3.connect(str(self.ruta_db), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexion.executescript(ESQUEMA)
+
+    def agregar(self, nombre, cliente, fecha, total, productos):
+        """Indexa una boleta. Una boleta no cambia después de guardada, así que si
+        ya estaba ese nombre (p. ej. al reprocesar el journal) no se hace nada."""
+        with self._lock, self._conexion:
+            self._insertar(nombre, cliente, fecha, total, productos)
+
+    def agregar_varias(self, boletas):
+        """Indexa varias boletas (diccionarios como los de armar_boleta) en una transacción."""
+        with self._lock, self._conexion:
+            for b in boletas:
+                self._insertar(b["nombre"], b["cliente"], b["fecha"], b["total"],
+                               [producto for _cantidad, producto, _precio in b["lineas"]])
+
+    def _insertar(self, nombre, cliente, fecha, total, productos):
+        cursor = self._conexion.execute(
+            "INSERT OR IGNORE INTO boletas (nombre, cliente, fecha, total) VALUES (?, ?, ?, ?)",
+            (nombre, cliente, fecha, total))
+        if not cursor.rowcount:
+            return
+        boleta_id = cursor.lastrowid
+        self._conexion.executemany("INSERT INTO terminos (termino, boleta_id) VALUES (?, ?)",
+                                   [(termino, boleta_id) for termino in terminos_boleta(cliente, productos)])
+
+    def buscar(self, texto="", desde=None, hasta=None, total_min=None, total_max=None, limite=100, antes=None):
+        """Boletas con todas las palabras de `texto` (como prefijo) en el cliente o
+        en algún producto, entre los días desde y hasta (ISO, inclusive) y con el
+        total en el rango. De la más nueva a la más vieja.
+
+        Para paginar, `antes` es (fecha, nombre) de la última boleta de la página
+        anterior: la consulta sigue desde ahí por el índice, sin OFFSET."""
+        rangos = [_rango_prefijo(palabra) for palabra in set(normalizar(texto))]
+        with self._lock:
+            # Se empieza por la palabra con menos boletas; las demás se verifican
+            # por boleta con el índice (boleta_id, termino)
+            conteos = {rango: self._conexion.execute(_CONTEO, (*rango, TOPE_CONTEO)).fetchone()[0]
+                       for rango in rangos}
+            rangos.sort(key=conteos.get)
+            condiciones, parametros = [], []
+            if rangos and conteos[rangos[0]] < TOPE_CONTEO:
+                condiciones.append("b.id IN (SELECT boleta_id FROM terminos WHERE termino >= ? AND termino < ?)")
+                parametros += rangos[0]
+                rangos = rangos[1:]
+            # Si todas las palabras son muy comunes se recorren las boletas de la más
+            # nueva a la más vieja y se corta al llegar al límite
+            for rango in rangos:
+                condiciones.append(_TIENE)
+                parametros += rango
+            if desde:
+                condiciones.append("b.fecha >= ?")
+                parametros.append(desde)
+            if hasta:
+                condiciones.append("b.fecha < ?")
+                parametros.append(_dia_siguiente(hasta))
+            if total_min is not None:
+                condiciones.append("b.total >= ?")
+                parametros.append(total_min)
+            if total_max is not None:
+                condiciones.append("b.total <= ?")
+                parametros.append(total_max)
+            if antes is not None:
+                condiciones.append("(b.fecha, b.nombre) < (?, ?)")
+                parametros += antes
+            where = " AND ".join(condiciones) or "1"
+            filas = self._conexion.execute(
+                f"SELECT {', '.join('b.' + c for c in COLUMNAS)} FROM boletas b WHERE {where} "
+                "ORDER BY b.fecha DESC, b.nombre DESC LIMIT ?", (*parametros, limite)).fetchall()
+        return [dict(zip(COLUMNAS, fila)) for fila in filas]
+
+    def cantidad(self):
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM boletas").fetchone()[0]
+
+    def reconstruir(self, almacen=None, carpeta=None, archivo=None):
+        """Indexa lo que ya estaba guardado: las boletas del almacén y los .txt de
+        `carpeta` (y del ArchivoBoletas `archivo`) que no estén en él. Devuelve
+        cuántas boletas quedaron indexadas."""
+        from reportes import parsear_boleta
+
+        boletas = []
+        if almacen is not None:
+            boletas.extend(almacen.todas())
+        vistas = {b["nombre"] for b in boletas}
+        textos = []   # (nombre, función que devuelve el texto)
+        if carpeta is not None and os.path.isdir(carpeta):
+            for entrada in os.scandir(carpeta):
+                if entrada.name.endswith(".txt") and entrada.name not in vistas:
+                    textos.append((entrada.name, lambda ruta=entrada.path: Path(ruta).read_text(encoding="utf-8")))
+        if archivo is not None:
+            for _segmento, nombre, _tamanio, _mtime in archivo.nombres_desde(0):
+                if nombre.endswith(".txt") and nombre not in vistas:
+                    textos.append((nombre, lambda nombre=nombre: archivo.leer(nombre).decode("utf-8")))
+        for nombre, leer in textos:
+            try:
+                resumen = parsear_boleta(leer())
+            except (OSError, UnicodeDecodeError, ValueError):
+                continue
+            if resumen is not None:
+                fecha, cliente, total, lineas = resumen
+                boletas.append({"nombre": nombre, "cliente": cliente, "fecha": fecha, "total": total,
+                                "lineas": [(cantidad, producto, None) for producto, cantidad, _s in lineas]})
+        self.agregar_varias(boletas)
+        with self._lock:
+            self._conexion.execute("PRAGMA user_version=1")
+        return self.cantidad()
+
+    def reconstruido(self):
+        """True si ya se cargaron las boletas que había antes del índice."""
+        with self._lock:
+            return self._conexion.execute("PRAGMA user_version").fetchone()[0] >= 1
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buscar boletas por cliente, producto, fecha y total.")
+    parser.add_argument("texto", nargs="*", help="palabras del cliente o de los productos")
+    parser.add_argument("--carpeta", default="boletas", help="carpeta de boletas (índice y almacén)")
+    parser.add_argument("--desde", default=None, help="AAAA-MM-DD")
+    parser.add_argument("--hasta", default=None, help="AAAA-MM-DD (inclusive)")
+    parser.add_argument("--min", type=float, default=None, dest="total_min", help="total mínimo")
+    parser.add_argument("--max", type=float, default=None, dest="total_max", help="total máximo")
+    parser.add_argument("--limite", type=int, default=50)
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="indexar las boletas del almacén y los .txt que ya estaban")
+    args = parser.parse_args(argv)
+
+    carpeta = Path(args.carpeta)
+    carpeta.mkdir(exist_ok=True)
+    indice = IndiceBoletas(carpeta / "indice.sqlite3")
+    try:
+        if args.reconstruir:
+            from almacen_boletas import AlmacenBoletas
+            from archivo_boletas import ArchivoBoletas
+            almacen = AlmacenBoletas(carpeta / "boletas.sqlite3")
+            archivo = ArchivoBoletas(carpeta)
+            try:
+                print(f"{indice.reconstruir(almacen, carpeta, archivo)} boletas indexadas")
+            finally:
+                almacen.cerrar()
+                archivo.cerrar()
+            if not args.texto:
+                return 0
+        for b in indice.buscar(" ".join(args.texto), args.desde, args.hasta, args.total_min, args.total_max,
+                               args.limite):
+            print(f"{b['fecha'].replace('T', ' ')}  {b['cliente']:<30} ${b['total']:>12.2f}  {b['nombre']}")
+    finally:
+        indice.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
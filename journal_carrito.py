@@ -0,0 +1,184 @@
+"""Journal del carrito abierto, para recuperarlo si se corta la luz o se cuelga el programa.
+
+Cada cambio del carrito (agregar, cantidad, precio, eliminar, vaciar, ordenar,
+y también lo que hacen deshacer y rehacer) y el nombre del cliente se anotan
+como una línea JSON corta al final del archivo:
+
+    ["a", id, producto, cantidad, precio]   agregar
+    ["i", posicion, id, producto, cantidad, precio]
+                                            volver a poner una línea borrada
+    ["q", id, cantidad]                     cambiar cantidad
+    ["p", id, precio]                       cambiar precio
+    ["e", id]                               eliminar
+    ["v"]                                   vaciar
+    ["o", columna, ascendente]              ordenar
+    ["r", [id, ...]]                        reordenar (deshacer un ordenar)
+    ["c", cliente]                          nombre del cliente
+
+Anotar es escribir esa línea y pasarla al sistema operativo (sobrevive a que
+se cuelgue el programa); el fsync lo hace un hilo aparte cada `intervalo`
+segundos si hubo cambios (si se corta la luz se pierde como mucho eso). Cuando
+el journal tiene muchas más líneas que el carrito se compacta: se reescribe
+con una línea "a" por línea del carrito y el cliente.
+
+Al abrir la caja, `recuperar(carrito)` vuelve a aplicar el journal sobre un
+carrito vacío. El historial de deshacer no se recupera.
+"""
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class JournalCarrito:
+    def __init__(self, ruta, intervalo=1.0, min_compactar=1_000):
+        self.ruta = Path(ruta)
+        self.intervalo = intervalo
+        self.min_compactar = min_compactar
+        self.carrito = None
+        self.cliente = ""
+        self._archivo = None
+        self._registros = 0       # líneas del journal desde la última compactación
+        self._sucio = False       # hay líneas escritas que todavía no pasaron por fsync
+        # Anotar corre solo en el hilo de Tk y no toma el lock; el lock evita que
+        # el hilo del fsync use el archivo mientras se compacta o se cierra
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def recuperar(self, carrito):
+        """Aplica el journal de la ejecución anterior sobre `carrito` (vacío) y
+        devuelve el nombre del cliente. Las líneas cortadas o que no se pueden
+        aplicar se saltean."""
+        cliente = ""
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                        if registro[0] == "c":
+                            cliente = registro[1]
+                        else:
+                            _aplicar(carrito, registro)
+                    except (ValueError, LookupError, TypeError):
+                        continue  # línea cortada por un corte de luz
+        except FileNotFoundError:
+            pass
+        return cliente
+
+    def conectar(self, carrito, cliente=""):
+        """Empieza a anotar los cambios de `carrito`, partiendo de su estado actual."""
+        self.carrito = carrito
+        self.cliente = cliente
+        self.compactar()
+        carrito.journal = self
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._sincronizar, name="journal-carrito", daemon=True)
+            self._hilo.start()
+            # Garantía de fsync al salir aunque no se cierre la ventana
+            atexit.register(self.cerrar)
+
+    def anotar(self, registro):
+        archivo = self._archivo
+        if archivo is None:
+            return
+        archivo.write(_linea(registro))
+        archivo.flush()
+        self._sucio = True
+        self._registros += 1
+        if self._registros > self.min_compactar and self._registros > 4 * len(self.carrito):
+            self.compactar()
+
+    def anotar_cliente(self, cliente):
+        if cliente != self.cliente:
+            self.cliente = cliente
+            self.anotar(("c", cliente))
+
+    def compactar(self):
+        """Reescribe el journal con solo el estado actual del carrito (y fsync)."""
+        self._reescribir(self.carrito, self.cliente)
+
+    def reiniciar(self):
+        """Deja el journal vacío (y fsync) aunque el carrito todavía no se limpió:
+        la venta ya quedó guardada y no tiene que volver a recuperarse."""
+        self._reescribir((), "")
+
+    def _reescribir(self, lineas, cliente):
+        temporal = self.ruta.with_name(self.ruta.name + ".tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            for l in lineas:
+                f.write(_linea(("a", l.id, l.producto, l.cantidad, l.precio)))
+            if cliente:
+                f.write(_linea(("c", cliente)))
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            if self._archivo is not None:
+                self._archivo.close()
+            os.replace(temporal, self.ruta)
+            self._archivo = open(self.ruta, "a", encoding="utf-8")
+            self._registros = len(lineas) + bool(cliente)
+            self._sucio = False
+
+    def _sincronizar(self):
+        while not self._parar.wait(self.intervalo):
+            if not self._sucio:
+                continue
+            with self._lock:
+                if self._archivo is None:
+                    return
+                self._sucio = False
+                try:
+                    os.fsync(self._archivo.fileno())
+                except (OSError, ValueError) as e:
+                    print(f"No se pudo sincronizar el journal del carrito: {e}")
+
+    def cerrar(self):
+        """Deja el journal en disco. Si el carrito quedó vacío ya no hace falta y se borra;
+        si no, al volver a abrir la caja se recupera (p. ej. si se cerró la ventana sin querer)."""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        with self._lock:
+            if self._archivo is None:
+                return
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+            self._archivo.close()
+            self._archivo = None
+            if not self.carrito:
+                try:
+                    os.remove(self.ruta)
+                except OSError:
+                    pass
+        if self.carrito is not None:
+            self.carrito.journal = None
+
+
+# Un solo codificador: json.dumps con opciones arma uno nuevo en cada llamada
+_CODIFICADOR = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _linea(registro):
+    return _CODIFICADOR.encode(registro) + "\n"
+
+
+def _aplicar(carrito, registro):
+    tipo = registro[0]
+    if tipo == "a":
+        carrito.agregar(*registro[1:5])
+    elif tipo == "i":
+        carrito.insertar(*registro[1:6])
+    elif tipo == "q":
+        carrito.cambiar_cantidad(registro[1], registro[2])
+    elif tipo == "p":
+        carrito.cambiar_precio(registro[1], registro[2])
+    elif tipo == "e":
+        carrito.eliminar(registro[1])
+    elif tipo == "v":
+        carrito.vaciar()
+    elif tipo == "o":
+        carrito.ordenar(registro[1], registro[2])
+    elif tipo == "r":
+        carrito.reordenar(registro[1])
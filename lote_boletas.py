@@ -0,0 +1,258 @@
+"""Generación de boletas por lote, sin interfaz gráfica.
+
+Lee pedidos de un archivo JSONL o CSV, los valida contra el catálogo y arma
+cada boleta con armar_boleta (el mismo id de caja que las ventas de la
+ventana). Las boletas se guardan de a lotes en el almacén y el índice de
+búsqueda, en este proceso y en una transacción por lote, como hace el servidor
+de ventas; la escritura del .txt y el QR se reparte entre varios procesos.
+Guarda un checkpoint con los pedidos guardados y exportados para poder
+retomar una corrida cortada sin repetir ventas.
+
+Formatos de entrada:
+    JSONL  {"cliente": "Ana", "productos": [[2, "Porrón Córdoba"], [1, "Skyy"]]}
+    CSV    pedido,cliente,cantidad,producto   (una fila por línea del pedido;
+           las filas de un pedido van seguidas: si el mismo pedido vuelve a
+           aparecer más abajo, esas filas se rechazan)
+
+Uso:
+    python lote_boletas.py pedidos.jsonl [--salida DIR] [--procesos N] [--checkpoint ARCHIVO] [--modo-qr MODO]
+"""
+import argparse
+import concurrent.futures as cf
+import csv
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from persistencia import escribir_boleta
+from qr_compacto import MODOS, payload_qr
+
+def cargar_sistema():
+    """El núcleo del sistema (sin interfaz gráfica), con los datos del directorio actual."""
+    import nucleo
+    return nucleo
+
+
+COLUMNAS_CSV = ("pedido", "cliente", "cantidad", "producto")
+
+
+def leer_pedidos(ruta):
+    """Genera (id_pedido, cliente, [(cantidad, producto), ...], error) desde JSONL o CSV.
+
+    `error` es None o el motivo por el que el pedido no se puede leer. Un CSV
+    sin alguna de las columnas COLUMNAS_CSV da ValueError antes del primer pedido."""
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".csv":
+        with open(ruta, "r", encoding="utf-8", newline="") as f:
+            lector = csv.DictReader(f)
+            faltan = [c for c in COLUMNAS_CSV if c not in (lector.fieldnames or ())]
+            if faltan:
+                raise ValueError(f"{ruta}: faltan las columnas {', '.join(faltan)}")
+            actual, cliente, productos = None, None, None
+            vistos = set()
+            for fila in lector:
+                # en una fila corta, las columnas que faltan quedan en None y
+                # validar_pedido la rechaza como línea inválida
+                if not fila["pedido"]:
+                    yield f"fila {lector.line_num}", None, None, "la fila no tiene número de pedido"
+                    continue
+                if fila["pedido"] != actual:
+                    if productos is not None:
+                        yield actual, cliente, productos, None
+                    actual, cliente, productos = fila["pedido"], fila["cliente"], []
+                    if actual in vistos:
+                        # el pedido ya salió entero: no se puede juntar con estas filas
+                        yield actual, cliente, None, f"el pedido {actual} aparece en filas no seguidas"
+                        productos = None
+                    vistos.add(actual)
+                if productos is not None:
+                    productos.append((fila["cantidad"], fila["producto"]))
+            if productos is not None:
+                yield actual, cliente, productos, None
+    else:
+        with open(ruta, "r", encoding="utf-8") as f:
+            for numero, linea in enumerate(f, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    pedido = json.loads(linea)
+                except ValueError:
+                    pedido = None
+                if isinstance(pedido, dict):
+                    yield str(numero), pedido.get("cliente"), pedido.get("productos") or [], None
+                else:
+                    yield str(numero), None, None, "la línea no es un objeto JSON válido"
+
+
+def validar_pedido(cliente, productos, catalogo):
+    """Devuelve (productos normalizados, None) o (None, mensaje de error)."""
+    if not cliente or not str(cliente).strip():
+        return None, "falta el cliente"
+    if not productos:
+        return None, "el pedido no tiene productos"
+    if not isinstance(productos, (list, tuple)):
+        return None, f"productos inválidos: {productos!r}"
+    normalizados = []
+    for item in productos:
+        try:
+            cantidad, producto = item
+            cantidad = int(cantidad)
+        except (TypeError, ValueError):
+            return None, f"línea inválida: {item!r}"
+        if not isinstance(producto, str):
+            return None, f"línea inválida: {item!r}"
+        if cantidad <= 0:
+            return None, f"cantidad inválida para '{producto}'"
+        if producto not in catalogo:
+            return None, f"producto '{producto}' no está disponible"
+        normalizados.append((cantidad, producto))
+    return normalizados, None
+
+
+def _escribir(trabajo):
+    """Se ejecuta en los procesos del pool: escribe el .txt y el QR."""
+    id_pedido, ruta, contenido, texto_qr = trabajo
+    escribir_boleta(Path(ruta), contenido, texto_qr)
+    return id_pedido
+
+
+def leer_checkpoint(ruta):
+    """(pedidos terminados, {pedido: nombre de la boleta} de los guardados sin exportar).
+
+    Cada línea es "pedido" (guardado y exportado) o "pedido<TAB>nombre" (ya está en
+    el almacén; si la corrida se cortó antes de exportarlo se exporta al retomar)."""
+    hechos, guardados = set(), {}
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                id_pedido, _tab, nombre = linea.rstrip("\n").partition("\t")
+                if not id_pedido:
+                    continue
+                if nombre:
+                    guardados[id_pedido] = nombre
+                else:
+                    hechos.add(id_pedido)
+    except FileNotFoundError:
+        pass
+    for id_pedido in hechos:
+        guardados.pop(id_pedido, None)
+    return hechos, guardados
+
+
+def procesar_lote(ruta_pedidos, salida, procesos=None, ruta_checkpoint=None, cada=1.0, modo_qr=None,
+                  por_transaccion=64):
+    sistema = cargar_sistema()
+    catalogo = sistema.PRODUCTOS_DISPONIBLES
+    modo_qr = modo_qr or sistema.MODO_QR
+    salida = Path(salida)
+    salida.mkdir(parents=True, exist_ok=True)
+    ruta_checkpoint = Path(ruta_checkpoint or f"{ruta_pedidos}.checkpoint")
+    hechos, guardados = leer_checkpoint(ruta_checkpoint)
+    procesos = procesos or os.cpu_count() or 1
+
+    escritos = omitidos = errores = 0
+    inicio = ultimo_aviso = time.perf_counter()
+    en_vuelo = set()
+    with open(ruta_checkpoint, "a", encoding="utf-8") as checkpoint, \
+            cf.ProcessPoolExecutor(max_workers=procesos) as pool:
+
+        def recoger(todos=False):
+            """Espera a que termine al menos uno (o todos) de los pedidos en vuelo."""
+            nonlocal escritos, errores, en_vuelo
+            if not en_vuelo:
+                return
+            listos, en_vuelo = cf.wait(en_vuelo, return_when=cf.ALL_COMPLETED if todos else cf.FIRST_COMPLETED)
+            for futuro in listos:
+                try:
+                    checkpoint.write(futuro.result() + "\n")
+                    escritos += 1
+                except Exception as e:
+                    print(f"Error al escribir una boleta: {e}", file=sys.stderr)
+                    errores += 1
+            checkpoint.flush()
+
+        def exportar(id_pedido, nombre, contenido):
+            texto_qr = payload_qr(contenido, modo_qr, nombre)
+            en_vuelo.add(pool.submit(_escribir, (id_pedido, str(salida / nombre), contenido, texto_qr)))
+            # No acumular cientos de miles de pedidos en memoria
+            if len(en_vuelo) >= procesos * 8:
+                recoger()
+
+        por_guardar = []   # (id_pedido, boleta)
+
+        def guardar():
+            """Guarda el lote en el almacén y el índice (una transacción) y lo manda a exportar."""
+            if not por_guardar:
+                return
+            boletas = [boleta for _id, boleta in por_guardar]
+            sistema.ALMACEN.guardar_varias(boletas)
+            sistema.INDICE_BOLETAS.agregar_varias(boletas)
+            checkpoint.writelines(f"{id_pedido}\t{boleta['nombre']}\n" for id_pedido, boleta in por_guardar)
+            checkpoint.flush()
+            for id_pedido, boleta in por_guardar:
+                exportar(id_pedido, boleta["nombre"], boleta["contenido"])
+            por_guardar.clear()
+
+        # Los que quedaron guardados sin exportar en la corrida anterior
+        for id_pedido, nombre in guardados.items():
+            registro = sistema.ALMACEN.obtener_por_nombre(nombre)
+            if registro is None:
+                print(f"Pedido {id_pedido}: la boleta {nombre} no está en el almacén", file=sys.stderr)
+                errores += 1
+                continue
+            exportar(id_pedido, nombre, registro["contenido"])
+
+        for id_pedido, cliente, productos, error in leer_pedidos(ruta_pedidos):
+            if id_pedido in hechos or id_pedido in guardados:
+                omitidos += 1
+                continue
+            if error is None:
+                productos, error = validar_pedido(cliente, productos, catalogo)
+            if error:
+                print(f"Pedido {id_pedido}: {error}", file=sys.stderr)
+                errores += 1
+                continue
+
+            cliente = str(cliente).strip()
+            total = sum(cantidad * catalogo[producto] for cantidad, producto in productos)
+            boleta = sistema.armar_boleta(cliente, productos, total)
+            boleta["ruta"] = str(salida / boleta["nombre"])
+            por_guardar.append((id_pedido, boleta))
+            if len(por_guardar) >= por_transaccion:
+                guardar()
+
+            ahora = time.perf_counter()
+            if ahora - ultimo_aviso >= cada:
+                ultimo_aviso = ahora
+                print(f"{escritos} boletas escritas ({escritos / (ahora - inicio):.0f}/s), "
+                      f"{errores} con error, {omitidos} ya hechas")
+        guardar()
+        recoger(todos=True)
+
+    transcurrido = time.perf_counter() - inicio
+    print(f"Listo: {escritos} boletas en {transcurrido:.1f}s "
+          f"({escritos / transcurrido if transcurrido else 0:.0f}/s), {errores} con error, {omitidos} ya hechas")
+    return escritos, errores, omitidos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera boletas por lote desde un archivo de pedidos.")
+    parser.add_argument("pedidos", help="archivo .jsonl o .csv con los pedidos")
+    parser.add_argument("--salida", default="boletas", help="carpeta donde dejar las boletas (por defecto boletas/)")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos para generar los QR (por defecto, uno por núcleo)")
+    parser.add_argument("--checkpoint", default=None, help="archivo de checkpoint (por defecto PEDIDOS.checkpoint)")
+    parser.add_argument("--modo-qr", choices=MODOS, default=None, help="qué codificar en el QR (por defecto, MODO_QR)")
+    args = parser.parse_args(argv)
+    try:
+        _escritos, errores, _omitidos = procesar_lote(args.pedidos, args.salida, args.procesos, args.checkpoint,
+                                                      modo_qr=args.modo_qr)
+    except ValueError as e:   # CSV sin las columnas necesarias
+        print(e, file=sys.stderr)
+        return 2
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Tiempos por etapa e histogramas de latencia.
+
+Desactivado por defecto: `etapa()` devuelve un contexto vacío compartido y
+`medido()` solo agrega una comprobación de una variable antes de llamar a la
+función, así que en la caja no cuesta nada medible.
+
+Para activarlo:
+    TPI_METRICAS=1 (o una ruta)   escribe un resumen cada tanto en metricas.log
+    TPI_METRICAS_PUERTO=9464      además sirve http://127.0.0.1:9464/metrics (Prometheus)
+
+o desde código con `activar(ruta, puerto)`. El archivo rota al pasar de
+`max_bytes`: el anterior queda como metricas.log.1.
+
+Uso:
+    with metricas.etapa("boleta.qr"):
+        ...
+
+    @metricas.medido("ui.agregar_producto")
+    def agregar_producto(self): ...
+"""
+import atexit
+import bisect
+import contextlib
+import datetime
+import functools
+import http.server
+import json
+import os
+import threading
+import time
+
+# Límites superiores de cada balde, en segundos (el último balde es +Inf)
+LIMITES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_activo = False
+_lock = threading.Lock()
+_histogramas = {}
+_escritor = None
+_servidor = None
+_NULO = contextlib.nullcontext()
+
+
+class Histograma:
+    __slots__ = ("cuentas", "suma", "cantidad", "maximo")
+
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.cuentas[bisect.bisect_left(LIMITES, segundos)] += 1
+        self.suma += segundos
+        self.cantidad += 1
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p):
+        """Cota superior del balde donde cae el percentil p (0-100)."""
+        if not self.cantidad:
+            return 0.0
+        objetivo = self.cantidad * p / 100
+        acumulado = 0
+        for limite, cuenta in zip(LIMITES, self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+def activo():
+    return _activo
+
+
+def observar(nombre, segundos):
+    """Anota una duración para `nombre`. No hace nada si las métricas están apagadas."""
+    if not _activo:
+        return
+    with _lock:
+        histograma = _histogramas.get(nombre)
+        if histograma is None:
+            histograma = _histogramas[nombre] = Histograma()
+        histograma.observar(segundos)
+
+
+class _Etapa:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observar(self.nombre, time.perf_counter() - self.inicio)
+
+
+def etapa(nombre):
+    """Contexto que mide lo que tarda el bloque (vacío si están apagadas)."""
+    if not _activo:
+        return _NULO
+    return _Etapa(nombre)
+
+
+def medido(nombre):
+    """Decorador que mide cada llamada a la función bajo `nombre`."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activo:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                observar(nombre, time.perf_counter() - inicio)
+        return envoltura
+    return decorador
+
+
+def resumen():
+    """{nombre: {cantidad, promedio, p50, p95, p99, maximo}} en segundos."""
+    with _lock:
+        return {
+            nombre: {
+                "cantidad": h.cantidad,
+                "promedio": h.suma / h.cantidad if h.cantidad else 0.0,
+                "p50": h.percentil(50),
+                "p95": h.percentil(95),
+                "p99": h.percentil(99),
+                "maximo": h.maximo,
+            }
+            for nombre, h in sorted(_histogramas.items())
+        }
+
+
+def texto_prometheus():
+    """Los histogramas en el formato de texto de Prometheus."""
+    lineas = ["# HELP tpi_latencia_segundos Duración de cada etapa o evento de la interfaz.",
+              "# TYPE tpi_latencia_segundos histogram"]
+    with _lock:
+        for nombre, h in sorted(_histogramas.items()):
+            etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+            acumulado = 0
+            for limite, cuenta in zip(LIMITES, h.cuentas):
+                acumulado += cuenta
+                lineas.append(f'tpi_latencia_segundos_bucket{{etapa="{etiqueta}",le="{limite}"}} {acumulado}')
+            lineas.append(f'tpi_latencia_segundos_bucket{{etapa="{etiqueta}",le="+Inf"}} {h.cantidad}')
+            lineas.append(f'tpi_latencia_segundos_sum{{etapa="{etiqueta}"}} {h.suma}')
+            lineas.append(f'tpi_latencia_segundos_count{{etapa="{etiqueta}"}} {h.cantidad}')
+    return "\n".join(lineas) + "\n"
+
+
+class _Escritor(threading.Thread):
+    """Agrega el resumen al archivo cada `intervalo` segundos, si hubo algo nuevo."""
+
+    def __init__(self, ruta, intervalo, max_bytes):
+        super().__init__(name="metricas", daemon=True)
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.max_bytes = max_bytes
+        self._detener = threading.Event()
+        self._ultima_cantidad = 0
+
+    def run(self):
+        while not self._detener.wait(self.intervalo):
+            self.escribir()
+
+    def escribir(self):
+        datos = resumen()
+        cantidad = sum(d["cantidad"] for d in datos.values())
+        if cantidad == self._ultima_cantidad:
+            return
+        self._ultima_cantidad = cantidad
+        try:
+            if os.path.exists(self.ruta) and os.path.getsize(self.ruta) > self.max_bytes:
+                os.replace(self.ruta, self.ruta + ".1")
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                                    "metricas": datos}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"No se pudieron guardar las métricas: {e}")
+
+    def detener(self):
+        self._detener.set()
+        self.escribir()
+
+
+class _ManejadorPrometheus(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        cuerpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def activar(ruta="metricas.log", puerto=None, intervalo=10.0, max_bytes=1_000_000):
+    """Empieza a medir; con `ruta` guarda resúmenes y con `puerto` sirve /metrics en localhost."""
+    global _activo, _escritor, _servidor
+    if _activo:
+        return
+    _activo = True
+    if ruta:
+        _escritor = _Escritor(str(ruta), intervalo, max_bytes)
+        _escritor.start()
+    if puerto:
+        _servidor = http.server.ThreadingHTTPServer(("127.0.0.1", int(puerto)), _ManejadorPrometheus)
+        threading.Thread(target=_servidor.serve_forever, name="metricas-http", daemon=True).start()
+    atexit.register(desactivar)
+
+
+def desactivar():
+    """Deja de medir, guarda el último resumen y apaga el endpoint."""
+    global _activo, _escritor, _servidor
+    if not _activo:
+        return
+    _activo = False
+    if _escritor is not None:
+        _escritor.detener()
+        _escritor = None
+    if _servidor is not None:
+        _servidor.shutdown()
+        _servidor.server_close()
+        _servidor = None
+
+
+def reiniciar():
+    """Borra lo medido hasta ahora."""
+    with _lock:
+        _histogramas.clear()
+
+
+def configurar_desde_entorno():
+    """Activa las métricas según TPI_METRICAS y TPI_METRICAS_PUERTO."""
+    ruta = os.environ.get("TPI_METRICAS")
+    puerto = os.environ.get("TPI_METRICAS_PUERTO")
+    if not ruta and not puerto:
+        return
+    if ruta in (None, "", "1"):
+        ruta = "metricas.log" if ruta == "1" else None
+    activar(ruta, puerto)
@@ -0,0 +1,100 @@
+"""Caché en disco de miniaturas de los QR de las boletas.
+
+Abrir el PNG completo de cada boleta y achicarlo es lo que más tarda al
+recorrer boletas viejas. La primera vez se guarda una miniatura en
+boletas/miniaturas/ (el nombre sale de la boleta, la fecha de modificación del
+PNG y el tamaño, así un PNG regenerado no usa una miniatura vieja); después se
+abre esa. Si el PNG ya se pasó al archivo comprimido (archivo_boletas.py), se
+lee de ahí. La carpeta tiene un tope de archivos: al pasarlo se borran las
+miniaturas usadas hace más tiempo.
+
+Todo esto corre en un hilo de fondo: devuelve imágenes PIL, no PhotoImage.
+"""
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+
+from qr_compacto import importar_pil
+
+
+class CacheMiniaturas:
+    def __init__(self, carpeta, tamanio=(240, 240), max_archivos=2_000, archivo=None):
+        self.carpeta = Path(carpeta)
+        self.archivo = archivo   # ArchivoBoletas, para los PNG que ya no están sueltos
+        self.tamanio = tamanio
+        self.max_archivos = max_archivos
+        self._lock = threading.Lock()
+        self._escritas = 0   # desde la última poda
+
+    def _ruta(self, ruta_png, mtime_ns):
+        clave = f"{Path(ruta_png).name}:{mtime_ns}:{self.tamanio[0]}x{self.tamanio[1]}"
+        return self.carpeta / (hashlib.sha1(clave.encode("utf-8")).hexdigest() + ".png")
+
+    def cargar(self, ruta_png):
+        """Miniatura (imagen PIL) del PNG, o None si no hay PNG o no está PIL."""
+        Image = importar_pil()[0]
+        if Image is None:
+            return None
+        origen = ruta_png
+        try:
+            mtime_ns = os.stat(ruta_png).st_mtime_ns
+        except OSError:
+            # archivado: la fecha guardada en el índice distingue versiones igual que el stat
+            info = self.archivo.info(Path(ruta_png).name) if self.archivo is not None else None
+            if info is None:
+                return None
+            mtime_ns = info[-1]
+            origen = None
+        ruta = self._ruta(ruta_png, mtime_ns)
+        try:
+            with Image.open(ruta) as guardada:
+                imagen = guardada.copy()
+            os.utime(ruta)   # la fecha de modificación marca el último uso (para la poda)
+            return imagen
+        except (OSError, ValueError):
+            pass
+        if origen is None:
+            datos = self.archivo.leer(Path(ruta_png).name)
+            if datos is None:
+                return None
+            origen = io.BytesIO(datos)
+        with Image.open(origen) as original:
+            imagen = original.convert("RGB").resize(self.tamanio)
+        self._guardar(ruta, imagen)
+        return imagen
+
+    def _guardar(self, ruta, imagen):
+        try:
+            self.carpeta.mkdir(parents=True, exist_ok=True)
+            temporal = ruta.with_name(ruta.name + f".{threading.get_ident()}.tmp")
+            imagen.save(temporal, format="PNG")
+            os.replace(temporal, ruta)
+        except OSError as e:
+            print(f"No se pudo guardar la miniatura {ruta.name}: {e}")
+            return
+        with self._lock:
+            self._escritas += 1
+            podar = self._escritas >= max(1, self.max_archivos // 10)
+            if podar:
+                self._escritas = 0
+        if podar:
+            self.podar()
+
+    def podar(self):
+        """Deja como mucho max_archivos miniaturas, borrando las usadas hace más tiempo."""
+        try:
+            entradas = [e for e in os.scandir(self.carpeta) if e.name.endswith(".png")]
+        except FileNotFoundError:
+            return 0
+        sobran = len(entradas) - self.max_archivos
+        if sobran <= 0:
+            return 0
+        entradas.sort(key=lambda e: e.stat().st_mtime_ns)
+        for entrada in entradas[:sobran]:
+            try:
+                os.remove(entrada.path)
+            except OSError:
+                pass
+        return sobran
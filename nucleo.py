@@ -0,0 +1,242 @@
+"""Núcleo del sistema de boletas, sin interfaz gráfica.
+
+Catálogo, historial de clientes, texto y registro de boletas. Se puede importar
+desde scripts, el lote o un servidor sin tkinter, PIL ni qrcode: la interfaz
+(-TPI2025-.py) se arma encima de este módulo y el QR se dibuja a demanda.
+
+Al importarse carga lista_de_productos.txt y clientes.txt del directorio
+actual y abre el almacén en boletas/.
+"""
+import datetime
+from pathlib import Path
+
+from almacen_boletas import AlmacenBoletas
+from archivo_boletas import ArchivoBoletas
+from busqueda_productos import IndiceProductos
+from catalogo import IndiceCategorias, VigilanteCatalogo, cargar_catalogo
+from historial_clientes import HistorialClientes
+from ids_boleta import AsignadorIds, terminal_actual
+from indice_boletas import IndiceBoletas
+from metricas import etapa, medido
+from persistencia import escribir_boleta
+from qr_compacto import payload_qr
+
+
+def cargar_productos():
+    """Carga los productos desde lista_de_productos.txt (vía el catálogo compilado)."""
+    productos = {}
+    try:
+        productos = cargar_catalogo("lista_de_productos.txt")
+    except FileNotFoundError:
+        print("Error: No se encontró lista_de_productos.txt")
+    return productos
+
+PRODUCTOS_DISPONIBLES = cargar_productos()
+
+# Índice de búsqueda por nombre (prefijo + trigramas, sin distinguir tildes).
+# Se arma la primera vez que se busca: un script que solo guarda boletas no lo paga.
+_INDICE_PRODUCTOS = None
+
+
+def indice_productos():
+    global _INDICE_PRODUCTOS
+    if _INDICE_PRODUCTOS is None:
+        _INDICE_PRODUCTOS = IndiceProductos(PRODUCTOS_DISPONIBLES)
+    return _INDICE_PRODUCTOS
+
+
+# Árbol de categorías (-Cervezas-) con la posición de cada sección en el archivo;
+# los productos de una categoría se leen recién cuando se elige
+_CATEGORIAS = None
+
+
+def categorias_productos():
+    global _CATEGORIAS
+    if _CATEGORIAS is None:
+        _CATEGORIAS = IndiceCategorias("lista_de_productos.txt")
+    return _CATEGORIAS
+
+
+def vigilar_catalogo(avisar, intervalo=1.0):
+    """Arranca un hilo que revisa lista_de_productos.txt y llama a avisar(diferencia)
+    con lo que cambió. avisar corre en ese hilo: tiene que pasarle la diferencia al
+    hilo que usa el catálogo, y ese llama a aplicar_cambios_catalogo.
+
+    El vigilante lee el archivo en su hilo y lo compara con PRODUCTOS_DISPONIBLES:
+    si cambió entre la carga y ese momento, también se avisa."""
+    vigilante = VigilanteCatalogo("lista_de_productos.txt", avisar, intervalo, base=PRODUCTOS_DISPONIBLES)
+    vigilante.iniciar()
+    return vigilante
+
+
+def aplicar_cambios_catalogo(diferencia):
+    """Aplica una DiferenciaCatalogo al catálogo en memoria y al índice de búsqueda.
+
+    PRODUCTOS_DISPONIBLES se modifica en el lugar (la interfaz lo importa por
+    nombre) y solo en los productos que cambiaron."""
+    PRODUCTOS_DISPONIBLES.update(diferencia.agregados)
+    for producto, (_antes, despues) in diferencia.precios.items():
+        PRODUCTOS_DISPONIBLES[producto] = despues
+    for producto in diferencia.quitados:
+        PRODUCTOS_DISPONIBLES.pop(producto, None)
+    if _INDICE_PRODUCTOS is not None:
+        for producto in diferencia.quitados:
+            _INDICE_PRODUCTOS.quitar(producto)
+        for producto in diferencia.agregados:
+            _INDICE_PRODUCTOS.agregar(producto)
+
+
+# Directorio para guardar boletas
+BOLETAS_DIR = Path("boletas")
+BOLETAS_DIR.mkdir(exist_ok=True)
+
+# Además del almacén SQLite, dejar cada boleta como .txt y .png sueltos en boletas/
+EXPORTAR_ARCHIVOS = True
+
+# Qué se codifica en el QR: "completo", "comprimido" o "referencia" (ver qr_compacto.py)
+MODO_QR = "completo"
+
+# Almacén de boletas con índices por cliente, fecha y total
+ALMACEN = AlmacenBoletas(BOLETAS_DIR / "boletas.sqlite3")
+
+# Índice invertido para buscar boletas por cliente, producto, fecha y total
+INDICE_BOLETAS = IndiceBoletas(BOLETAS_DIR / "indice.sqlite3")
+
+# Segmentos .zip con los .txt/.png viejos (python archivo_boletas.py --dias 90)
+ARCHIVO_BOLETAS = ArchivoBoletas(BOLETAS_DIR)
+
+# Cada boleta lleva "<terminal>-<secuencia>" en el nombre: dos ventas en el mismo
+# segundo (o de dos cajas) ya no se pisan. TPI_TERMINAL elige el nombre de la caja.
+TERMINAL = terminal_actual()
+ASIGNADOR_IDS = AsignadorIds(BOLETAS_DIR / f"secuencia_{TERMINAL}.txt", TERMINAL)
+
+# Variable para almacenar la última boleta generada
+ULTIMA_BOLETA = None
+
+
+# Historial de clientes: MRU en memoria, clientes.txt + append a clientes.log en disco
+HISTORIAL_CLIENTES = HistorialClientes("clientes.txt")
+
+
+def cargar_historial_clientes():
+    #Devuelve la lista de clientes del más reciente al más viejo.
+    return HISTORIAL_CLIENTES.recientes()
+
+
+def guardar_cliente(cliente: str):
+    #Marca al cliente como el más reciente (en disco es un solo append).
+    HISTORIAL_CLIENTES.registrar(cliente)
+
+
+def generar_contenido_boleta(cliente, productos_cliente, total, fecha):
+    """Genera el contenido de la boleta para reutilizar en archivo y GUI."""
+    lineas = [
+        f"Boleta para {cliente}",
+        f"Fecha y Hora: {fecha}",
+        "\nDetalles de la Venta:\n"
+    ]
+
+    for cantidad, producto in productos_cliente:
+        precio = PRODUCTOS_DISPONIBLES[producto]
+        subtotal = cantidad * precio
+        lineas.append(f"{cantidad} x {producto} a ${precio:.2f} c/u => Total: ${subtotal:.2f}")
+
+    lineas.append(f"\nTOTAL: ${total:.2f}")
+    return "\n".join(lineas)
+
+
+def obtener_nombre_boleta(cliente, fecha, id_boleta=None):
+    """Genera el nombre del archivo de boleta (único si se pasa el id de ASIGNADOR_IDS)."""
+    fecha_formateada = fecha.replace(":", ";").replace("/", "-").replace(" ", "_")
+    if id_boleta:
+        return f"{cliente}_{fecha_formateada}_{id_boleta}.txt"
+    return f"{cliente}_{fecha_formateada}.txt"
+
+
+def guardar_boleta_en_disco(boleta):
+    """Guarda la boleta en el almacén y el índice y, si corresponde, exporta el .txt y el QR."""
+    with etapa("boleta.almacen"):
+        ALMACEN.guardar(boleta["nombre"], boleta["cliente"], boleta["fecha"], boleta["total"],
+                        boleta["lineas"], boleta["contenido"])
+    with etapa("boleta.indice"):
+        INDICE_BOLETAS.agregar_varias([boleta])
+    if EXPORTAR_ARCHIVOS:
+        escribir_boleta(Path(boleta["ruta"]), boleta["contenido"], boleta.get("qr"))
+
+
+def boleta_disponible(ruta_boleta: Path):
+    """True si la boleta está exportada en disco, guardada en el almacén o archivada."""
+    return (ruta_boleta.exists() or ALMACEN.obtener_por_nombre(ruta_boleta.name) is not None
+            or ARCHIVO_BOLETAS.info(ruta_boleta.name) is not None)
+
+
+def leer_qr_boleta(ruta_boleta: Path):
+    """Bytes del PNG del QR de una boleta (exportado o archivado), o None si no tiene."""
+    ruta_qr = ruta_boleta.with_suffix(".png")
+    try:
+        return ruta_qr.read_bytes()
+    except FileNotFoundError:
+        return ARCHIVO_BOLETAS.leer(ruta_qr.name)
+
+
+def leer_contenido_boleta(ruta_boleta: Path):
+    """Lee el texto de una boleta: del .txt exportado o, si no está, del almacén o del archivo."""
+    try:
+        with open(ruta_boleta, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        registro = ALMACEN.obtener_por_nombre(ruta_boleta.name)
+        if registro is None:
+            archivada = ARCHIVO_BOLETAS.leer(ruta_boleta.name)
+            if archivada is not None:
+                return archivada.decode("utf-8")
+            raise
+        return registro["contenido"]
+
+
+def armar_boleta(cliente, productos_cliente, total):
+    """Arma la boleta de una venta (sin guardarla): nombre, ruta, fecha, líneas, texto y QR."""
+    ahora = datetime.datetime.now()
+    fecha = ahora.strftime("%d/%m/%y %H:%M:%S")
+    boleta_nombre = obtener_nombre_boleta(cliente, fecha, ASIGNADOR_IDS.siguiente())
+    with etapa("boleta.contenido"):
+        contenido = generar_contenido_boleta(cliente, productos_cliente, total, fecha)
+
+    # Los archivos exportados van directamente en la carpeta boletas/
+    ruta_boleta = BOLETAS_DIR / boleta_nombre
+    boleta = {
+        "nombre": boleta_nombre,
+        "ruta": str(ruta_boleta),
+        "cliente": cliente,
+        "fecha": ahora.isoformat(timespec="seconds"),
+        "total": total,
+        "lineas": [(cantidad, producto, PRODUCTOS_DISPONIBLES[producto]) for cantidad, producto in productos_cliente],
+        "contenido": contenido,
+    }
+    with etapa("boleta.qr_payload"):
+        boleta["qr"] = payload_qr(contenido, MODO_QR, boleta_nombre)
+    return boleta
+
+
+@medido("boleta.registrar")
+def registrar_boleta(cliente, productos_cliente, total, cola=None):
+    """Guarda la boleta y devuelve el nombre y contenido.
+
+    Con una ColaPersistencia la boleta solo se anota en el journal y se guarda
+    en segundo plano; sin cola se guarda acá mismo.
+    """
+    boleta = armar_boleta(cliente, productos_cliente, total)
+    if cola is not None:
+        with etapa("boleta.journal"):
+            cola.encolar(boleta)
+    else:
+        guardar_boleta_en_disco(boleta)
+
+    # guardar última boleta para poder abrirla desde la UI (SIN abrir automáticamente)
+    try:
+        global ULTIMA_BOLETA
+        ULTIMA_BOLETA = Path(boleta["ruta"])
+    except Exception:
+        ULTIMA_BOLETA = None
+
+    return boleta["nombre"], boleta["contenido"]
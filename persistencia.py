@@ -0,0 +1,216 @@
+"""Cola de guardado de boletas en segundo plano.
+
+Al guardar una venta, la boleta se anota primero en un journal (una línea JSON
+con fsync), que es lo único que espera el cajero. El almacén, el .txt y el QR
+los escriben hilos de fondo. Si el programa se cierra o se corta la luz antes de terminar,
+al volver a abrir se reprocesan las entradas del journal que no quedaron
+marcadas como hechas. Una boleta que no se pudo escribir (disco lleno, carpeta
+sin permisos) no se marca como hecha: se reintenta cada vez más espaciado y,
+si sigue fallando, queda en el journal para la próxima vez que se abra la caja.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+
+from metricas import etapa
+from qr_compacto import importar_qrcode
+
+# Segundos de espera antes de cada reintento de una boleta que no se pudo escribir
+REINTENTOS = (1, 5, 30, 120)
+
+
+def escribir_boleta(ruta_boleta: Path, contenido, texto_qr=None):
+    """Escribe el .txt de la boleta y, si se puede, su QR (.png al lado).
+
+    `texto_qr` es lo que va en el QR (ver qr_compacto); por defecto, el contenido.
+    Un error al escribir el .txt se propaga; uno del QR solo se informa.
+    """
+    with etapa("boleta.txt"), open(ruta_boleta, "w", encoding="utf-8") as boleta:
+        boleta.write(contenido)
+
+    # Intentar generar un código QR con el contenido de la boleta
+    try:
+        # qrcode se importa recién acá, la primera vez que se guarda una boleta
+        qr_lib = importar_qrcode()
+        if qr_lib is not None:
+            with etapa("boleta.qr"):
+                img = qr_lib.make(texto_qr or contenido)
+            ruta_qr = ruta_boleta.with_suffix('.png')
+            try:
+                with etapa("boleta.png"):
+                    img.save(ruta_qr)
+            except Exception as save_err:
+                print(f"No se pudo guardar el QR: {save_err}")
+    except Exception as e:
+        print(f"No se generó el QR: {e}")
+
+
+def _escribir_archivos(boleta):
+    escribir_boleta(Path(boleta["ruta"]), boleta["contenido"], boleta.get("qr"))
+
+
+class ColaPersistencia:
+    """Journal durable + hilos que escriben cada boleta.
+
+    Cada boleta es un diccionario serializable a JSON con al menos "ruta" y
+    "contenido"; `escribir(boleta)` la guarda (por defecto .txt + QR).
+    `al_terminar(ruta, error)` se llama en el hilo de Tk (vía root.after) cuando
+    cada boleta terminó de escribirse o falló.
+    """
+
+    def __init__(self, ruta_journal: Path, root=None, al_terminar=None, hilos=2, escribir=_escribir_archivos):
+        self.ruta_journal = Path(ruta_journal)
+        self.root = root
+        self.al_terminar = al_terminar
+        self.escribir = escribir
+        self._cola = queue.Queue()
+        self._resultados = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._siguiente = 0
+        self._pendientes = set()
+        self._abandonadas = set()   # fallaron todos los reintentos: quedan para el próximo arranque
+        self._esperas = {}          # número -> Timer del próximo reintento
+        self._sondeo_id = None
+        self._cerrada = False
+
+        pendientes = self._leer_journal()
+        self._journal = open(self.ruta_journal, "a", encoding="utf-8")
+        self._hilos = [threading.Thread(target=self._trabajar, name=f"guardar-boleta-{i}", daemon=True)
+                       for i in range(hilos)]
+        for hilo in self._hilos:
+            hilo.start()
+        # Lo que quedó sin escribir en la ejecución anterior se vuelve a encolar
+        for numero, boleta in pendientes:
+            self._pendientes.add(numero)
+            self._cola.put((numero, boleta, 0))
+        if pendientes and self.root is not None:
+            self._sondeo_id = self.root.after(50, self._revisar)
+        # Garantía de vaciado al salir aunque no se cierre la ventana
+        atexit.register(self.cerrar)
+
+    def _leer_journal(self):
+        """Devuelve las entradas del journal que no llegaron a marcarse como hechas."""
+        entradas = {}
+        try:
+            with open(self.ruta_journal, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except ValueError:
+                        continue  # línea cortada por un corte de luz
+                    numero = registro["n"]
+                    self._siguiente = max(self._siguiente, numero + 1)
+                    if registro.get("hecho"):
+                        entradas.pop(numero, None)
+                    else:
+                        entradas[numero] = (numero, registro["boleta"])
+        except FileNotFoundError:
+            pass
+        return list(entradas.values())
+
+    def _anotar(self, registro, sincronizar):
+        with self._lock:
+            self._journal.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            if sincronizar:
+                os.fsync(self._journal.fileno())
+
+    def encolar(self, boleta):
+        """Registra la boleta en el journal (durable) y la deja para los hilos de fondo."""
+        if self._cerrada:
+            raise RuntimeError("La cola de guardado ya está cerrada")
+        with self._lock:
+            numero = self._siguiente
+            self._siguiente += 1
+            self._pendientes.add(numero)
+        self._anotar({"n": numero, "boleta": boleta}, sincronizar=True)
+        self._cola.put((numero, boleta, 0))
+        if self.root is not None and self._sondeo_id is None:
+            self._sondeo_id = self.root.after(50, self._revisar)
+        return numero
+
+    def _trabajar(self):
+        while True:
+            trabajo = self._cola.get()
+            if trabajo is None:
+                self._cola.task_done()
+                return
+            numero, boleta, intento = trabajo
+            try:
+                self.escribir(boleta)
+            except Exception as e:
+                # Sin "hecho": la boleta sigue pendiente en el journal. El error se
+                # informa la primera vez y después se reintenta en silencio.
+                if intento == 0:
+                    self._resultados.put((Path(boleta["ruta"]), e))
+                with self._lock:
+                    if intento < len(REINTENTOS) and not self._cerrada:
+                        espera = threading.Timer(REINTENTOS[intento], self._reintentar, (numero, boleta, intento + 1))
+                        espera.daemon = True
+                        self._esperas[numero] = espera
+                        espera.start()
+                    else:
+                        self._abandonadas.add(numero)
+                self._cola.task_done()
+                continue
+            self._anotar({"n": numero, "hecho": True}, sincronizar=False)
+            if intento > 0:
+                self._resultados.put((Path(boleta["ruta"]), None))
+            with self._lock:
+                self._pendientes.discard(numero)
+            self._cola.task_done()
+
+    def _reintentar(self, numero, boleta, intento):
+        with self._lock:
+            if self._esperas.pop(numero, None) is None or self._cerrada:
+                return
+            self._cola.put((numero, boleta, intento))
+
+    def _revisar(self):
+        self._sondeo_id = None
+        while True:
+            try:
+                ruta, error = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            if self.al_terminar is not None:
+                self.al_terminar(ruta, error)
+        with self._lock:
+            activas = len(self._pendientes) > len(self._abandonadas)
+        if activas or not self._resultados.empty():
+            self._sondeo_id = self.root.after(50, self._revisar)
+
+    def pendientes(self):
+        with self._lock:
+            return len(self._pendientes)
+
+    def vaciar(self):
+        """Espera a que se escriban todas las boletas encoladas."""
+        self._cola.join()
+
+    def cerrar(self):
+        """Vacía la cola, detiene los hilos y compacta el journal."""
+        with self._lock:
+            if self._cerrada:
+                return
+            self._cerrada = True
+            # los reintentos que estaban esperando quedan para el próximo arranque
+            for espera in self._esperas.values():
+                espera.cancel()
+            self._esperas.clear()
+        self.vaciar()
+        for _ in self._hilos:
+            self._cola.put(None)
+        for hilo in self._hilos:
+            hilo.join()
+        with self._lock:
+            self._journal.close()
+            if not self._pendientes:
+                # Todo quedó escrito: el journal ya no hace falta
+                try:
+                    os.remove(self.ruta_journal)
+                except OSError:
+                    pass
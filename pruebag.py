@@ -4,6 +4,7 @@ from tkinter import messagebox
 import qrcode
 from PIL import Image, ImageTk
 import os
+from catalogo import Catalogo
 
 # ============================================
 #   ARCHIVO DE PRODUCTOS
@@ -11,42 +12,22 @@ import os
 
 ARCHIVO_PRODUCTOS = "C:\\Users\\FRVM\\Desktop\\TPI PROGRAMACION 2025\\-TPI-PROGRAMACI-N-2025-\\lista_de_productos.txt"
 
+# El catálogo se carga una sola vez; un hilo lo recarga solo si cambia el archivo
+CATALOGO = Catalogo(ARCHIVO_PRODUCTOS)
+
 def leer_productos():
-    productos = {}
-    try:
-        with open(ARCHIVO_PRODUCTOS, "r", encoding="utf-8") as f:
-            for linea in f:
-                linea = linea.strip()
-                if not linea or linea.startswith("-"):
-                    continue
-                if ":" in linea:
-                    nombre, precio = linea.split(":", 1)
-                    nombre = nombre.strip().strip('"')
-                    precio = precio.strip().strip(",")
-                    try:
-                        productos[nombre] = float(precio)
-                    except:
-                        continue
-    except FileNotFoundError:
+    if not CATALOGO.existe:
         messagebox.showerror("Error", f"No se encontró el archivo '{ARCHIVO_PRODUCTOS}'")
-    return productos
+    return CATALOGO.productos
 
 def listar_productos_con_codigo():
     """
     Devuelve una lista de strings tipo '1: Producto - $precio'
     """
-    productos_dict = leer_productos()
-    lista = []
-    for i, (nombre, precio) in enumerate(productos_dict.items(), start=1):
-        lista.append(f"{i}: {nombre} - ${precio}")
-    return lista
+    return CATALOGO.listar_con_codigo()
 
 def producto_por_codigo(codigo):
-    productos_dict = leer_productos()
-    productos_lista = list(productos_dict.keys())
-    if 1 <= codigo <= len(productos_lista):
-        return productos_lista[codigo-1]
-    return None
+    return CATALOGO.producto_por_codigo(codigo)
 
 # ============================================
 #   GENERAR BOLETA Y QR
@@ -201,6 +182,7 @@ def ver_lista_productos():
         caja.insert(tk.END, "El archivo está vacío o no se encontró.")
 
 leer_productos()
+CATALOGO.iniciar_vigilancia()
 
 # ============================================
 #   CREACIÓN DE VENTANA PRINCIPAL
@@ -0,0 +1,83 @@
+"""Contenido que se codifica en el QR de cada boleta.
+
+Modos:
+    "completo"    el texto entero de la boleta (como siempre). El QR crece con el carrito.
+    "comprimido"  el texto comprimido con zlib y en base64: "B1:<datos>". Crece más lento.
+    "referencia"  solo el nombre de la boleta y un hash del contenido:
+                  "BOL:<nombre>:<sha256 recortado>". El tamaño no depende de las líneas
+                  y se resuelve contra los .txt o el almacén local.
+
+qrcode y PIL se importan recién cuando hace falta dibujar un QR (ver
+importar_qrcode / importar_pil), así el arranque no paga esas librerías.
+"""
+import base64
+import hashlib
+import zlib
+
+MODOS = ("completo", "comprimido", "referencia")
+
+_NO_CARGADO = object()
+_qrcode = _NO_CARGADO
+_pil = _NO_CARGADO
+
+
+def importar_qrcode():
+    """El módulo qrcode, importado la primera vez que se pide; None si no está instalado."""
+    global _qrcode
+    if _qrcode is _NO_CARGADO:
+        try:
+            import qrcode
+            _qrcode = qrcode
+        except Exception:
+            # no se recuerda el fallo: si se instala con el programa abierto, se vuelve a intentar
+            return None
+    return _qrcode
+
+
+def importar_pil():
+    """(Image, ImageTk) de PIL, importados a demanda; (None, None) si no está instalado."""
+    global _pil
+    if _pil is _NO_CARGADO:
+        try:
+            from PIL import Image, ImageTk
+            _pil = (Image, ImageTk)
+        except Exception:
+            return None, None
+    return _pil
+
+
+def hash_contenido(contenido):
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:16]
+
+
+def payload_qr(contenido, modo="completo", nombre=None):
+    """Texto a codificar en el QR según el modo."""
+    if modo == "completo":
+        return contenido
+    if modo == "comprimido":
+        datos = zlib.compress(contenido.encode("utf-8"), 9)
+        return "B1:" + base64.urlsafe_b64encode(datos).decode("ascii")
+    if modo == "referencia":
+        if not nombre:
+            raise ValueError("El modo 'referencia' necesita el nombre de la boleta")
+        return f"BOL:{nombre}:{hash_contenido(contenido)}"
+    raise ValueError(f"Modo de QR desconocido: {modo!r}")
+
+
+def resolver_payload(payload, leer_por_nombre=None):
+    """Recupera el texto de la boleta a partir de lo leído en un QR.
+
+    Para el modo "referencia" hace falta `leer_por_nombre(nombre)`, que devuelve
+    el contenido guardado localmente; se verifica contra el hash del QR.
+    """
+    if payload.startswith("B1:"):
+        return zlib.decompress(base64.urlsafe_b64decode(payload[3:])).decode("utf-8")
+    if payload.startswith("BOL:"):
+        nombre, _sep, esperado = payload[4:].rpartition(":")
+        if leer_por_nombre is None:
+            raise ValueError("Se necesita acceso a las boletas locales para resolver la referencia")
+        contenido = leer_por_nombre(nombre)
+        if hash_contenido(contenido) != esperado:
+            raise ValueError(f"La boleta '{nombre}' no coincide con el QR")
+        return contenido
+    return payload
@@ -0,0 +1,280 @@
+"""Reportes de ventas a partir de las boletas guardadas.
+
+Las boletas salen del almacén SQLite (almacen_boletas.py), que tiene todas las
+ventas aunque no se exporten los .txt; de los .txt de boletas/ se leen solo
+los que no están en el almacén (p. ej. las de antes de que existiera), con el
+texto que arma generar_contenido_boleta. Se suma por día, por producto y por
+cliente. Lo leído queda en una caché SQLite (boletas/reportes.sqlite3): del
+almacén se recuerda el último id leído y de cada .txt el nombre, la fecha de
+modificación y el tamaño, así cada corrida solo lee las boletas nuevas. La caja escribe cada boleta una sola vez;
+si alguna se editó a mano, --revisar compara fecha y tamaño de todas. Las que
+pasaron al archivo comprimido (archivo_boletas.py) se siguen contando: las ya
+leídas no se olvidan y las que no se habían leído se leen del segmento.
+
+Uso:
+    python reportes.py                       # hoy, por producto
+    python reportes.py --por dia --desde 2025-01-01 --hasta 2025-12-31
+    python reportes.py --por cliente --limite 10 [--carpeta boletas] [--revisar]
+"""
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+AGRUPACIONES = ("dia", "producto", "cliente")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    nombre   TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    tamanio  INTEGER NOT NULL,
+    dia      TEXT,                    -- ISO; NULL si el archivo no es una boleta
+    cliente  TEXT,
+    total    REAL
+);
+CREATE TABLE IF NOT EXISTS lineas (
+    nombre   TEXT NOT NULL,
+    dia      TEXT NOT NULL,
+    producto TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    subtotal REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archivos_dia ON archivos(dia);
+CREATE INDEX IF NOT EXISTS idx_lineas_dia ON lineas(dia);
+CREATE INDEX IF NOT EXISTS idx_lineas_nombre ON lineas(nombre);
+CREATE TABLE IF NOT EXISTS estado (
+    clave TEXT PRIMARY KEY,           -- "segmento": último segmento del archivo ya revisado;
+    valor INTEGER NOT NULL            -- "almacen": último id del almacén ya leído
+);
+"""
+
+CONSULTAS = {
+    "dia": "SELECT dia, COUNT(*), ROUND(SUM(total), 2) FROM archivos WHERE {filtro} GROUP BY dia ORDER BY dia",
+    "producto": "SELECT producto, SUM(cantidad), ROUND(SUM(subtotal), 2) AS t FROM lineas WHERE {filtro} "
+                "GROUP BY producto ORDER BY t DESC",
+    "cliente": "SELECT cliente, COUNT(*), ROUND(SUM(total), 2) AS t FROM archivos WHERE {filtro} "
+               "GROUP BY cliente ORDER BY t DESC",
+}
+
+# mtime_ns de las filas que vienen del almacén (no de un .txt)
+DEL_ALMACEN = -1
+
+_LINEA = re.compile(r"^(\d+) x (.+) a \$(-?[\d.]+) c/u => Total: \$(-?[\d.]+)$")
+
+
+def parsear_boleta(texto):
+    """(fecha ISO, cliente, total, [(producto, cantidad, subtotal), ...]) o None si no es una boleta."""
+    cliente = fecha = total = None
+    lineas = []
+    for renglon in texto.splitlines():
+        if renglon.startswith("Boleta para "):
+            cliente = renglon[len("Boleta para "):]
+        elif renglon.startswith("Fecha y Hora: "):
+            fecha = renglon[len("Fecha y Hora: "):]
+        elif renglon.startswith("TOTAL: $"):
+            total = float(renglon[len("TOTAL: $"):])
+        else:
+            coincidencia = _LINEA.match(renglon)
+            if coincidencia:
+                cantidad, producto, _precio, subtotal = coincidencia.groups()
+                lineas.append((producto, int(cantidad), float(subtotal)))
+    if cliente is None or fecha is None or total is None:
+        return None
+    try:
+        fecha = datetime.datetime.strptime(fecha, "%d/%m/%y %H:%M:%S").isoformat()
+    except ValueError:
+        return None
+    return fecha, cliente, total, lineas
+
+
+def _leer_archivo(ruta):
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return parsear_boleta(f.read())
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+
+
+class ReporteVentas:
+    def __init__(self, carpeta="boletas", ruta_cache=None, archivo=None, almacen=None):
+        self.carpeta = Path(carpeta)
+        self.archivo = archivo   # ArchivoBoletas (opcional)
+        self.almacen = almacen   # AlmacenBoletas (opcional): si está, manda sobre los .txt
+        self.ruta_cache = Path(ruta_cache) if ruta_cache else self.carpeta / "reportes.sqlite3"
+        self.ruta_cache.parent.mkdir(parents=True, exist_ok=True)
+        # La ventana de reportes actualiza desde un hilo aparte
+        self._conexion = sqlite3.connect(str(self.ruta_cache), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexion.executescript(ESQUEMA)
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM archivos WHERE dia IS NOT NULL").fetchone()[0]
+
+    def actualizar(self, revisar=False):
+        """Lee las boletas que no están en la caché y olvida las borradas.
+
+        Con `revisar` también compara fecha de modificación y tamaño de las ya
+        leídas (un stat por archivo) y vuelve a leer las que cambiaron.
+        Devuelve cuántas boletas se leyeron.
+        """
+        with self._lock:
+            estado = dict(self._conexion.execute("SELECT clave, valor FROM estado"))
+        segmento = ultimo_segmento = estado.get("segmento", 0)
+        ultimo_id = estado.get("almacen", 0)
+        archivos, lineas = [], []
+        if self.almacen is not None:
+            for b in self.almacen.desde(ultimo_id):
+                ultimo_id = b["id"]
+                dia = b["fecha"][:10]
+                archivos.append((b["nombre"], DEL_ALMACEN, 0, dia, b["cliente"], b["total"]))
+                lineas.extend((b["nombre"], dia, producto, cantidad, round(cantidad * precio, 2))
+                              for cantidad, producto, precio in b["lineas"])
+        with self._lock:
+            conocidos = {nombre: (mtime, tamanio) for nombre, mtime, tamanio in
+                         self._conexion.execute("SELECT nombre, mtime_ns, tamanio FROM archivos")}
+        # las que están en el almacén no se leen de los .txt (son solo una exportación)
+        del_almacen = {nombre for nombre, (mtime, _t) in conocidos.items() if mtime == DEL_ALMACEN}
+        del_almacen.update(fila[0] for fila in archivos)
+        for nombre in del_almacen:
+            conocidos.pop(nombre, None)
+        ya_leidos = set(conocidos) | del_almacen if self.archivo is not None else ()
+        a_leer = []   # (nombre, mtime_ns, tamaño, ruta; None si está archivada)
+        try:
+            with os.scandir(self.carpeta) as entradas:
+                for entrada in entradas:
+                    if (not entrada.name.endswith(".txt") or entrada.name in del_almacen
+                            or not entrada.is_file()):
+                        continue
+                    anterior = conocidos.pop(entrada.name, None)
+                    if anterior is not None and not revisar:
+                        continue
+                    estado = entrada.stat()
+                    if anterior != (estado.st_mtime_ns, estado.st_size):
+                        a_leer.append((entrada.name, estado.st_mtime_ns, estado.st_size, entrada.path))
+        except FileNotFoundError:
+            pass
+        borrados = list(conocidos)   # los que quedaron ya no están en la carpeta
+        if self.archivo is not None:
+            if borrados:
+                archivadas = self.archivo.contiene(borrados)
+                borrados = [nombre for nombre in borrados if nombre not in archivadas]
+            # lo archivado desde la última vez que no se llegó a leer suelto
+            for numero, nombre, tamanio, mtime_ns in self.archivo.nombres_desde(segmento):
+                ultimo_segmento = max(ultimo_segmento, numero)
+                if nombre.endswith(".txt") and nombre not in ya_leidos:
+                    a_leer.append((nombre, mtime_ns, tamanio, None))
+
+        for nombre, mtime_ns, tamanio, ruta in a_leer:
+            resumen = _leer_archivo(ruta) if ruta is not None else self._leer_archivada(nombre)
+            if resumen is None:
+                archivos.append((nombre, mtime_ns, tamanio, None, None, None))
+                continue
+            fecha, cliente, total, detalle = resumen
+            dia = fecha[:10]
+            archivos.append((nombre, mtime_ns, tamanio, dia, cliente, total))
+            lineas.extend((nombre, dia, producto, cantidad, subtotal) for producto, cantidad, subtotal in detalle)
+        if not archivos and not borrados and ultimo_segmento == segmento:
+            return 0
+        with self._lock, self._conexion:
+            self._conexion.executemany("INSERT OR REPLACE INTO estado (clave, valor) VALUES (?, ?)",
+                                       [("segmento", ultimo_segmento), ("almacen", ultimo_id)])
+            nombres = [(nombre,) for nombre in borrados] + [(fila[0],) for fila in archivos]
+            self._conexion.executemany("DELETE FROM archivos WHERE nombre = ?", nombres)
+            self._conexion.executemany("DELETE FROM lineas WHERE nombre = ?", nombres)
+            self._conexion.executemany(
+                "INSERT INTO archivos (nombre, mtime_ns, tamanio, dia, cliente, total) VALUES (?, ?, ?, ?, ?, ?)",
+                archivos)
+            self._conexion.executemany(
+                "INSERT INTO lineas (nombre, dia, producto, cantidad, subtotal) VALUES (?, ?, ?, ?, ?)", lineas)
+        return len(archivos)
+
+    def _leer_archivada(self, nombre):
+        try:
+            datos = self.archivo.leer(nombre)
+            return parsear_boleta(datos.decode("utf-8")) if datos is not None else None
+        except (OSError, UnicodeDecodeError, ValueError):
+            return None
+
+    def reporte(self, por="producto", desde=None, hasta=None):
+        """Filas (clave, cantidad, total) entre desde y hasta (días ISO, inclusive).
+
+        por="dia": (día, boletas, total) ordenado por día.
+        por="producto": (producto, unidades, total) del que más vendió al que menos.
+        por="cliente": (cliente, boletas, total) del que más compró al que menos.
+        """
+        filtro, parametros = ["dia IS NOT NULL"], []
+        if desde is not None:
+            filtro.append("dia >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            filtro.append("dia <= ?")
+            parametros.append(hasta)
+        consulta = CONSULTAS[por].format(filtro=" AND ".join(filtro))
+        with self._lock:
+            return self._conexion.execute(consulta, parametros).fetchall()
+
+    def por_dia(self, desde=None, hasta=None):
+        return self.reporte("dia", desde, hasta)
+
+    def por_producto(self, desde=None, hasta=None):
+        return self.reporte("producto", desde, hasta)
+
+    def por_cliente(self, desde=None, hasta=None):
+        return self.reporte("cliente", desde, hasta)
+
+
+def main(argv=None):
+    hoy = datetime.date.today().isoformat()
+    parser = argparse.ArgumentParser(description="Totales de ventas por día, producto o cliente.")
+    parser.add_argument("--carpeta", default="boletas", help="carpeta de boletas (almacén y .txt)")
+    parser.add_argument("--por", choices=AGRUPACIONES, default="producto")
+    parser.add_argument("--desde", default=None, help="AAAA-MM-DD (por defecto, hoy)")
+    parser.add_argument("--hasta", default=None, help="AAAA-MM-DD (por defecto, igual a --desde)")
+    parser.add_argument("--todo", action="store_true", help="sin filtrar por fecha")
+    parser.add_argument("--limite", type=int, default=None, help="mostrar solo las primeras N filas")
+    parser.add_argument("--revisar", action="store_true",
+                        help="volver a leer también las boletas ya leídas que cambiaron")
+    args = parser.parse_args(argv)
+
+    desde, hasta = (None, None) if args.todo else (args.desde or hoy, args.hasta or args.desde or hoy)
+    archivo = None
+    if (Path(args.carpeta) / "archivo").is_dir():
+        from archivo_boletas import ArchivoBoletas
+        archivo = ArchivoBoletas(args.carpeta)
+    almacen = None
+    if (Path(args.carpeta) / "boletas.sqlite3").is_file():
+        from almacen_boletas import AlmacenBoletas
+        almacen = AlmacenBoletas(Path(args.carpeta) / "boletas.sqlite3")
+    reporte = ReporteVentas(args.carpeta, archivo=archivo, almacen=almacen)
+    leidas = reporte.actualizar(args.revisar)
+    filas = reporte.reporte(args.por, desde, hasta)
+    cantidad_boletas = len(reporte)
+    reporte.cerrar()
+    for abierto in (archivo, almacen):
+        if abierto is not None:
+            abierto.cerrar()
+    encabezado = {"dia": ("Día", "Boletas"), "producto": ("Producto", "Unidades"), "cliente": ("Cliente", "Boletas")}
+    titulo, cantidad = encabezado[args.por]
+    periodo = "todo" if args.todo else f"{desde} a {hasta}"
+    print(f"Ventas por {args.por} ({periodo}; {cantidad_boletas} boletas, {leidas} leídas ahora)")
+    print(f"{titulo:<40} {cantidad:>8} {'Total':>14}")
+    for nombre, unidades, total in filas[:args.limite]:
+        print(f"{nombre:<40} {unidades:>8} {total:>14.2f}")
+    print(f"{'TOTAL':<40} {sum(f[1] for f in filas):>8} {sum(f[2] for f in filas):>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""Servidor local de ventas para varias cajas con un solo almacén.
+
+Cada caja (VentaApp en modo cliente, ver cliente_ventas.py) le manda sus ventas
+por HTTP/JSON y el servidor es el único que escribe el almacén y el historial
+de clientes, así que no hay carreras entre cajas.
+
+- Un solo escritor: las ventas entran a una cola y un único hilo las guarda
+  en SQLite; todas las que llegaron mientras se escribía el lote anterior van
+  juntas en la misma transacción (un fsync por lote).
+- La venta se confirma recién cuando su lote quedó en disco.
+- El .txt y el QR se exportan después, en procesos aparte y con un máximo de
+  trabajos en curso.
+
+API:
+    POST /ventas              {"cliente": "Ana", "productos": [[2, "Skyy"], ...]}
+                              -> 201 {"nombre", "fecha", "total", "contenido"}
+    GET  /boletas/<nombre>    -> 200 {"nombre", "cliente", "fecha", "total", "contenido"} o 404
+    GET  /clientes?prefijo=an&limite=8  -> 200 {"clientes": [...]}
+    GET  /buscar?texto=ana+vino&desde=2025-01-01&hasta=...&min=...&max=...&antes_fecha=...&antes_nombre=...
+                              -> 200 {"boletas": [{"nombre", "cliente", "fecha", "total"}, ...]}
+    GET  /salud               -> 200 {"ok": true, "en_cola": N}
+
+Uso:
+    python servidor_ventas.py [--host 127.0.0.1] [--puerto 8765] [--lote 64] [--procesos-qr N]
+"""
+import argparse
+import asyncio
+import concurrent.futures as cf
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import urllib.parse
+from pathlib import Path
+
+from lote_boletas import validar_pedido
+from persistencia import escribir_boleta
+
+PUERTO = 8765
+LARGO_MAXIMO = 1_000_000   # bytes de cuerpo aceptados por pedido
+FRASES = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+          405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ServidorVentas:
+    def __init__(self, sistema, almacen, lote_maximo=64, en_cola_maximo=1024, procesos_qr=None):
+        """`sistema` es el núcleo (nucleo.py): catálogo, historial y armado de boletas."""
+        self.sistema = sistema
+        self.almacen = almacen
+        self.lote_maximo = lote_maximo
+        self._cola = asyncio.Queue(maxsize=en_cola_maximo)
+        self._escritura = cf.ThreadPoolExecutor(max_workers=1, thread_name_prefix="escritor")
+        procesos_qr = procesos_qr or os.cpu_count() or 1
+        # spawn: los procesos no heredan los hilos ni los locks del servidor
+        self._procesos_qr = cf.ProcessPoolExecutor(procesos_qr, mp_context=multiprocessing.get_context("spawn"))
+        self._cupo_qr = asyncio.Semaphore(procesos_qr * 2)
+        self._exportaciones = set()
+        self._tarea_escritor = None
+        self._servidor = None
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO):
+        self._tarea_escritor = asyncio.create_task(self._escritor())
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    async def cerrar(self):
+        """Deja de aceptar conexiones, guarda lo encolado y termina las exportaciones."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._tarea_escritor is not None:
+            await self._cola.put(None)
+            await self._tarea_escritor
+        if self._exportaciones:
+            await asyncio.gather(*self._exportaciones, return_exceptions=True)
+        self._escritura.shutdown()
+        self._procesos_qr.shutdown()
+        self.sistema.HISTORIAL_CLIENTES.cerrar()
+        self.sistema.INDICE_BOLETAS.cerrar()
+        self.sistema.ARCHIVO_BOLETAS.cerrar()
+
+    # ---------- ventas ----------
+
+    async def registrar_venta(self, cliente, productos):
+        """Valida, arma y guarda la venta; vuelve cuando la boleta ya está en disco."""
+        catalogo = self.sistema.PRODUCTOS_DISPONIBLES
+        productos, error = validar_pedido(cliente, productos, catalogo)
+        if error:
+            raise ValueError(error)
+        cliente = str(cliente).strip()
+        total = sum(cantidad * catalogo[producto] for cantidad, producto in productos)
+        boleta = self.sistema.armar_boleta(cliente, productos, total)
+        guardada = asyncio.get_running_loop().create_future()
+        await self._cola.put((boleta, guardada))
+        await guardada
+        return boleta
+
+    async def _escritor(self):
+        """Único escritor del almacén: toma todo lo encolado y lo guarda en una transacción."""
+        loop = asyncio.get_running_loop()
+        terminar = False
+        while not terminar:
+            item = await self._cola.get()
+            lote = []
+            while item is not None:
+                lote.append(item)
+                if len(lote) >= self.lote_maximo or self._cola.empty():
+                    break
+                item = self._cola.get_nowait()
+            terminar = item is None
+            if not lote:
+                continue
+            try:
+                await loop.run_in_executor(self._escritura, self._guardar_lote, [b for b, _f in lote])
+            except Exception as e:
+                for _boleta, guardada in lote:
+                    if not guardada.done():
+                        guardada.set_exception(e)
+                continue
+            for boleta, guardada in lote:
+                # el historial también se actualiza solo desde acá (append a clientes.log)
+                self.sistema.HISTORIAL_CLIENTES.registrar(boleta["cliente"])
+                if not guardada.done():
+                    guardada.set_result(boleta)
+                if self.sistema.EXPORTAR_ARCHIVOS:
+                    tarea = asyncio.create_task(self._exportar(boleta))
+                    self._exportaciones.add(tarea)
+                    tarea.add_done_callback(self._exportaciones.discard)
+
+    def _guardar_lote(self, boletas):
+        self.almacen.guardar_varias(boletas)
+        self.sistema.INDICE_BOLETAS.agregar_varias(boletas)
+
+    async def _exportar(self, boleta):
+        async with self._cupo_qr:
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    self._procesos_qr, escribir_boleta, Path(boleta["ruta"]), boleta["contenido"], boleta.get("qr"))
+            except Exception as e:
+                print(f"No se pudo exportar la boleta {boleta['nombre']}: {e}", file=sys.stderr)
+
+    # ---------- HTTP ----------
+
+    async def _despachar(self, metodo, ruta, cuerpo):
+        partes = urllib.parse.urlsplit(ruta)
+        camino = urllib.parse.unquote(partes.path)
+        consulta = urllib.parse.parse_qs(partes.query)
+        if camino == "/ventas":
+            if metodo != "POST":
+                return 405, {"error": "usar POST"}
+            try:
+                datos = json.loads(cuerpo or b"{}")
+                boleta = await self.registrar_venta(datos.get("cliente"), datos.get("productos"))
+            except (ValueError, AttributeError) as e:
+                return 400, {"error": str(e)}
+            return 201, {clave: boleta[clave] for clave in ("nombre", "fecha", "total", "contenido")}
+        if metodo != "GET":
+            return 405, {"error": "usar GET"}
+        if camino.startswith("/boletas/"):
+            registro = await asyncio.get_running_loop().run_in_executor(
+                None, self.almacen.obtener_por_nombre, camino[len("/boletas/"):])
+            if registro is None:
+                return 404, {"error": "no existe esa boleta"}
+            registro.pop("id", None)
+            return 200, registro
+        if camino == "/clientes":
+            prefijo = consulta.get("prefijo", [""])[0]
+            limite = int(consulta.get("limite", ["8"])[0])
+            return 200, {"clientes": self.sistema.HISTORIAL_CLIENTES.sugerencias(prefijo, limite)}
+        if camino == "/buscar":
+            def parametro(nombre, tipo=str):
+                valor = consulta.get(nombre, [""])[0]
+                return tipo(valor) if valor else None
+            try:
+                filtros = (parametro("texto") or "", parametro("desde"), parametro("hasta"),
+                           parametro("min", float), parametro("max", float), parametro("limite", int) or 100,
+                           (parametro("antes_fecha"), parametro("antes_nombre")) if "antes_fecha" in consulta else None)
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            boletas = await asyncio.get_running_loop().run_in_executor(
+                None, self.sistema.INDICE_BOLETAS.buscar, *filtros)
+            return 200, {"boletas": boletas}
+        if camino == "/salud":
+            return 200, {"ok": True, "en_cola": self._cola.qsize()}
+        return 404, {"error": f"ruta desconocida: {camino}"}
+
+    async def _atender(self, reader, writer):
+        """Una conexión HTTP/1.1 (keep-alive): pedido, respuesta, y así hasta que se cierre."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea.strip():
+                    break
+                metodo, ruta, _version = linea.decode("latin-1").split()
+                cabeceras = {}
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _sep, valor = cabecera.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                largo = int(cabeceras.get("content-length", 0))
+                if largo > LARGO_MAXIMO:
+                    estado, datos = 413, {"error": "pedido demasiado grande"}
+                else:
+                    cuerpo = await reader.readexactly(largo) if largo else b""
+                    try:
+                        estado, datos = await self._despachar(metodo, ruta, cuerpo)
+                    except Exception as e:
+                        estado, datos = 500, {"error": str(e)}
+                respuesta = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+                writer.write(f"HTTP/1.1 {estado} {FRASES[estado]}\r\n"
+                             "Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(respuesta)}\r\n\r\n".encode("latin-1") + respuesta)
+                await writer.drain()
+                if estado == 413 or cabeceras.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # conexión cortada o pedido mal formado
+        finally:
+            writer.close()
+
+
+async def servir(host, puerto, lote_maximo, procesos_qr):
+    import nucleo
+    from almacen_boletas import AlmacenBoletas
+    almacen = AlmacenBoletas(nucleo.BOLETAS_DIR / "boletas.sqlite3", durable=True)
+    servidor = ServidorVentas(nucleo, almacen, lote_maximo=lote_maximo, procesos_qr=procesos_qr)
+    puerto = await servidor.iniciar(host, puerto)
+    print(f"Servidor de ventas en http://{host}:{puerto} ({len(nucleo.PRODUCTOS_DISPONIBLES)} productos)")
+    # Los cambios de lista_de_productos.txt se aplican en el hilo del loop, entre pedidos
+    loop = asyncio.get_running_loop()
+    vigilante = nucleo.vigilar_catalogo(
+        lambda diferencia: loop.call_soon_threadsafe(nucleo.aplicar_cambios_catalogo, diferencia))
+    # Las boletas de antes del índice de búsqueda se cargan una sola vez, en segundo plano
+    if not nucleo.INDICE_BOLETAS.reconstruido():
+        loop.run_in_executor(None, nucleo.INDICE_BOLETAS.reconstruir, almacen, nucleo.BOLETAS_DIR,
+                             nucleo.ARCHIVO_BOLETAS)
+    detener = asyncio.Event()
+    try:
+        # SIGTERM cierra ordenado: se guarda lo encolado y se terminan las exportaciones
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, detener.set)
+    except (NotImplementedError, AttributeError):
+        pass  # Windows
+    try:
+        await detener.wait()
+    finally:
+        vigilante.detener()
+        await servidor.cerrar()
+        almacen.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de ventas (HTTP/JSON).")
+    parser.add_argument("--host", default="127.0.0.1", help="interfaz donde escuchar (por defecto solo esta máquina)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--lote", type=int, default=64, help="máximo de ventas por transacción")
+    parser.add_argument("--procesos-qr", type=int, default=None, help="procesos para exportar .txt y QR")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.lote, args.procesos_qr))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
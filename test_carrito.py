@@ -0,0 +1,50 @@
+"""Pruebas del modelo del carrito (se corren con pytest)."""
+import random
+
+from cambios_carrito import CambiosCarrito
+from carrito import Carrito
+
+PRECIOS = (394.44, 1337.5, 2350.0, 0.1, 1030.0)
+
+
+def _foto(carrito):
+    return [(l.id, l.producto, l.cantidad, l.precio) for l in carrito]
+
+
+def test_total_incremental_coincide_con_recalcular():
+    """Agregar, eliminar y cambiar cantidades al azar: el total incremental es siempre el exacto."""
+    rnd = random.Random(0)
+    nombres = [f"Producto {i}" for i in range(50)]
+    carrito = Carrito()
+    siguiente_id = 0
+    for _ in range(5_000):
+        accion = rnd.random()
+        producto = rnd.choice(nombres)
+        linea = carrito.linea_de_producto(producto)
+        if accion < 0.4 and linea is None:
+            siguiente_id += 1
+            carrito.agregar(siguiente_id, producto, rnd.randint(1, 5), rnd.choice(PRECIOS))
+        elif accion < 0.7 and linea is not None:
+            carrito.cambiar_cantidad(linea.id, rnd.randint(1, 20))
+        elif accion < 0.8 and linea is not None:
+            carrito.cambiar_precio(linea.id, rnd.choice(PRECIOS))
+        elif accion < 0.99 and carrito:
+            carrito.eliminar(rnd.choice(carrito.ids()))
+        else:
+            carrito.vaciar()
+        assert carrito.total == carrito.recalcular_total()
+
+
+def test_deshacer_eliminar_devuelve_cada_linea_a_su_lugar():
+    rnd = random.Random(1)
+    for _ in range(200):
+        carrito = Carrito()
+        cambios = CambiosCarrito(carrito)
+        for i in range(rnd.randint(1, 20)):
+            cambios.agregar(i, f"Producto {i}", rnd.randint(1, 5), rnd.choice(PRECIOS))
+        antes = _foto(carrito)
+        cambios.eliminar(rnd.sample(carrito.ids(), rnd.randint(1, len(carrito))))
+        cambios.deshacer()
+        assert _foto(carrito) == antes
+        assert carrito.rebanada(0, len(carrito)) == list(carrito)
+        assert carrito.total == carrito.recalcular_total()
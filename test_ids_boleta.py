@@ -0,0 +1,52 @@
+"""Pruebas del asignador de ids de boleta (se corren con pytest)."""
+import concurrent.futures as cf
+import threading
+
+from ids_boleta import AsignadorIds
+
+
+def _pedir_en_hilos(ruta, cantidad=500, hilos=4, bloque=8, compartido=False):
+    """Varios hilos de un proceso sobre el mismo contador, cada uno con su
+    asignador o (compartido) todos con el mismo."""
+    listas = [[] for _ in range(hilos)]
+    uno_solo = AsignadorIds(ruta, "prueba", bloque) if compartido else None
+
+    def trabajar(lista):
+        asignador = uno_solo or AsignadorIds(ruta, "prueba", bloque)
+        for _ in range(cantidad):
+            lista.append(asignador.siguiente_numero())
+
+    trabajadores = [threading.Thread(target=trabajar, args=(lista,)) for lista in listas]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    return listas
+
+
+def _sin_repetidos(listas, esperados):
+    numeros = [n for lista in listas for n in lista]
+    assert len(numeros) == esperados
+    assert len(set(numeros)) == len(numeros), "números de boleta repetidos"
+    assert all(a < b for lista in listas for a, b in zip(lista, lista[1:]))
+    return numeros
+
+
+def test_hilos_con_el_mismo_contador_no_repiten(tmp_path):
+    ruta = tmp_path / "secuencia.txt"
+    _sin_repetidos(_pedir_en_hilos(ruta), 4 * 500)
+
+
+def test_hilos_con_el_mismo_asignador_no_repiten(tmp_path):
+    ruta = tmp_path / "secuencia.txt"
+    _sin_repetidos(_pedir_en_hilos(ruta, compartido=True), 4 * 500)
+
+
+def test_procesos_con_el_mismo_contador_no_repiten(tmp_path):
+    ruta = tmp_path / "secuencia.txt"
+    with cf.ProcessPoolExecutor(3) as pool:
+        futuros = [pool.submit(_pedir_en_hilos, ruta) for _ in range(3)]
+        listas = [lista for futuro in futuros for lista in futuro.result()]
+    numeros = _sin_repetidos(listas, 3 * 4 * 500)
+    # Un asignador nuevo (como al volver a abrir la caja) sigue más arriba
+    assert AsignadorIds(ruta, "prueba").siguiente_numero() > max(numeros)
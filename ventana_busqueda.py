@@ -0,0 +1,138 @@
+"""Ventana para buscar boletas viejas por cliente, producto, fecha y total.
+
+Consulta el índice invertido (indice_boletas.py) a medida que se escribe, con
+una breve espera entre teclas; cada búsqueda tarda milisegundos, así que corre
+en el hilo de Tk. Si el índice todavía no tiene las boletas anteriores, la
+primera vez se cargan en un hilo aparte.
+"""
+import datetime
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from metricas import etapa
+
+
+class VentanaBusqueda:
+    def __init__(self, root, buscar, abrir, preparar=None, espera_ms=150):
+        """`buscar(texto, desde, hasta, total_min, total_max)` devuelve diccionarios
+        con nombre, cliente, fecha y total; `abrir(nombre)` muestra una boleta;
+        `preparar()` (opcional) se corre una vez en segundo plano antes de buscar."""
+        self.root = root
+        self.buscar = buscar
+        self.abrir = abrir
+        self.espera_ms = espera_ms
+        self._after_id = None
+        self._preparando = preparar is not None
+        self._resultados = queue.SimpleQueue()
+
+        self.ventana = tk.Toplevel(root)
+        self.ventana.title("Buscar boletas")
+        self.ventana.geometry("900x600")
+
+        frame_filtros = tk.Frame(self.ventana)
+        frame_filtros.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(frame_filtros, text="Buscar:").grid(row=0, column=0, sticky="w")
+        self.texto_entry = ttk.Entry(frame_filtros, width=40)
+        self.texto_entry.grid(row=0, column=1, columnspan=3, sticky="we", padx=5)
+        self.desde_entry = self._filtro(frame_filtros, "Desde:", 1, 0)
+        self.hasta_entry = self._filtro(frame_filtros, "Hasta:", 1, 2)
+        self.min_entry = self._filtro(frame_filtros, "Total mín.:", 2, 0)
+        self.max_entry = self._filtro(frame_filtros, "Total máx.:", 2, 2)
+        for entrada in (self.texto_entry, self.desde_entry, self.hasta_entry, self.min_entry, self.max_entry):
+            entrada.bind("<KeyRelease>", lambda e: self.programar())
+
+        frame_tabla = tk.Frame(self.ventana)
+        frame_tabla.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(frame_tabla, columns=("Fecha", "Cliente", "Total", "Boleta"), show="headings")
+        for columna, ancho in (("Fecha", 190), ("Cliente", 220), ("Total", 130), ("Boleta", 320)):
+            self.tree.heading(columna, text=columna)
+            self.tree.column(columna, width=ancho, anchor=tk.E if columna == "Total" else tk.W)
+        barra = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=barra.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<Double-1>", self._abrir_seleccionada)
+        self.tree.bind("<Return>", self._abrir_seleccionada)
+
+        self.estado_label = tk.Label(self.ventana, text="", anchor="w")
+        self.estado_label.pack(fill=tk.X, padx=10, pady=5)
+        self.texto_entry.focus_set()
+
+        if preparar is not None:
+            self.estado_label.config(text="Indexando boletas anteriores...")
+            threading.Thread(target=self._preparar, args=(preparar,), daemon=True).start()
+            self.root.after(50, self._revisar_preparacion)
+        else:
+            self.programar()
+
+    def _filtro(self, frame, texto, fila, columna):
+        tk.Label(frame, text=texto).grid(row=fila, column=columna, sticky="w")
+        entrada = ttk.Entry(frame, width=12)
+        entrada.grid(row=fila, column=columna + 1, sticky="w", padx=5, pady=2)
+        return entrada
+
+    def _preparar(self, preparar):
+        try:
+            preparar()
+            self._resultados.put(None)
+        except Exception as e:
+            self._resultados.put(e)
+
+    def _revisar_preparacion(self):
+        try:
+            error = self._resultados.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._revisar_preparacion)
+            return
+        self._preparando = False
+        if not self.ventana.winfo_exists():
+            return
+        if error is not None:
+            self.estado_label.config(text=f"No se pudieron indexar las boletas anteriores: {error}")
+        self.programar()
+
+    def programar(self):
+        """Busca después de una breve pausa en el tipeo."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.espera_ms, self.actualizar)
+
+    def _filtros(self):
+        """(desde, hasta, total_min, total_max) de los campos; ValueError si alguno es inválido."""
+        fechas = []
+        for entrada in (self.desde_entry, self.hasta_entry):
+            valor = entrada.get().strip() or None
+            if valor is not None:
+                datetime.date.fromisoformat(valor)
+            fechas.append(valor)
+        montos = [float(valor) if valor else None
+                  for valor in (self.min_entry.get().strip(), self.max_entry.get().strip())]
+        return (*fechas, *montos)
+
+    def actualizar(self):
+        self._after_id = None
+        if self._preparando or not self.ventana.winfo_exists():
+            return
+        try:
+            filtros = self._filtros()
+        except ValueError:
+            self.estado_label.config(text="Fechas AAAA-MM-DD y totales con punto decimal")
+            return
+        try:
+            with etapa("ui.buscar_boletas"):
+                boletas = self.buscar(self.texto_entry.get().strip(), *filtros)
+        except (OSError, ValueError) as e:
+            self.estado_label.config(text=f"No se pudo buscar: {e}")
+            return
+        self.tree.delete(*self.tree.get_children())
+        for b in boletas:
+            self.tree.insert("", tk.END, iid=b["nombre"],
+                             values=(b["fecha"].replace("T", " "), b["cliente"], f"${b['total']:.2f}", b["nombre"]))
+        self.estado_label.config(text=f"{len(boletas)} boletas (doble clic para verla)")
+
+    def _abrir_seleccionada(self, event=None):
+        seleccion = self.tree.selection()
+        if seleccion:
+            self.abrir(seleccion[0])
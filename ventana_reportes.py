@@ -0,0 +1,137 @@
+"""Ventana de reportes de ventas (por día, producto o cliente).
+
+La lectura de boletas nuevas y la consulta corren en un hilo aparte (la
+primera vez puede tener que leer un año de .txt); el resultado vuelve al hilo
+de Tk por una cola que se revisa con root.after.
+"""
+import datetime
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from metricas import etapa
+from reportes import AGRUPACIONES, ReporteVentas
+
+COLUMNAS = {
+    "dia": ("Día", "Boletas"),
+    "producto": ("Producto", "Unidades"),
+    "cliente": ("Cliente", "Boletas"),
+}
+
+
+class VentanaReportes:
+    def __init__(self, root, carpeta, archivo=None, almacen=None):
+        self.root = root
+        self.carpeta = carpeta
+        self.archivo = archivo
+        self.almacen = almacen
+        self._resultados = queue.SimpleQueue()
+        self._ocupado = False
+        self._reporte = None   # se abre en el hilo de fondo la primera vez
+
+        self.ventana = tk.Toplevel(root)
+        self.ventana.title("Reportes de ventas")
+        self.ventana.geometry("800x600")
+        self.ventana.protocol("WM_DELETE_WINDOW", self.cerrar)
+
+        hoy = datetime.date.today().isoformat()
+        frame_filtros = tk.Frame(self.ventana)
+        frame_filtros.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(frame_filtros, text="Desde:").pack(side=tk.LEFT)
+        self.desde_entry = ttk.Entry(frame_filtros, width=11)
+        self.desde_entry.insert(0, hoy)
+        self.desde_entry.pack(side=tk.LEFT, padx=(2, 10))
+        tk.Label(frame_filtros, text="Hasta:").pack(side=tk.LEFT)
+        self.hasta_entry = ttk.Entry(frame_filtros, width=11)
+        self.hasta_entry.insert(0, hoy)
+        self.hasta_entry.pack(side=tk.LEFT, padx=(2, 10))
+        tk.Label(frame_filtros, text="Por:").pack(side=tk.LEFT)
+        self.por_cb = ttk.Combobox(frame_filtros, values=AGRUPACIONES, state="readonly", width=9)
+        self.por_cb.set("producto")
+        self.por_cb.pack(side=tk.LEFT, padx=(2, 10))
+        self.por_cb.bind("<<ComboboxSelected>>", lambda e: self.actualizar())
+        self.btn_actualizar = ttk.Button(frame_filtros, text="Actualizar", command=self.actualizar)
+        self.btn_actualizar.pack(side=tk.LEFT)
+
+        frame_tabla = tk.Frame(self.ventana)
+        frame_tabla.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(frame_tabla, columns=("Nombre", "Cantidad", "Total"), show="headings")
+        self.tree.column("Nombre", width=400)
+        self.tree.column("Cantidad", width=120, anchor=tk.E)
+        self.tree.column("Total", width=180, anchor=tk.E)
+        barra = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=barra.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        barra.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.estado_label = tk.Label(self.ventana, text="", anchor="w")
+        self.estado_label.pack(fill=tk.X, padx=10, pady=5)
+
+        self.actualizar()
+
+    def actualizar(self):
+        """Lee las boletas nuevas y arma el reporte pedido, fuera del hilo de Tk."""
+        if self._ocupado:
+            return
+        desde = self.desde_entry.get().strip() or None
+        hasta = self.hasta_entry.get().strip() or None
+        for fecha in (desde, hasta):
+            if fecha is not None:
+                try:
+                    datetime.date.fromisoformat(fecha)
+                except ValueError:
+                    self.estado_label.config(text=f"Fecha inválida: {fecha} (usar AAAA-MM-DD)")
+                    return
+        por = self.por_cb.get()
+        self._ocupado = True
+        self.btn_actualizar.config(state=tk.DISABLED)
+        self.estado_label.config(text="Leyendo boletas...")
+        threading.Thread(target=self._consultar, args=(por, desde, hasta), daemon=True).start()
+        self.root.after(50, self._revisar)
+
+    def _consultar(self, por, desde, hasta):
+        try:
+            with etapa("reportes.actualizar"):
+                if self._reporte is None:
+                    self._reporte = ReporteVentas(self.carpeta, archivo=self.archivo, almacen=self.almacen)
+                leidas = self._reporte.actualizar()
+                filas = self._reporte.reporte(por, desde, hasta)
+            self._resultados.put((por, filas, leidas, None))
+        except Exception as e:
+            self._resultados.put((por, [], 0, e))
+
+    def _revisar(self):
+        try:
+            por, filas, leidas, error = self._resultados.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._revisar)
+            return
+        self._ocupado = False
+        if not self.ventana.winfo_exists():
+            # la ventana se cerró mientras se leía
+            if self._reporte is not None:
+                self._reporte.cerrar()
+            return
+        self.btn_actualizar.config(state=tk.NORMAL)
+        if error is not None:
+            self.estado_label.config(text=f"No se pudo armar el reporte: {error}")
+            return
+        self._mostrar(por, filas, leidas)
+
+    def _mostrar(self, por, filas, leidas):
+        nombre, cantidad = COLUMNAS[por]
+        self.tree.heading("Nombre", text=nombre)
+        self.tree.heading("Cantidad", text=cantidad)
+        self.tree.heading("Total", text="Total")
+        self.tree.delete(*self.tree.get_children())
+        for clave, unidades, total in filas:
+            self.tree.insert("", tk.END, values=(clave, unidades, f"${total:.2f}"))
+        suma = sum(fila[2] for fila in filas)
+        self.estado_label.config(
+            text=f"{len(filas)} filas   Total: ${suma:.2f}   ({leidas} boletas nuevas leídas)")
+
+    def cerrar(self):
+        self.ventana.destroy()
+        if self._reporte is not None and not self._ocupado:
+            self._reporte.cerrar()
@@ -0,0 +1,230 @@
+"""Visor de boletas anteriores: lista paginada por fecha con vista previa.
+
+La lista se pide de a páginas al índice de boletas (de la más nueva a la más
+vieja) y la siguiente se trae sola al acercarse al final. El texto y la
+miniatura del QR de la boleta elegida se cargan en un hilo aparte, junto con
+las vecinas (para que bajar con las flechas no espere); el resultado vuelve al
+hilo de Tk por una cola que se revisa con root.after. En memoria quedan los
+últimos textos y PhotoImage vistos; en disco, las miniaturas (miniaturas.py).
+"""
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict, deque
+from tkinter import ttk
+
+from metricas import etapa
+from qr_compacto import importar_pil
+
+
+class VisorBoletas:
+    def __init__(self, root, listar, leer, ruta_qr, miniaturas=None, preparar=None,
+                 por_pagina=50, capacidad=64, vecinas=3):
+        """`listar(antes, limite)` devuelve la página que sigue a `antes` ((fecha, nombre)
+        o None); `leer(nombre)` el texto de la boleta; `ruta_qr(nombre)` el PNG o None.
+        Las tres y `preparar()` (opcional, antes de la primera página) corren en el hilo de fondo."""
+        self.root = root
+        self.listar = listar
+        self.leer = leer
+        self.ruta_qr = ruta_qr
+        self.miniaturas = miniaturas
+        self.por_pagina = por_pagina
+        self.capacidad = capacidad
+        self.vecinas = vecinas
+
+        self._textos = OrderedDict()     # nombre -> texto
+        self._fotos = OrderedDict()      # nombre -> PhotoImage (o None si no hay QR)
+        self._filas = []                 # boletas listadas, en orden
+        self._posiciones = {}            # nombre -> posición en _filas
+        self._generacion = 0             # cada selección nueva deja viejas las cargas anteriores
+        self._pidiendo_pagina = False
+        self._fin = False
+        self._seleccionada = None
+
+        self._cond = threading.Condition()
+        self._trabajos = deque()
+        self._resultados = queue.SimpleQueue()
+
+        self.ventana = tk.Toplevel(root)
+        self.ventana.title("Boletas anteriores")
+        self.ventana.geometry("1100x650")
+        self.ventana.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self.estado_label = tk.Label(self.ventana, text="", anchor="w")
+        self.estado_label.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 5))
+
+        frame_lista = tk.Frame(self.ventana)
+        frame_lista.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 5), pady=10)
+        self.tree = ttk.Treeview(frame_lista, columns=("Fecha", "Cliente", "Total"), show="headings",
+                                 selectmode="browse")
+        for columna, ancho in (("Fecha", 200), ("Cliente", 200), ("Total", 120)):
+            self.tree.heading(columna, text=columna)
+            self.tree.column(columna, width=ancho, anchor=tk.E if columna == "Total" else tk.W)
+        self.barra = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._desplazado)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewSelect>>", self._seleccion)
+
+        frame_detalle = tk.Frame(self.ventana)
+        frame_detalle.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 10), pady=10)
+        self.label_qr = tk.Label(frame_detalle, text="", fg="#999")
+        self.label_qr.pack(pady=5)
+        self.caja_texto = tk.Text(frame_detalle, width=45, height=20, font=("Courier", 9), state=tk.DISABLED)
+        self.caja_texto.pack(fill=tk.BOTH, expand=True)
+
+        self._hilo = threading.Thread(target=self._trabajar, name="visor-boletas", daemon=True)
+        self._hilo.start()
+        if preparar is not None:
+            self._encolar(("preparar", preparar))
+        self._pedir_pagina()
+        self.root.after(40, self._revisar)
+
+    # ---------- hilo de fondo ----------
+
+    def _encolar(self, trabajo, primero=False):
+        with self._cond:
+            if primero:
+                self._trabajos.appendleft(trabajo)
+            else:
+                self._trabajos.append(trabajo)
+            self._cond.notify()
+
+    def _trabajar(self):
+        while True:
+            with self._cond:
+                while not self._trabajos:
+                    self._cond.wait()
+                trabajo = self._trabajos.popleft()
+            if trabajo is None:
+                return
+            tipo = trabajo[0]
+            try:
+                if tipo == "preparar":
+                    trabajo[1]()
+                elif tipo == "pagina":
+                    with etapa("visor.pagina"):
+                        self._resultados.put(("pagina", self.listar(trabajo[1], self.por_pagina), None, None))
+                elif tipo == "detalle":
+                    _tipo, generacion, nombre, cargar_texto, cargar_qr = trabajo
+                    if generacion != self._generacion:
+                        continue  # el usuario ya eligió otra boleta
+                    with etapa("visor.detalle"):
+                        texto = self.leer(nombre) if cargar_texto else None
+                        imagen = None
+                        if cargar_qr and self.miniaturas is not None:
+                            ruta = self.ruta_qr(nombre)
+                            imagen = self.miniaturas.cargar(ruta) if ruta is not None else None
+                    self._resultados.put(("detalle", nombre, (texto, imagen, cargar_qr), None))
+            except Exception as e:
+                self._resultados.put((tipo, trabajo[2] if tipo == "detalle" else None, None, e))
+
+    # ---------- hilo de Tk ----------
+
+    def _pedir_pagina(self):
+        if self._pidiendo_pagina or self._fin:
+            return
+        self._pidiendo_pagina = True
+        antes = (self._filas[-1]["fecha"], self._filas[-1]["nombre"]) if self._filas else None
+        self._encolar(("pagina", antes))
+        self.estado_label.config(text="Cargando boletas...")
+
+    def _desplazado(self, primero, ultimo):
+        self.barra.set(primero, ultimo)
+        if float(ultimo) > 0.9:
+            self._pedir_pagina()
+
+    def _revisar(self):
+        if not self.ventana.winfo_exists():
+            return
+        while True:
+            try:
+                tipo, dato, resultado, error = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "pagina":
+                self._agregar_pagina(dato if error is None else [], error)
+            elif tipo == "detalle":
+                self._guardar_detalle(dato, resultado, error)
+            elif error is not None:
+                self.estado_label.config(text=f"No se pudieron indexar las boletas anteriores: {error}")
+        self.root.after(40, self._revisar)
+
+    def _agregar_pagina(self, filas, error):
+        self._pidiendo_pagina = False
+        if error is not None:
+            self.estado_label.config(text=f"No se pudieron listar las boletas: {error}")
+            return
+        if len(filas) < self.por_pagina:
+            self._fin = True
+        for b in filas:
+            self._posiciones[b["nombre"]] = len(self._posiciones)
+            self.tree.insert("", tk.END, iid=b["nombre"],
+                             values=(b["fecha"].replace("T", " "), b["cliente"], f"${b['total']:.2f}"))
+        self._filas.extend(filas)
+        self.estado_label.config(text=f"{len(self._filas)} boletas{'' if self._fin else ' (hay más)'}")
+        if self._seleccionada is None and self._filas:
+            self.tree.selection_set(self._filas[0]["nombre"])
+
+    def _seleccion(self, event=None):
+        seleccion = self.tree.selection()
+        if not seleccion:
+            return
+        nombre = self._seleccionada = seleccion[0]
+        self._generacion += 1
+        # la elegida primero y después las vecinas que falten
+        posicion = self._posiciones[nombre]
+        vecinas = [self._filas[i]["nombre"] for i in range(posicion + 1, posicion + 1 + self.vecinas)
+                   if i < len(self._filas)]
+        if posicion > 0:
+            vecinas.append(self._filas[posicion - 1]["nombre"])
+        with self._cond:
+            self._trabajos = deque(t for t in self._trabajos if t is not None and t[0] != "detalle")
+        for n in [nombre] + vecinas:
+            falta_texto, falta_qr = n not in self._textos, n not in self._fotos
+            if falta_texto or falta_qr:
+                self._encolar(("detalle", self._generacion, n, falta_texto, falta_qr))
+        self._mostrar(nombre)
+        if posicion >= len(self._filas) - self.vecinas:
+            self._pedir_pagina()
+
+    def _guardar_detalle(self, nombre, resultado, error):
+        if error is not None:
+            # no se guarda en la caché: al volver a elegirla se intenta de nuevo
+            if nombre == self._seleccionada:
+                self._mostrar(nombre, f"Error al leer boleta: {error}")
+            return
+        texto, imagen, con_qr = resultado
+        if texto is not None:
+            self._recordar(self._textos, nombre, texto, self.capacidad * 4)
+        if con_qr:
+            # PhotoImage tiene que crearse en el hilo de Tk
+            foto = importar_pil()[1].PhotoImage(imagen) if imagen is not None else None
+            self._recordar(self._fotos, nombre, foto, self.capacidad)
+        if nombre == self._seleccionada:
+            self._mostrar(nombre)
+
+    @staticmethod
+    def _recordar(cache, clave, valor, capacidad):
+        cache[clave] = valor
+        cache.move_to_end(clave)
+        while len(cache) > capacidad:
+            cache.popitem(last=False)
+
+    def _mostrar(self, nombre, error=None):
+        texto = error or self._textos.get(nombre)
+        self.caja_texto.config(state=tk.NORMAL)
+        self.caja_texto.delete("1.0", tk.END)
+        self.caja_texto.insert(tk.END, texto if texto is not None else "Cargando...")
+        self.caja_texto.config(state=tk.DISABLED)
+        if nombre not in self._fotos:
+            self.label_qr.config(image="", text="" if error else "Cargando QR...")
+        elif self._fotos[nombre] is None:
+            self.label_qr.config(image="", text="Código QR no disponible")
+        else:
+            self.label_qr.config(image=self._fotos[nombre], text="")
+        if nombre in self._textos:
+            self._textos.move_to_end(nombre)
+
+    def cerrar(self):
+        self._encolar(None, primero=True)
+        self.ventana.destroy()
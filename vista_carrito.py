@@ -0,0 +1,150 @@
+"""Vista del carrito con scroll virtual.
+
+El Treeview solo tiene tantas filas como entran en pantalla; al desplazarse se
+vuelven a llenar con las líneas del Carrito que corresponden a esa ventana.
+Así la memoria y el tiempo de redibujo no dependen del tamaño del pedido.
+La selección se guarda por id de línea del carrito, no por fila del Treeview.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+COLUMNAS = (
+    ("producto", "Producto", 300, tk.W),
+    ("cantidad", "Cantidad", 80, tk.CENTER),
+    ("precio", "P. Unitario", 100, tk.E),
+    ("subtotal", "Subtotal", 100, tk.E),
+)
+
+
+def valores_fila(linea):
+    return (linea.producto, linea.cantidad, f"${linea.precio:.2f}", f"${linea.subtotal:.2f}")
+
+
+class VistaCarritoVirtual(tk.Frame):
+    def __init__(self, master, carrito, al_ordenar=None, alto_fila=30):
+        super().__init__(master)
+        self.carrito = carrito
+        self.alto_fila = alto_fila
+        self.inicio = 0          # posición de la primera línea visible
+        self.visibles = 1        # filas que entran en pantalla
+        self._seleccion = None   # id de línea seleccionada
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in COLUMNAS], show="headings", selectmode="browse")
+        for col, titulo, ancho, anchor in COLUMNAS:
+            # Encabezados clicables: permiten ordenar el carrito por cualquier columna
+            comando = (lambda c=col: al_ordenar(c)) if al_ordenar else ""
+            self.tree.heading(col, text=titulo, command=comando)
+            self.tree.column(col, width=ancho, anchor=anchor)
+
+        self.vsb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.vsb.pack(side=tk.LEFT, fill=tk.Y)
+
+        self._filas = []         # item ids del pool de filas del Treeview
+        self._lineas_fila = {}   # item id de la fila -> id de línea que muestra
+
+        self.tree.bind("<Configure>", self._al_redimensionar)
+        self.tree.bind("<<TreeviewSelect>>", self._al_seleccionar)
+        self.tree.bind("<MouseWheel>", lambda e: self._desplazar(-3 if e.delta > 0 else 3, "units"))
+        self.tree.bind("<Button-4>", lambda e: self._desplazar(-3, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._desplazar(3, "units"))
+        self.tree.bind("<Up>", lambda e: self._mover_seleccion(-1))
+        self.tree.bind("<Down>", lambda e: self._mover_seleccion(1))
+
+    # --- selección ---
+
+    def seleccion(self):
+        """Ids de las líneas seleccionadas que siguen en el carrito."""
+        if self._seleccion is not None and self._seleccion in self.carrito:
+            return [self._seleccion]
+        return []
+
+    def limpiar_seleccion(self):
+        self._seleccion = None
+
+    def _al_seleccionar(self, event=None):
+        filas = self.tree.selection()
+        # Si la línea seleccionada quedó fuera de la ventana el Treeview no tiene
+        # selección, pero la línea sigue seleccionada en el modelo
+        if filas:
+            self._seleccion = self._lineas_fila.get(filas[0], self._seleccion)
+
+    def _mover_seleccion(self, paso):
+        if not self.carrito:
+            return "break"
+        try:
+            actual = self.carrito.posicion(self._seleccion)
+        except ValueError:
+            actual = self.inicio - paso
+        nueva = max(0, min(len(self.carrito) - 1, actual + paso))
+        self._seleccion = self.carrito.rebanada(nueva, nueva + 1)[0].id
+        self.mostrar_posicion(nueva)
+        return "break"
+
+    # --- scroll ---
+
+    def _al_redimensionar(self, event):
+        # el encabezado ocupa aproximadamente una fila
+        visibles = max(1, event.height // self.alto_fila - 1)
+        if visibles != self.visibles:
+            self.visibles = visibles
+            self.refrescar()
+
+    def _scroll(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self._fijar_inicio(int(float(cantidad) * len(self.carrito)))
+        else:
+            self._desplazar(int(cantidad), unidad)
+
+    def _desplazar(self, pasos, unidad):
+        if unidad == "pages":
+            pasos *= max(1, self.visibles - 1)
+        self._fijar_inicio(self.inicio + pasos)
+
+    def _fijar_inicio(self, inicio):
+        inicio = max(0, min(inicio, len(self.carrito) - self.visibles))
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self.refrescar()
+
+    def mostrar_posicion(self, posicion):
+        """Desplaza la vista lo mínimo para que se vea la línea en esa posición."""
+        if posicion < self.inicio:
+            self.inicio = posicion
+        elif posicion >= self.inicio + self.visibles:
+            self.inicio = posicion - self.visibles + 1
+        self.refrescar()
+
+    def mostrar_final(self):
+        self.mostrar_posicion(max(0, len(self.carrito) - 1))
+
+    # --- dibujo ---
+
+    def refrescar(self):
+        """Vuelve a llenar solo las filas visibles con las líneas del carrito."""
+        total = len(self.carrito)
+        self.inicio = max(0, min(self.inicio, total - self.visibles))
+        lineas = self.carrito.rebanada(self.inicio, self.inicio + self.visibles)
+
+        # Ajustar el pool de filas a la cantidad de líneas a mostrar
+        while len(self._filas) < len(lineas):
+            self._filas.append(self.tree.insert("", "end"))
+        while len(self._filas) > len(lineas):
+            self.tree.delete(self._filas.pop())
+
+        self._lineas_fila.clear()
+        fila_seleccionada = None
+        for fila, linea in zip(self._filas, lineas):
+            self.tree.item(fila, values=valores_fila(linea))
+            self._lineas_fila[fila] = linea.id
+            if linea.id == self._seleccion:
+                fila_seleccionada = fila
+        if fila_seleccionada is not None:
+            self.tree.selection_set(fila_seleccionada)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if total:
+            self.vsb.set(self.inicio / total, min(1.0, (self.inicio + len(lineas)) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
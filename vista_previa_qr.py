@@ -0,0 +1,152 @@
+"""Vista previa del QR generada en segundo plano.
+
+El QR de la vista previa se pedía en cada tecla del nombre del cliente y en
+cada cambio del carrito, todo en el hilo de Tk. Acá se agrupan los pedidos con
+una espera (debounce), se generan en un hilo aparte descartando los que ya
+quedaron viejos y se guardan en una caché LRU por hash del contenido, así
+volver a un estado ya visto no cuesta nada.
+"""
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+
+from metricas import etapa
+from qr_compacto import importar_pil, importar_qrcode
+
+
+
+def clave_contenido(*partes):
+    """Hash estable de las partes que definen el contenido del QR."""
+    return hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()
+
+
+class RenderizadorQR:
+    """Genera imágenes QR fuera del hilo de Tk y las entrega con root.after.
+
+    `mostrar(foto, error)` se llama siempre en el hilo de Tk, solo para el
+    pedido más reciente.
+    """
+
+    def __init__(self, root, mostrar, espera_ms=200, capacidad=64, tamanio=(190, 190)):
+        self.root = root
+        self.mostrar = mostrar
+        self.espera_ms = espera_ms
+        self.capacidad = capacidad
+        self.tamanio = tamanio
+
+        self._cache = OrderedDict()   # clave -> PhotoImage
+        self._generacion = 0          # cada pedido nuevo deja viejos a los anteriores
+        self._after_id = None
+        self._sondeo_id = None
+        self._esperando = False
+
+        self._cond = threading.Condition()
+        self._pedido = None           # (generacion, clave, generar_contenido) para el hilo
+        self._resultados = queue.SimpleQueue()
+        self._hilo = None
+        self._disponible = None       # None: todavía no se intentó importar qrcode y PIL
+
+    @property
+    def disponible(self):
+        # la primera consulta importa qrcode y PIL (no se cargan al abrir el programa);
+        # si no están, no se reintenta en cada tecla sino al llamar a reintentar()
+        if self._disponible is None:
+            self._disponible = importar_qrcode() is not None and importar_pil()[1] is not None
+        return self._disponible
+
+    def reintentar(self):
+        """Vuelve a intentar importar qrcode y PIL en la próxima consulta (p. ej. si se instalaron)."""
+        self._disponible = None
+
+    def solicitar(self, preparar):
+        """Pide una vista previa nueva.
+
+        `preparar()` se ejecuta en el hilo de Tk al vencer la espera y devuelve
+        (clave, generar_contenido); `generar_contenido()` corre en el hilo de fondo.
+        """
+        self._generacion += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        generacion = self._generacion
+        self._after_id = self.root.after(self.espera_ms, lambda: self._lanzar(generacion, preparar))
+
+    def cancelar(self):
+        """Descarta el pedido pendiente y cualquier render en curso."""
+        self._generacion += 1
+        self._esperando = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        with self._cond:
+            self._pedido = None
+
+    def _lanzar(self, generacion, preparar):
+        self._after_id = None
+        if generacion != self._generacion:
+            return
+        try:
+            clave, generar_contenido = preparar()
+        except Exception as e:
+            self.mostrar(None, e)
+            return
+
+        foto = self._cache.get(clave)
+        if foto is not None:
+            self._cache.move_to_end(clave)
+            self.mostrar(foto, None)
+            return
+
+        with self._cond:
+            self._pedido = (generacion, clave, generar_contenido)
+            self._cond.notify()
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._trabajar, name="render-qr", daemon=True)
+            self._hilo.start()
+        self._esperando = True
+        if self._sondeo_id is None:
+            self._sondeo_id = self.root.after(30, self._revisar)
+
+    def _trabajar(self):
+        while True:
+            with self._cond:
+                while self._pedido is None:
+                    self._cond.wait()
+                generacion, clave, generar_contenido = self._pedido
+                self._pedido = None
+            if generacion != self._generacion:
+                continue  # ya hay un pedido más nuevo, no vale la pena generarlo
+            try:
+                with etapa("qr.vista_previa"):
+                    imagen = importar_qrcode().make(generar_contenido()).resize(self.tamanio)
+                self._resultados.put((generacion, clave, imagen, None))
+            except Exception as e:
+                self._resultados.put((generacion, clave, None, e))
+
+    def _revisar(self):
+        self._sondeo_id = None
+        while True:
+            try:
+                generacion, clave, imagen, error = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            vigente = generacion == self._generacion
+            if error is not None:
+                if vigente:
+                    self._esperando = False
+                    self.mostrar(None, error)
+                continue
+            # PhotoImage tiene que crearse en el hilo de Tk
+            foto = importar_pil()[1].PhotoImage(imagen)
+            self._guardar(clave, foto)
+            if vigente:
+                self._esperando = False
+                self.mostrar(foto, None)
+        if self._esperando:
+            self._sondeo_id = self.root.after(30, self._revisar)
+
+    def _guardar(self, clave, foto):
+        self._cache[clave] = foto
+        self._cache.move_to_end(clave)
+        while len(self._cache) > self.capacidad:
+            self._cache.popitem(last=False)